@@ -33,20 +33,67 @@ def create_app():
     app.config['SECRET_KEY'] = os.getenv('JWT_SECRET_KEY')
     app.config['MONGO_URI'] = os.getenv('MONGO_URI')
     
+    # Encode and decode JSON with msgspec
+    from app.utils.json_provider import MsgspecJSONProvider
+    app.json = MsgspecJSONProvider(app)
+    
     # Initialize extensions
     bcrypt.init_app(app)
     
-    # Configure CORS
-    cors = CORS(app, resources={r"/api/*": {"origins": "*"}}, supports_credentials=True)
+    # Configure CORS (clients read X-Last-Write to keep reading their own writes,
+    # and Idempotent-Replayed to tell a retried POST's original response)
+    from app.utils.read_routing import stamp_writes, LAST_WRITE_HEADER
+    from app.utils.idempotency import REPLAYED_HEADER
+    cors = CORS(app, resources={r"/api/*": {"origins": "*"}}, supports_credentials=True, expose_headers=[LAST_WRITE_HEADER, REPLAYED_HEADER])
+    app.after_request(stamp_writes)
+    
+    # Compress large responses in the encoding each client prefers
+    from app.utils.compression import init_compression
+    init_compression(app)
     
     # Register blueprints
     from app.routes.auth import auth_bp
     from app.routes.events import events_bp
     from app.routes.user import user_bp
+    from app.routes.admin import admin_bp
+    from app.routes.certificates import certificates_bp
+    from app.routes.feedback import feedback_bp
+    from app.routes.images import images_bp
+    from app.routes.batch import batch_bp
+    from app.routes.chatbot import chatbot_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(events_bp, url_prefix='/api/events')
     app.register_blueprint(user_bp, url_prefix='/api/users')
+    app.register_blueprint(admin_bp, url_prefix='/api/admin')
+    app.register_blueprint(certificates_bp, url_prefix='/api/certificates')
+    app.register_blueprint(feedback_bp, url_prefix='/api/feedback')
+    app.register_blueprint(images_bp, url_prefix='/api/images')
+    app.register_blueprint(batch_bp, url_prefix='/api/batch')
+    app.register_blueprint(chatbot_bp, url_prefix='/api/chatbot')
+    
+    # Ensure indexes used by the query paths exist
+    if db is not None:
+        try:
+            from app.models.indexes import ensure_indexes
+            ensure_indexes()
+        except Exception as e:
+            print(f"WARNING: Failed to ensure indexes: {str(e)}")
+    
+    # Query caches only serve hits while change streams keep them current
+    if db is not None and os.getenv('ENABLE_QUERY_CACHE', '1') == '1':
+        from app.services.invalidation_bus import start_invalidation_bus
+        start_invalidation_bus()
+    
+    # Write last_login/last_access timestamps in periodic bulk writes
+    if db is not None:
+        from app.services.activity_buffer import start_activity_flusher
+        start_activity_flusher()
+    
+    # Keep event statuses in step with their dates
+    if db is not None and os.getenv('RUN_STATUS_SCHEDULER', '1') == '1':
+        from app.services.status_scheduler import start_status_scheduler
+        start_status_scheduler()
     
     @app.route('/api/health')
     def health_check():
@@ -1,87 +1,172 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from app import db
+from app.utils.event_status import status_fields
+from app.services.status_scheduler import notify_schedule_changed
+from app.utils.cache import LocalCache, on_change, invalidate
+from app.utils.images import default_image_id, is_default_image, image_url, image_urls
+from app.utils.fields import build_projection, select_fields
+from app.utils.geo import geocode, point
+from app.utils.read_routing import read_from, reads_from_secondaries, MAX_STALENESS_SECONDS
+from app.models.rollup import mark_rollup_days
+from app.models.schemas import EventCreate, EventUpdate, convert, to_fields
+from app.utils import identity_map
 from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument, UpdateOne
 
-def serialize_event(event):
-    """Serialize event object to dictionary"""
+# Kept current across workers by the change stream invalidation bus
+event_cache = LocalCache('events', max_size=2048)
+event_list_cache = LocalCache('event_lists', max_size=256)
+
+def _evict_event(event_id):
+    event_cache.delete(event_id)
+    event_list_cache.clear()
+
+on_change('events', _evict_event)
+identity_map.track('events')
+
+EVENT_NOT_FOUND = 'Event not found'
+
+# Deleted events are remembered this long for delta sync; older sync tokens get everything again
+TOMBSTONE_DAYS = 30
+
+# Changes are sent again from this long before a sync token, so a write stamped
+# just before the token but committed after it is not missed
+SYNC_OVERLAP_SECONDS = 5
+
+# Radius of GET /api/events?near=... searches, in kilometres
+DEFAULT_RADIUS_KM = 25
+MAX_RADIUS_KM = 500
+NOT_REGISTERED = 'User is not registered for this event'
+HOURS_ALREADY_LOGGED = 'Hours were already logged for this event'
+
+# Events created before local images pointed at random remote images
+LEGACY_IMAGE_PREFIX = 'https://source.unsplash.com/random/'
+
+def _is_legacy_image(url):
+    return not url or url.startswith(LEGACY_IMAGE_PREFIX)
+
+# Stored fields that can be requested as they are with fields=
+EVENT_STORED_FIELDS = (
+    'event_name', 'description', 'start_date', 'end_date', 'location', 'category', 'status',
+    'publish_event', 'points_awarded', 'hours_required', 'participant_limit', 'age_restriction',
+    'contact_information', 'requirements', 'skills_needed', 'participants', 'geo', 'created_at', 'updated_at'
+)
+
+IMAGE_FIELDS = ('image_id', 'event_image', 'event_images')
+IMAGE_SOURCES = {'image_id': 1, 'event_image': 1, 'category': 1}
+
+# fields= allow-list: output field -> projection it is computed from
+EVENT_FIELD_SOURCES = dict(
+    {field: {field: 1} for field in EVENT_STORED_FIELDS},
+    event_id={'_id': 1},
+    **{field: IMAGE_SOURCES for field in IMAGE_FIELDS},
+    # Counted by the server so list views never read the participants array
+    participant_count={'participant_count': {'$size': {'$ifNull': ['$participants', []]}}}
+)
+
+def serialize_event(event, fields=None):
+    """Serialize event object to dictionary, keeping only `fields` if given"""
     if event:
         event_dict = event.copy()
         event_dict['event_id'] = str(event_dict.pop('_id', ''))
+        if 'participants' in event_dict:
+            event_dict['participant_count'] = len(event_dict['participants'])
+
+        if fields is None or any(field in IMAGE_FIELDS for field in fields):
+            image_id = event_dict.get('image_id')
+            if not image_id and _is_legacy_image(event_dict.get('event_image')):
+                image_id = default_image_id(event_dict.get('category'))
+            if image_id:
+                # event_image stays a plain URL for existing clients; event_images has every variant
+                event_dict['image_id'] = image_id
+                event_dict['event_image'] = image_url(image_id, 'card', 'jpg')
+                event_dict['event_images'] = image_urls(image_id)
+
+        # Set by near= searches
+        if 'distance_m' in event_dict:
+            event_dict['distance_km'] = round(event_dict.pop('distance_m') / 1000, 2)
+
+        if fields is not None:
+            event_dict = select_fields(event_dict, fields, always=('event_id', 'distance_km'))
         return event_dict
     return None
 
-def get_event_by_id(event_id):
-    """Find an event by ID"""
+def ensure_event_indexes():
+    """Create the indexes used by event listings, delta sync and the status scheduler"""
+    db.events.create_index([('publish_event', 1), ('status', 1), ('start_date', 1)])
+    db.events.create_index([('status', 1), ('start_date', 1)])
+    db.events.create_index('start_date')
+    db.events.create_index('status_due_at', sparse=True)
+    db.events.create_index([('geo', '2dsphere')])
+    db.events.create_index('updated_at')
+    db.event_tombstones.create_index('deleted_at', expireAfterSeconds=TOMBSTONE_DAYS * 24 * 3600)
+    backfill_event_geo()
+
+def backfill_event_geo():
+    """Geocode events created before they had coordinates
+
+    Locations the gazetteer does not know get geo: null, so they are not looked
+    at again; admins can set coordinates on those events directly.
+    """
+    operations = [
+        UpdateOne({'_id': event['_id'], 'geo': {'$exists': False}}, {'$set': {'geo': geocode(event.get('location'))}})
+        for event in db.events.find({'geo': {'$exists': False}}, {'location': 1})
+    ]
+    if operations:
+        db.events.bulk_write(operations, ordered=False)
+        print(f"Geocoded {len(operations)} events")
+
+def _event_geo(location, latitude, longitude):
+    if latitude is not None and longitude is not None:
+        return point(longitude, latitude)
+    return geocode(location)
+
+def get_event_by_id(event_id, fields=None):
+    """Find an event by ID
+
+    With `fields`, a cache miss reads only what those fields need (and is not cached).
+    Full documents are kept for the rest of the request, so repeat calls are free.
+    """
     try:
-        return db.events.find_one({'_id': ObjectId(event_id)})
+        key = str(ObjectId(event_id))
+        event = identity_map.get('events', key) or event_cache.get(key)
+        if event is None and fields is not None:
+            return db.events.find_one({'_id': ObjectId(event_id)}, build_projection(fields, EVENT_FIELD_SOURCES))
+        if event is None:
+            version = event_cache.version()
+            event = db.events.find_one({'_id': ObjectId(event_id)})
+            if event:
+                event_cache.set(key, event, version)
+        return identity_map.put('events', event)
     except:
         return None
 
 def create_event(event_data):
-    """Create a new event"""
+    """Create a new event from an EventCreate (or a dict of the same fields)"""
     try:
-        # Ensure all required fields are present
-        required_fields = ['event_name', 'description', 'start_date', 'end_date', 'location', 'category']
-        for field in required_fields:
-            if not event_data.get(field):
-                print(f"Missing required field: {field}")
-                return None
-        
-        # Convert numeric fields
-        points_awarded = int(event_data.get('points_awarded', 0))
-        hours_required = int(event_data.get('hours_required', 0))
-        participant_limit = int(event_data.get('participant_limit', 0))
-        
-        # Set appropriate default image URL based on category
-        category = event_data.get('category', 'volunteer').lower()
-        
-        # Map of categories to specific image topics
-        category_image_map = {
-            'education': 'education,teaching,school',
-            'health': 'health,medical,healthcare',
-            'environment': 'environment,nature,conservation',
-            'community': 'community,charity,neighborhood',
-            'cultural': 'cultural,arts,heritage',
-            'sports': 'sports,athletics,fitness',
-            'tech': 'technology,coding,computer',
-            'fundraising': 'fundraising,charity,donation',
-            'other': 'volunteer,helping,community'
-        }
+        if not isinstance(event_data, EventCreate):
+            event_data = convert(event_data, EventCreate)
+        event = to_fields(event_data)
         
-        image_query = category_image_map.get(category.lower(), 'volunteer,charity')
-        default_image_url = f"https://source.unsplash.com/random/800x600/?{image_query}"
-        
-        # Use provided image URL or default
-        event_image = event_data.get('event_image')
-        if not event_image:
-            event_image = default_image_url
-        
-        # Create event document
-        event = {
-            'event_name': event_data.get('event_name', ''),
-            'description': event_data.get('description', ''),
-            'start_date': event_data.get('start_date', ''),
-            'end_date': event_data.get('end_date', ''),
-            'location': event_data.get('location', ''),
-            'category': event_data.get('category', ''),
-            'status': event_data.get('status', 'Upcoming'),
-            'publish_event': event_data.get('publish_event', False),
-            'points_awarded': points_awarded,
-            'hours_required': hours_required,
-            'participant_limit': participant_limit,
-            'age_restriction': event_data.get('age_restriction', 'No Restriction'),
-            'contact_information': event_data.get('contact_information', ''),
-            'event_image': event_image,
-            'requirements': event_data.get('requirements', []),
-            'skills_needed': event_data.get('skills_needed', []),
-            'participants': [],
-            'created_at': datetime.utcnow(),
-            'updated_at': datetime.utcnow()
-        }
+        # An uploaded image (see POST /api/images), else a linked URL, else the category default
+        if not event['image_id'] and not event['event_image']:
+            event['image_id'] = default_image_id(event['category'])
+        if event['image_id']:
+            event['event_image'] = None
+        
+        requested_status = event.pop('status')
+        event['geo'] = _event_geo(event['location'], event.pop('latitude'), event.pop('longitude'))
+        event.update(participants=[], created_at=datetime.utcnow(), updated_at=datetime.utcnow())
+        
+        # Status follows the event dates; the status scheduler moves it on when they pass
+        event.update(status_fields(event['start_date'], event['end_date'], requested_status))
         
         print("Inserting event:", event)
         result = db.events.insert_one(event)
         event['_id'] = result.inserted_id
+        invalidate('events', event['_id'])
+        notify_schedule_changed()
         
         serialized_event = serialize_event(event)
         print("Created event:", serialized_event)
@@ -91,7 +176,12 @@ def create_event(event_data):
         return None
 
 def update_event(event_id, event_data):
-    """Update an existing event"""
+    """Update an existing event with the fields set in an EventUpdate (or a dict)
+
+    Returns the updated event from the same call that writes it; the current
+    event is only needed for the status and image rules and is usually already
+    in the request's identity map.
+    """
     try:
         print(f"Updating event: {event_id} with data:", event_data)
         event_id_obj = ObjectId(event_id)
@@ -102,68 +192,124 @@ def update_event(event_id, event_data):
             return None
         
         # Update provided fields
-        update_data = {k: v for k, v in event_data.items() if k not in ['_id', 'event_id', 'created_at']}
+        if not isinstance(event_data, EventUpdate):
+            event_data = convert(event_data, EventUpdate)
+        update_data = to_fields(event_data)
         update_data['updated_at'] = datetime.utcnow()
         
-        # Convert numeric fields
-        if 'points_awarded' in update_data:
-            update_data['points_awarded'] = int(update_data['points_awarded'])
-        if 'hours_required' in update_data:
-            update_data['hours_required'] = int(update_data['hours_required'])
-        if 'participant_limit' in update_data:
-            update_data['participant_limit'] = int(update_data['participant_limit'])
-        
-        # Handle event_image if category was changed but image wasn't specified
-        if 'category' in update_data and (not update_data.get('event_image') or update_data.get('event_image') == ''):
-            category = update_data.get('category', 'volunteer').lower()
-            
-            # Map of categories to specific image topics (same as in create_event)
-            category_image_map = {
-                'education': 'education,teaching,school',
-                'health': 'health,medical,healthcare',
-                'environment': 'environment,nature,conservation',
-                'community': 'community,charity,neighborhood',
-                'cultural': 'cultural,arts,heritage',
-                'sports': 'sports,athletics,fitness',
-                'tech': 'technology,coding,computer',
-                'fundraising': 'fundraising,charity,donation',
-                'other': 'volunteer,helping,community'
-            }
-            
-            image_query = category_image_map.get(category.lower(), 'volunteer,charity')
-            update_data['event_image'] = f"https://source.unsplash.com/random/800x600/?{image_query}"
+        # Given coordinates win; otherwise a new location is geocoded
+        latitude, longitude = update_data.pop('latitude', None), update_data.pop('longitude', None)
+        if latitude is not None or update_data.get('location', event.get('location')) != event.get('location'):
+            update_data['geo'] = _event_geo(update_data.get('location', event.get('location')), latitude, longitude)
+        
+        # Recompute the status schedule when the dates or status change
+        schedule_changed = any(k in update_data for k in ['start_date', 'end_date', 'status'])
+        if schedule_changed:
+            update_data.update(status_fields(
+                update_data.get('start_date', event.get('start_date')),
+                update_data.get('end_date', event.get('end_date')),
+                update_data.get('status', event.get('status'))
+            ))
+        
+        # Edit forms send back the image fields we served; only a different value is a change
+        image_id = update_data.pop('image_id', None)
+        event_image = update_data.pop('event_image', None)
+        current = serialize_event(event)
+        if image_id and image_id != current.get('image_id'):
+            update_data['image_id'] = image_id
+            update_data['event_image'] = None
+        elif event_image and event_image != current.get('event_image'):
+            update_data['image_id'] = None
+            update_data['event_image'] = event_image
+        elif 'category' in update_data and is_default_image(current.get('image_id')):
+            # Events still showing their category's default image follow a category change
+            update_data['image_id'] = default_image_id(update_data['category'])
+            update_data['event_image'] = None
         
         print(f"Updating with data:", update_data)
-        result = db.events.update_one(
+        updated_event = db.events.find_one_and_update(
             {'_id': event_id_obj},
-            {'$set': update_data}
+            {'$set': update_data},
+            return_document=ReturnDocument.AFTER
         )
         
-        if result.modified_count > 0:
-            updated_event = get_event_by_id(event_id)
-            print(f"Event updated: {event_id}")
-            return serialize_event(updated_event)
-        elif result.matched_count > 0:
-            # Document was found but not modified (no changes)
-            print(f"Event found but not modified (no changes): {event_id}")
-            return serialize_event(event)
-        else:
+        invalidate('events', event_id)
+        if schedule_changed:
+            notify_schedule_changed()
+        
+        if not updated_event:
+            # Deleted between the read and the update
             print(f"No event matched for update: {event_id}")
             return None
+        
+        identity_map.put('events', updated_event)
+        print(f"Event updated: {event_id}")
+        return serialize_event(updated_event)
     except Exception as e:
         print(f"Error updating event {event_id}: {str(e)}")
         return None
 
 def delete_event(event_id):
-    """Delete an event"""
+    """Delete an event in one call, returning what was deleted (None if there was no such event)"""
     try:
-        result = db.events.delete_one({'_id': ObjectId(event_id)})
-        return result.deleted_count > 0
-    except:
-        return False
+        event_id_obj = ObjectId(event_id)
+    except InvalidId:
+        return None
+    
+    event = db.events.find_one_and_delete(
+        {'_id': event_id_obj},
+        projection={'created_at': 1, 'participants.registration_date': 1}
+    )
+    if event:
+        # Its days' rollups no longer see the event or its registrations
+        days = [event['created_at'].strftime('%Y-%m-%d')] if event.get('created_at') else []
+        days += [(participant.get('registration_date') or '')[:10] for participant in event.get('participants', [])]
+        mark_rollup_days(days)
+        # Lets delta sync clients drop the event
+        db.event_tombstones.update_one({'_id': event_id_obj}, {'$set': {'deleted_at': datetime.utcnow()}}, upsert=True)
+        invalidate('events', event_id)
+    return event
+
+def get_event_changes(since=None, published_only=False, fields=None):
+    """Events created or updated since a sync time, and the ids of those deleted since
 
-def get_all_events(filter_criteria=None, published_only=False):
-    """Get all events with optional filtering"""
+    With `published_only`, events unpublished since are reported as deleted.
+    Without `since`, or with one older than the tombstones, every event is
+    returned and `full` is True: the client should replace what it has.
+    Returns (events, deleted_ids, next_since, full).
+    """
+    now = datetime.utcnow()
+    full = since is None or since < now - timedelta(days=TOMBSTONE_DAYS)
+    
+    query = {}
+    if not full:
+        changed_since = since - timedelta(seconds=SYNC_OVERLAP_SECONDS)
+        query['updated_at'] = {'$gte': changed_since}
+    elif published_only:
+        query['publish_event'] = True
+    
+    projection = None
+    if fields:
+        projection = dict(build_projection(fields, EVENT_FIELD_SOURCES), publish_event=1)
+    
+    events = []
+    deleted = []
+    for event in db.events.find(query, projection).sort('start_date', 1):
+        if published_only and not event.get('publish_event', False):
+            deleted.append(str(event['_id']))
+        else:
+            events.append(serialize_event(event, fields))
+    
+    if not full:
+        deleted += [str(tombstone['_id']) for tombstone in db.event_tombstones.find({'deleted_at': {'$gte': changed_since}})]
+    return events, deleted, now, full
+
+def get_all_events(filter_criteria=None, published_only=False, fields=None, near=None, radius_km=DEFAULT_RADIUS_KM):
+    """Get all events with optional filtering, serialized with only `fields` if given
+
+    With `near` (longitude, latitude), only events within `radius_km` are
+    returned, nearest first, each with its `distance_km`.
+    """
     query = {}
     
     if filter_criteria:
@@ -175,25 +321,70 @@ def get_all_events(filter_criteria=None, published_only=False):
     if published_only:
         query['publish_event'] = True
     
-    events = list(db.events.find(query).sort('start_date', 1))
-    return [serialize_event(event) for event in events]
+    if near is not None:
+        return _get_events_near(query, fields, near, radius_km)
+    
+    # Lists read from a secondary are cached apart from primary reads (so clients
+    # reading their own writes never get them) and only for the staleness bound,
+    # since the change stream may already have passed writes a secondary lacks
+    secondary = reads_from_secondaries()
+    key = (query.get('status'), query.get('category'), published_only, fields, secondary)
+    events = event_list_cache.get(key)
+    if events is None:
+        version = event_list_cache.version()
+        projection = build_projection(fields, EVENT_FIELD_SOURCES) if fields else None
+        events = [serialize_event(event, fields) for event in read_from(db.events).find(query, projection).sort('start_date', 1)]
+        event_list_cache.set(key, events, version, ttl=MAX_STALENESS_SECONDS if secondary else None)
+    return events
+
+def _get_events_near(query, fields, near, radius_km):
+    # $geoNear has to be the first stage: it applies the other filters through
+    # `query` and returns matches sorted by distance from the 2dsphere index.
+    # Results depend on the caller's position, so they are not cached.
+    pipeline = [{'$geoNear': {
+        'near': point(*near),
+        'key': 'geo',
+        'distanceField': 'distance_m',
+        'maxDistance': radius_km * 1000,
+        'query': query,
+        'spherical': True
+    }}]
+    if fields:
+        pipeline.append({'$project': dict(build_projection(fields, EVENT_FIELD_SOURCES), distance_m=1)})
+    return [serialize_event(event, fields) for event in read_from(db.events).aggregate(pipeline)]
+
+def _registration_refusal(event_id, user_id):
+    """Why a conditional registration matched nothing; only read when one is refused"""
+    event = db.events.find_one(
+        {'_id': event_id},
+        {'publish_event': 1, 'participant_limit': 1, 'participants.user_id': 1}
+    )
+    if not event:
+        return EVENT_NOT_FOUND
+    if not event.get('publish_event', False):
+        return "Event is not published"
+    
+    participants = event.get('participants', [])
+    if any(p.get('user_id') == str(user_id) for p in participants):
+        return "User already registered for this event"
+    participant_limit = event.get('participant_limit', 0)
+    if participant_limit > 0 and len(participants) >= participant_limit:
+        return "Event has reached its participant limit"
+    return "Registration failed, please try again"
 
 def register_for_event(event_id, user_id, user_role):
-    """Register a user for an event"""
+    """Register a user for an event
+
+    Publication, the participant limit and duplicate registration are checked
+    by the update's own filter, so the check and the write are one atomic call
+    and concurrent registrations cannot overfill an event.
+    """
+    try:
+        event_id_obj = ObjectId(event_id)
+    except InvalidId:
+        return False, EVENT_NOT_FOUND
+    
     try:
-        event = get_event_by_id(event_id)
-        if not event:
-            return False, "Event not found"
-        
-        # Check if event has reached participant limit
-        if len(event.get('participants', [])) >= event.get('participant_limit', 0) and event.get('participant_limit', 0) > 0:
-            return False, "Event has reached its participant limit"
-        
-        # Check if user is already registered
-        if any(p.get('user_id') == str(user_id) for p in event.get('participants', [])):
-            return False, "User already registered for this event"
-        
-        # Add user to event participants
         participant = {
             'user_id': str(user_id),
             'role': user_role,
@@ -201,10 +392,26 @@ def register_for_event(event_id, user_id, user_role):
             'status': 'registered'
         }
         
-        result = db.events.update_one(
-            {'_id': ObjectId(event_id)},
-            {'$push': {'participants': participant}}
+        event = db.events.find_one_and_update(
+            {
+                '_id': event_id_obj,
+                'publish_event': True,
+                'participants.user_id': {'$ne': str(user_id)},
+                # A limit of 0 means unlimited
+                '$expr': {'$or': [
+                    {'$lte': [{'$ifNull': ['$participant_limit', 0]}, 0]},
+                    {'$lt': [{'$size': {'$ifNull': ['$participants', []]}}, '$participant_limit']}
+                ]}
+            },
+            {
+                '$push': {'participants': participant},
+                '$set': {'updated_at': datetime.utcnow()}
+            },
+            projection={'_id': 1},
+            return_document=ReturnDocument.AFTER
         )
+        if not event:
+            return False, _registration_refusal(event_id_obj, user_id)
         
         # Add event to user's profile
         field = 'profile.events_participated' if user_role == 'volunteer' else 'profile.events_attended'
@@ -212,19 +419,43 @@ def register_for_event(event_id, user_id, user_role):
             {'_id': ObjectId(user_id)},
             {'$addToSet': {field: str(event_id)}}
         )
+        invalidate('events', event_id)
+        invalidate('users', user_id)
         
-        return result.modified_count > 0, "Registration successful"
+        return True, "Registration successful"
     except Exception as e:
         return False, str(e)
 
 def cancel_registration(event_id, user_id):
-    """Cancel a user's registration for an event"""
+    """Cancel a user's registration for an event
+
+    Returns (success, message). The registration check is part of the update's
+    filter; the event is only read again to tell a missing event from a missing
+    registration.
+    """
+    try:
+        event_id_obj = ObjectId(event_id)
+    except InvalidId:
+        return False, EVENT_NOT_FOUND
+    
     try:
         # Remove user from event participants
-        result = db.events.update_one(
-            {'_id': ObjectId(event_id)},
-            {'$pull': {'participants': {'user_id': str(user_id)}}}
+        event = db.events.find_one_and_update(
+            {'_id': event_id_obj, 'participants.user_id': str(user_id)},
+            {
+                '$pull': {'participants': {'user_id': str(user_id)}},
+                '$set': {'updated_at': datetime.utcnow()}
+            },
+            projection={'participants': {'$elemMatch': {'user_id': str(user_id)}}},
+            return_document=ReturnDocument.BEFORE
         )
+        if not event:
+            if db.events.count_documents({'_id': event_id_obj}, limit=1):
+                return False, NOT_REGISTERED
+            return False, EVENT_NOT_FOUND
+        
+        # The registration's day no longer sees it in the rollups
+        mark_rollup_days([(participant.get('registration_date') or '')[:10] for participant in event.get('participants', [])])
         
         # Remove event from user's profile in both possible locations
         db.users.update_one(
@@ -236,7 +467,34 @@ def cancel_registration(event_id, user_id):
                 }
             }
         )
+        invalidate('events', event_id)
+        invalidate('users', user_id)
         
-        return result.modified_count > 0
-    except:
-        return False 
\ No newline at end of file
+        return True, "Registration cancelled successfully"
+    except Exception as e:
+        print(f"Error cancelling registration for event {event_id}: {str(e)}")
+        return False, str(e)
+
+def claim_hours_log(event_id, user_id):
+    """Mark a participant's hours for an event as logged, once
+
+    Returns (success, message). Registration and the one-log-per-event rule are
+    part of the update's filter, so concurrent requests cannot both succeed.
+    """
+    try:
+        event_id_obj = ObjectId(event_id)
+    except InvalidId:
+        return False, EVENT_NOT_FOUND
+    
+    result = db.events.update_one(
+        {'_id': event_id_obj, 'participants': {'$elemMatch': {'user_id': str(user_id), 'hours_logged': {'$ne': True}}}},
+        {'$set': {'participants.$.hours_logged': True}}
+    )
+    if result.modified_count:
+        invalidate('events', event_id)
+        return True, None
+    if db.events.count_documents({'_id': event_id_obj, 'participants.user_id': str(user_id)}, limit=1):
+        return False, HOURS_ALREADY_LOGGED
+    if db.events.count_documents({'_id': event_id_obj}, limit=1):
+        return False, NOT_REGISTERED
+    return False, EVENT_NOT_FOUND
@@ -0,0 +1,194 @@
+import csv
+import re
+from collections import Counter
+from datetime import datetime
+from app import db
+from pymongo import UpdateOne
+
+# Counters are kept per event and for everything together
+GLOBAL_SCOPE = 'global'
+
+SENTIMENTS = ('positive', 'neutral', 'negative')
+
+# Kept small and local so ingestion needs no NLP downloads (mirrors the
+# nltk English stopwords used in word_cloud/charts.ipynb for common words)
+STOPWORDS = frozenset('''
+a about above after again against all am an and any are as at be because been before being below between
+both but by can could did do does doing down during each few for from further had has have having he her here
+hers herself him himself his how i if in into is it its itself just me more most my myself no nor not now of
+off on once only or other our ours ourselves out over own same she should so some such than that the their
+theirs them themselves then there these they this those through to too under until up very was we were what
+when where which while who whom why will with would you your yours yourself yourselves also im ive dont didnt
+wasnt isnt its it's i'm i've don't didn't wasn't isn't couldn't wouldn't can't won't doesn't
+'''.split())
+
+POSITIVE_WORDS = frozenset('''
+amazing awesome clear convenient easy excellent fantastic fast friendly good great helpful impressed
+intuitive love loved nice perfect pleasant quick quickly recommend responsive seamless simple smooth
+straightforward useful wonderful accurate accurately enjoyed happy efficient
+'''.split())
+
+NEGATIVE_WORDS = frozenset('''
+annoying bad broken confusing difficult disappointed disappointing error errors frustrating hard
+irrelevant lag laggy poor slow stuck unclear unhelpful useless wrong issue issues problem problems
+repetitive generic limited lacking
+'''.split())
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9']*")
+
+def tokenize(text):
+    """Lowercase word tokens with stopwords removed"""
+    text = text.lower().replace('\u2019', "'")
+    return [token for token in TOKEN_PATTERN.findall(text) if token not in STOPWORDS]
+
+def term_counts(tokens):
+    """Unigram and bigram counts for one token list"""
+    counts = Counter(tokens)
+    counts.update(' '.join(pair) for pair in zip(tokens, tokens[1:]))
+    return counts
+
+def classify_sentiment(tokens, rating=None):
+    """Sentiment from the overall rating when there is one, otherwise from the word lists"""
+    if rating:
+        if rating >= 4:
+            return 'positive'
+        if rating <= 2:
+            return 'negative'
+        return 'neutral'
+
+    score = sum(token in POSITIVE_WORDS for token in tokens) - sum(token in NEGATIVE_WORDS for token in tokens)
+    if score > 0:
+        return 'positive'
+    if score < 0:
+        return 'negative'
+    return 'neutral'
+
+def ensure_feedback_indexes():
+    """Create the indexes used by feedback reads and term lookups"""
+    db.feedback.create_index([('event_id', 1), ('created_at', -1)])
+    db.feedback_terms.create_index([('scope', 1), ('ngram', 1), ('count', -1)])
+
+def _scopes(document):
+    return [GLOBAL_SCOPE] + ([document['event_id']] if document.get('event_id') else [])
+
+def _apply_counters(documents, document_terms):
+    """Merge the counters of a batch of feedback in memory, then write each once
+
+    One $inc upsert is sent per distinct (scope, term) in the batch rather
+    than one per term occurrence, so a bulk import costs about as many writes
+    as it has distinct terms.
+    """
+    terms = {}
+    summaries = {}
+
+    for document, counts in zip(documents, document_terms):
+        rating = document.get('ratings', {}).get('overall')
+        for scope in _scopes(document):
+            terms.setdefault(scope, Counter()).update(counts)
+            summary = summaries.setdefault(scope, Counter())
+            summary['total'] += 1
+            summary[f"sentiment.{document['sentiment']}"] += 1
+            if rating:
+                summary['rating_sum'] += rating
+                summary['rating_count'] += 1
+
+    term_updates = [
+        UpdateOne(
+            {'_id': f"{scope}:{term}"},
+            {'$inc': {'count': count}, '$setOnInsert': {'scope': scope, 'term': term, 'ngram': term.count(' ') + 1}},
+            upsert=True
+        )
+        for scope, counts in terms.items()
+        for term, count in counts.items()
+    ]
+    summary_updates = [
+        UpdateOne({'_id': scope}, {'$inc': dict(increments), '$set': {'updated_at': datetime.utcnow()}}, upsert=True)
+        for scope, increments in summaries.items()
+    ]
+
+    if term_updates:
+        db.feedback_terms.bulk_write(term_updates, ordered=False)
+    if summary_updates:
+        db.feedback_summary.bulk_write(summary_updates, ordered=False)
+
+def _feedback_document(text, event_id=None, user_id=None, ratings=None, sentiment=None, source='event', extra=None):
+    tokens = tokenize(text)
+    document = {
+        'event_id': str(event_id) if event_id else None,
+        'user_id': str(user_id) if user_id else None,
+        'source': source,
+        'text': text,
+        'ratings': ratings or {},
+        'sentiment': sentiment if sentiment in SENTIMENTS else classify_sentiment(tokens, (ratings or {}).get('overall')),
+        'created_at': datetime.utcnow()
+    }
+    if extra:
+        document.update(extra)
+    return document, term_counts(tokens)
+
+def add_feedback(text, event_id=None, user_id=None, ratings=None, sentiment=None, source='event', extra=None):
+    """Store one feedback entry and fold it into the running counters"""
+    document, counts = _feedback_document(text, event_id, user_id, ratings, sentiment, source, extra)
+    result = db.feedback.insert_one(document)
+    document['_id'] = result.inserted_id
+    _apply_counters([document], [counts])
+    return document
+
+def import_feedback_csv(lines, event_id=None, source='import', batch_size=1000):
+    """Import feedback from CSV rows shaped like word_cloud/data.csv (User_ID, Feedback, Sentiment)
+
+    Rows are tokenised and counted a batch at a time, with one insert_many and
+    one set of counter writes per batch. Returns the number of rows imported.
+    """
+    imported = 0
+    batch = []
+
+    def flush():
+        documents = [document for document, _ in batch]
+        db.feedback.insert_many(documents)
+        _apply_counters(documents, [counts for _, counts in batch])
+        batch.clear()
+
+    for row in csv.DictReader(lines):
+        text = (row.get('Feedback') or '').strip()
+        if not text:
+            continue
+        batch.append(_feedback_document(
+            text,
+            event_id=event_id,
+            sentiment=(row.get('Sentiment') or '').strip().lower() or None,
+            source=source,
+            extra={'external_user_id': row.get('User_ID')}
+        ))
+        imported += 1
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+    return imported
+
+def get_feedback_summary(event_id=None, limit=50):
+    """Read the precomputed sentiment counts and top terms for an event or overall"""
+    scope = str(event_id) if event_id else GLOBAL_SCOPE
+    summary = db.feedback_summary.find_one({'_id': scope}) or {}
+
+    top_terms = {
+        ngram: [
+            {'term': row['term'], 'count': row['count']}
+            for row in db.feedback_terms.find({'scope': scope, 'ngram': ngram}, {'term': 1, 'count': 1})
+            .sort('count', -1)
+            .limit(limit)
+        ]
+        for ngram in (1, 2)
+    }
+
+    rating_count = summary.get('rating_count', 0)
+    return {
+        'scope': scope,
+        'total': summary.get('total', 0),
+        'sentiment': {sentiment: summary.get('sentiment', {}).get(sentiment, 0) for sentiment in SENTIMENTS},
+        'average_rating': round(summary.get('rating_sum', 0) / rating_count, 2) if rating_count else None,
+        'words': top_terms[1],
+        'bigrams': top_terms[2]
+    }
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+from app import db
+from bson import Binary
+from pymongo.errors import DuplicateKeyError
+
+# Responses are replayed for retries arriving within this long
+RESPONSE_TTL = timedelta(hours=24)
+
+# A claimed key whose request never finished (its worker died) is freed after this long
+PENDING_TTL = timedelta(minutes=2)
+
+PENDING = 'pending'
+DONE = 'done'
+
+def ensure_idempotency_indexes():
+    """Stored responses and claims expire on their own"""
+    db.idempotency_keys.create_index('expires_at', expireAfterSeconds=0)
+
+def claim_key(record_id, fingerprint):
+    """Claim a key for a request about to run
+
+    Returns None when claimed, otherwise the key's record: a stored response,
+    or a pending claim of a request still running.
+    """
+    for _ in range(2):
+        now = datetime.utcnow()
+        claim = {
+            '_id': record_id, 'fingerprint': fingerprint, 'state': PENDING,
+            'created_at': now, 'expires_at': now + PENDING_TTL
+        }
+        try:
+            db.idempotency_keys.insert_one(claim)
+            return None
+        except DuplicateKeyError:
+            record = db.idempotency_keys.find_one({'_id': record_id})
+        if record is None:
+            # Expired between the insert and the read
+            continue
+        if record['state'] == PENDING and record['expires_at'] <= now:
+            # Abandoned claim (the TTL monitor has not removed it yet): take it over
+            result = db.idempotency_keys.replace_one(
+                {'_id': record_id, 'state': PENDING, 'expires_at': record['expires_at']}, claim
+            )
+            if result.modified_count:
+                return None
+            continue
+        return record
+    return db.idempotency_keys.find_one({'_id': record_id})
+
+def store_response(record_id, status, body, mimetype):
+    """Keep a finished request's response for replays; returns the stored record"""
+    now = datetime.utcnow()
+    fields = {
+        'state': DONE, 'status': status, 'body': Binary(body), 'mimetype': mimetype,
+        'completed_at': now, 'expires_at': now + RESPONSE_TTL
+    }
+    db.idempotency_keys.update_one({'_id': record_id}, {'$set': fields})
+    return fields
+
+def release_key(record_id):
+    """Free a claim whose request failed, so a retry runs it again"""
+    db.idempotency_keys.delete_one({'_id': record_id, 'state': PENDING})
@@ -0,0 +1,19 @@
+from app.models.user import ensure_user_indexes
+from app.models.event import ensure_event_indexes
+from app.models.ledger import ensure_ledger_indexes
+from app.models.rollup import ensure_rollup_indexes
+from app.models.feedback import ensure_feedback_indexes
+from app.models.message_job import ensure_message_job_indexes
+from app.models.revocation import ensure_revocation_indexes
+from app.models.idempotency import ensure_idempotency_indexes
+
+def ensure_indexes():
+    """Create all indexes the application relies on (safe to call on every start)"""
+    ensure_user_indexes()
+    ensure_event_indexes()
+    ensure_ledger_indexes()
+    ensure_rollup_indexes()
+    ensure_feedback_indexes()
+    ensure_message_job_indexes()
+    ensure_revocation_indexes()
+    ensure_idempotency_indexes()
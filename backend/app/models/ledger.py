@@ -0,0 +1,250 @@
+from datetime import datetime
+from app import db
+from app.utils.cache import invalidate
+from app.utils.read_routing import read_from
+from app.models.user import update_achievements
+from bson import ObjectId
+
+# Points earned per volunteered hour (matches calculatePointsForHours on the log-hours page)
+POINTS_PER_HOUR = 10
+
+# Leaderboard periods that have their own running totals
+PERIODS = ('weekly', 'monthly')
+
+# Running figures kept for each (period, bucket, user)
+PERIOD_FIELDS = ('points', 'hours', 'entries')
+
+def period_bucket(period, when):
+    """Bucket key for a period, e.g. '2024-05' (monthly) or '2024-W19' (weekly)"""
+    if period == 'monthly':
+        return when.strftime('%Y-%m')
+    if period == 'weekly':
+        year, week, _ = when.isocalendar()
+        return f"{year}-W{week:02d}"
+    raise ValueError(f"Unknown period: {period}")
+
+def serialize_ledger_entry(entry):
+    """Serialize ledger entry to dictionary"""
+    if entry:
+        return {
+            'entry_id': str(entry['_id']),
+            'user_id': str(entry['user_id']),
+            'event_id': entry.get('event_id'),
+            'hours': entry.get('hours', 0),
+            'points': entry.get('points', 0),
+            'source': entry.get('source', 'log'),
+            'approved_by': str(entry['approved_by']) if entry.get('approved_by') else None,
+            'logged_at': entry['logged_at'].isoformat()
+        }
+    return None
+
+def ensure_ledger_indexes():
+    """Create the indexes used by ledger reads and period leaderboards"""
+    db.hours_ledger.create_index([('user_id', 1), ('logged_at', -1)])
+    db.hours_ledger.create_index('event_id')
+    db.period_totals.create_index(
+        [('period', 1), ('bucket', 1), ('user_id', 1)], unique=True
+    )
+    db.period_totals.create_index([('period', 1), ('bucket', 1), ('points', -1)])
+    db.users.create_index([('role', 1), ('profile.points', -1)])
+
+def record_entry(user_id, event_id, hours, points, approved_by=None, source='log'):
+    """Append an hours/points entry and apply it to the running totals
+
+    The ledger is never updated in place; corrections are recorded as new
+    (possibly negative) entries.
+    """
+    user_id = ObjectId(user_id)
+    now = datetime.utcnow()
+
+    entry = {
+        'user_id': user_id,
+        'event_id': str(event_id) if event_id else None,
+        'hours': hours,
+        'points': points,
+        'source': source,
+        'approved_by': ObjectId(approved_by) if approved_by else None,
+        'logged_at': now
+    }
+    result = db.hours_ledger.insert_one(entry)
+    entry['_id'] = result.inserted_id
+
+    # Lifetime totals live on the user so profile reads stay a single lookup
+    db.users.update_one(
+        {'_id': user_id},
+        {
+            '$inc': {'profile.points': points, 'profile.hours_contributed': hours},
+            '$set': {'updated_at': now}
+        }
+    )
+    invalidate('users', user_id)
+    update_achievements(user_id)
+
+    for period in PERIODS:
+        db.period_totals.update_one(
+            {'period': period, 'bucket': period_bucket(period, now), 'user_id': user_id},
+            {'$inc': {'points': points, 'hours': hours, 'entries': 1}},
+            upsert=True
+        )
+
+    return entry
+
+def get_user_entries(user_id, limit=50):
+    """Get the most recent ledger entries for a user"""
+    return list(
+        db.hours_ledger.find({'user_id': ObjectId(user_id)})
+        .sort('logged_at', -1)
+        .limit(limit)
+    )
+
+def has_logged_hours(user_id, event_id):
+    """Whether a user logged hours for an event themselves (admin entries do not count)"""
+    return db.hours_ledger.count_documents(
+        {'user_id': ObjectId(user_id), 'event_id': str(event_id), 'approved_by': None}, limit=1
+    ) > 0
+
+def get_event_hours(event_id):
+    """Get the hours logged for an event, keyed by user id string"""
+    return {
+        str(row['_id']): row['hours']
+        for row in db.hours_ledger.aggregate([
+            {'$match': {'event_id': str(event_id)}},
+            {'$group': {'_id': '$user_id', 'hours': {'$sum': '$hours'}}}
+        ])
+    }
+
+def get_period_leaders(period, limit=20, when=None):
+    """Get the top period totals for the current bucket of a period"""
+    bucket = period_bucket(period, when or datetime.utcnow())
+    return list(
+        read_from(db.period_totals).find({'period': period, 'bucket': bucket})
+        .sort('points', -1)
+        .limit(limit)
+    )
+
+def _ledger_period_sums(user_ids):
+    """Ledger sums for a batch of users, keyed by (user_id, period, bucket)
+
+    The ledger is summed per user and day in the database; days are put in
+    their buckets here with the same period_bucket used when recording.
+    """
+    sums = {}
+    for row in db.hours_ledger.aggregate([
+        {'$match': {'user_id': {'$in': user_ids}}},
+        {'$group': {
+            '_id': {
+                'user_id': '$user_id',
+                'day': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$logged_at'}}
+            },
+            'points': {'$sum': '$points'},
+            'hours': {'$sum': '$hours'},
+            'entries': {'$sum': 1}
+        }}
+    ]):
+        day = datetime.strptime(row['_id']['day'], '%Y-%m-%d')
+        for period in PERIODS:
+            key = (row['_id']['user_id'], period, period_bucket(period, day))
+            total = sums.setdefault(key, {field: 0 for field in PERIOD_FIELDS})
+            for field in PERIOD_FIELDS:
+                total[field] += row[field]
+    return sums
+
+def _reconcile_periods(user_ids, fix):
+    """Compare the period totals of a batch of users with the ledger
+
+    Returns the mismatched buckets keyed by user id. With fix=True each one is
+    set to the ledger sums, or removed when the ledger has nothing for it.
+    """
+    expected = _ledger_period_sums(user_ids)
+    stored = {
+        (row['user_id'], row['period'], row['bucket']): row
+        for row in db.period_totals.find({'user_id': {'$in': user_ids}, 'period': {'$in': list(PERIODS)}})
+    }
+
+    mismatches = {}
+    for key in sorted(set(expected) | set(stored), key=lambda k: (str(k[0]), k[1], k[2])):
+        user_id, period, bucket = key
+        sums = expected.get(key, {field: 0 for field in PERIOD_FIELDS})
+        row = stored.get(key, {})
+        if all(row.get(field, 0) == sums[field] for field in PERIOD_FIELDS):
+            continue
+        mismatch = {'period': period, 'bucket': bucket}
+        for field in PERIOD_FIELDS:
+            mismatch[field] = row.get(field, 0)
+            mismatch[f'ledger_{field}'] = sums[field]
+        mismatches.setdefault(user_id, []).append(mismatch)
+
+        if fix:
+            query = {'period': period, 'bucket': bucket, 'user_id': user_id}
+            if key in expected:
+                db.period_totals.update_one(query, {'$set': sums}, upsert=True)
+            else:
+                db.period_totals.delete_one(query)
+
+    return mismatches
+
+def reconcile_totals(batch_size=500, fix=False):
+    """Verify user and period totals against the ledger, one batch of users at a time
+
+    Returns a list of mismatched users, each with its mismatched period
+    buckets. With fix=True the totals are reset to the ledger sums.
+    """
+    mismatches = []
+    last_id = None
+
+    while True:
+        query = {'role': 'volunteer'}
+        if last_id:
+            query['_id'] = {'$gt': last_id}
+
+        users = list(
+            db.users.find(query, {'profile.points': 1, 'profile.hours_contributed': 1})
+            .sort('_id', 1)
+            .limit(batch_size)
+        )
+        if not users:
+            break
+        last_id = users[-1]['_id']
+        user_ids = [u['_id'] for u in users]
+
+        sums = {
+            row['_id']: row
+            for row in db.hours_ledger.aggregate([
+                {'$match': {'user_id': {'$in': user_ids}}},
+                {'$group': {
+                    '_id': '$user_id',
+                    'points': {'$sum': '$points'},
+                    'hours': {'$sum': '$hours'}
+                }}
+            ])
+        }
+        period_mismatches = _reconcile_periods(user_ids, fix)
+
+        for user in users:
+            profile = user.get('profile', {})
+            expected = sums.get(user['_id'], {'points': 0, 'hours': 0})
+            totals_match = (profile.get('points', 0) == expected['points']
+                            and profile.get('hours_contributed', 0) == expected['hours'])
+            if totals_match and user['_id'] not in period_mismatches:
+                continue
+            mismatches.append({
+                'user_id': str(user['_id']),
+                'points': profile.get('points', 0),
+                'ledger_points': expected['points'],
+                'hours': profile.get('hours_contributed', 0),
+                'ledger_hours': expected['hours'],
+                'periods': period_mismatches.get(user['_id'], [])
+            })
+            if fix and not totals_match:
+                db.users.update_one(
+                    {'_id': user['_id']},
+                    {'$set': {
+                        'profile.points': expected['points'],
+                        'profile.hours_contributed': expected['hours']
+                    }}
+                )
+                invalidate('users', user['_id'])
+                # The stored level and badges follow the corrected totals
+                update_achievements(user['_id'])
+
+    return mismatches
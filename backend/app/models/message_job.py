@@ -0,0 +1,143 @@
+from datetime import datetime, timedelta
+from app import db
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+# A running job whose worker stops renewing its lease is picked up by another worker.
+# Leases are renewed at every progress checkpoint (at least every third of this)
+LEASE_SECONDS = 300
+
+# Failed recipients kept on the job for the admin to inspect
+MAX_RECORDED_FAILURES = 100
+
+def serialize_job(job):
+    """Serialize message job to dictionary"""
+    if job:
+        return {
+            'job_id': str(job['_id']),
+            'audience': job['audience'],
+            'subject': job['subject'],
+            'status': job['status'],
+            'sent': job.get('sent', 0),
+            'failed': job.get('failed', 0),
+            'total': job.get('total', 0),
+            'failures': job.get('failures', []),
+            'error': job.get('error'),
+            'created_at': job['created_at'].isoformat(),
+            'updated_at': job['updated_at'].isoformat(),
+            'completed_at': job['completed_at'].isoformat() if job.get('completed_at') else None
+        }
+    return None
+
+def ensure_message_job_indexes():
+    """Create the indexes used by workers claiming jobs"""
+    db.message_jobs.create_index([('status', 1), ('lease_until', 1), ('created_at', 1)])
+
+def audience_query(audience):
+    """Users query for an audience, or None if the audience is invalid"""
+    if not isinstance(audience, dict):
+        return None
+    if audience.get('type') == 'role':
+        role = audience.get('role')
+        if role == 'all':
+            return {'is_active': {'$ne': False}}
+        if role in ('volunteer', 'participant', 'admin'):
+            return {'role': role, 'is_active': {'$ne': False}}
+    elif audience.get('type') == 'event':
+        try:
+            event = db.events.find_one({'_id': ObjectId(audience.get('event_id'))}, {'participants.user_id': 1})
+        except Exception:
+            return None
+        if event:
+            user_ids = [ObjectId(p['user_id']) for p in event.get('participants', [])]
+            return {'_id': {'$in': user_ids}, 'is_active': {'$ne': False}}
+    return None
+
+def enqueue_job(audience, subject, body, created_by):
+    """Queue a message for every user in the audience and return the job right away"""
+    query = audience_query(audience)
+    if query is None:
+        return None
+
+    now = datetime.utcnow()
+    job = {
+        'audience': audience,
+        'subject': subject,
+        'body': body,
+        'status': 'queued',
+        'created_by': created_by,
+        'cursor': None,
+        'sent': 0,
+        'failed': 0,
+        # The recipient total is filled in by the worker so enqueueing never waits on a count
+        'total': 0,
+        'failures': [],
+        'lease_until': None,
+        'created_at': now,
+        'updated_at': now
+    }
+    result = db.message_jobs.insert_one(job)
+    job['_id'] = result.inserted_id
+    return job
+
+def claim_job(worker_id):
+    """Atomically take the oldest queued job, or a running one whose lease expired"""
+    now = datetime.utcnow()
+    return db.message_jobs.find_one_and_update(
+        {'$or': [
+            {'status': 'queued'},
+            {'status': 'running', 'lease_until': {'$lt': now}}
+        ]},
+        {'$set': {
+            'status': 'running',
+            'worker_id': worker_id,
+            'lease_until': now + timedelta(seconds=LEASE_SECONDS),
+            'updated_at': now
+        }},
+        sort=[('created_at', 1)],
+        return_document=ReturnDocument.AFTER
+    )
+
+def record_progress(job_id, worker_id, cursor, sent, failed, failures):
+    """Save the progress of a batch and renew the lease; False if another worker took the job"""
+    now = datetime.utcnow()
+    update = {
+        '$set': {
+            'cursor': cursor,
+            'lease_until': now + timedelta(seconds=LEASE_SECONDS),
+            'updated_at': now
+        },
+        '$inc': {'sent': sent, 'failed': failed}
+    }
+    if failures:
+        update['$push'] = {'failures': {'$each': failures, '$slice': -MAX_RECORDED_FAILURES}}
+    result = db.message_jobs.update_one({'_id': job_id, 'worker_id': worker_id, 'status': 'running'}, update)
+    return result.modified_count > 0
+
+def set_total(job_id, total):
+    db.message_jobs.update_one({'_id': job_id}, {'$set': {'total': total}})
+
+def finish_job(job_id, worker_id, error=None):
+    """Mark a job completed (or failed with an error)"""
+    now = datetime.utcnow()
+    db.message_jobs.update_one(
+        {'_id': job_id, 'worker_id': worker_id},
+        {'$set': {
+            'status': 'failed' if error else 'completed',
+            'error': error,
+            'lease_until': None,
+            'completed_at': now,
+            'updated_at': now
+        }}
+    )
+
+def get_job(job_id):
+    """Find a message job by ID"""
+    try:
+        return db.message_jobs.find_one({'_id': ObjectId(job_id)})
+    except Exception:
+        return None
+
+def list_jobs(limit=20):
+    """Get the most recent message jobs"""
+    return list(db.message_jobs.find({}, {'body': 0}).sort('created_at', -1).limit(limit))
@@ -0,0 +1,118 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from app import db
+from app.utils.bloom import BloomFilter
+from app.utils.cache import on_change
+
+# Revoked tokens: one record per revoked token id (jti), and one per user whose
+# tokens issued until a moment were all revoked (logout everywhere,
+# deactivation). Every worker keeps the record ids in a Bloom filter, so a
+# token that was never revoked is let through without a database read.
+
+# Revocations made through other workers are seen at most this late (at once
+# while the cache invalidation bus is running)
+REFRESH_SECONDS = float(os.getenv('REVOCATION_REFRESH_SECONDS', 5))
+
+# The filter is rebuilt this often so the ids of expired records leave it
+REBUILD_SECONDS = 3600
+
+# Live revocations the filter is sized for; it is rebuilt larger when more are added
+BLOOM_CAPACITY = int(os.getenv('REVOCATION_BLOOM_CAPACITY', 100000))
+BLOOM_ERROR_RATE = 0.001
+
+# Revocations are read again from this long before the last refresh, so one
+# stamped just before it but committed after it is not missed
+REFRESH_OVERLAP_SECONDS = 5
+
+_lock = threading.Lock()
+_filter = None
+_synced_at = None
+_refreshed_at = 0
+_rebuild_at = 0
+
+def _user_key(user_id):
+    return f'user:{user_id}'
+
+def ensure_revocation_indexes():
+    """Create the indexes used by the revocation filter refresh; records expire with the tokens they cover"""
+    db.revoked_tokens.create_index('expires_at', expireAfterSeconds=0)
+    db.revoked_tokens.create_index('revoked_at')
+
+def revoke_token(jti, user_id, expires_at):
+    """Revoke one token until it expires"""
+    db.revoked_tokens.update_one(
+        {'_id': jti},
+        {'$set': {'user_id': str(user_id), 'revoked_at': datetime.utcnow(), 'expires_at': expires_at}},
+        upsert=True
+    )
+    _add(jti)
+
+def revoke_user_tokens(user_id, lifetime):
+    """Revoke every token issued to a user until now (all of them expire within `lifetime`)"""
+    now = datetime.utcnow()
+    key = _user_key(user_id)
+    db.revoked_tokens.update_one(
+        {'_id': key},
+        {'$set': {'user_id': str(user_id), 'revoked_at': now, 'expires_at': now + lifetime}},
+        upsert=True
+    )
+    _add(key)
+
+def is_revoked(jti, user_id, issued_at):
+    """Whether a token was revoked, by its id or with all of its user's tokens
+
+    Only a filter hit (a revocation, or a rare false positive) reads the database.
+    """
+    bloom = _current_filter()
+    keys = [key for key in (jti, _user_key(user_id)) if key is not None and key in bloom]
+    if not keys:
+        return False
+    for record in db.revoked_tokens.find({'_id': {'$in': keys}}, {'revoked_at': 1}):
+        if record['_id'] == jti or issued_at <= record['revoked_at']:
+            return True
+    return False
+
+def _add(key):
+    with _lock:
+        if _filter is not None:
+            _filter.add(key)
+
+def _current_filter():
+    global _refreshed_at
+    now = time.monotonic()
+    if _filter is not None and now - _refreshed_at < REFRESH_SECONDS:
+        return _filter
+    with _lock:
+        if _filter is None or _filter.full or now >= _rebuild_at:
+            _rebuild()
+        elif now - _refreshed_at >= REFRESH_SECONDS:
+            _catch_up()
+        _refreshed_at = now
+        return _filter
+
+def _rebuild():
+    """Fill a new filter with every live revocation"""
+    global _filter, _synced_at, _rebuild_at
+    synced_at = datetime.utcnow()
+    live = {'expires_at': {'$gt': synced_at}}
+    bloom = BloomFilter(max(BLOOM_CAPACITY, 2 * db.revoked_tokens.count_documents(live)), BLOOM_ERROR_RATE)
+    for record in db.revoked_tokens.find(live, {'_id': 1}):
+        bloom.add(record['_id'])
+    _filter = bloom
+    _synced_at = synced_at
+    _rebuild_at = time.monotonic() + REBUILD_SECONDS
+    print(f"Revocation filter built: {bloom.count} revocations, {len(bloom.bits) // 1024} KB")
+
+def _catch_up():
+    """Add the revocations made through any worker since the last refresh"""
+    global _synced_at
+    synced_at = datetime.utcnow()
+    changed_since = _synced_at - timedelta(seconds=REFRESH_OVERLAP_SECONDS)
+    for record in db.revoked_tokens.find({'revoked_at': {'$gte': changed_since}}, {'_id': 1}):
+        _filter.add(record['_id'])
+    _synced_at = synced_at
+
+# Revocations written by other workers, delivered by the cache invalidation bus
+on_change('revoked_tokens', _add)
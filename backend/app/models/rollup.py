@@ -0,0 +1,195 @@
+from datetime import datetime
+from app import db
+
+# One document per day ('YYYY-MM-DD' _id) holding every figure of that day
+ROLLUP_COLLECTION = 'daily_rollups'
+
+# A full rebuild is written here and then renamed over the rollups
+ROLLUP_BUILD_COLLECTION = 'daily_rollups_build'
+
+# Rollup fields holding {key: count} maps, and those holding plain numbers
+COUNT_MAP_FIELDS = ('events_by_category', 'events_by_status', 'users_by_role', 'registrations_by_role')
+NUMBER_FIELDS = ('hours', 'points', 'ledger_entries')
+
+# Days whose figures lost something the incremental refresh cannot see in the
+# remaining documents (a cancelled registration, a deleted event)
+DIRTY_DAYS_COLLECTION = 'rollup_dirty_days'
+
+def _day(date_expression):
+    return {'$dateToString': {'format': '%Y-%m-%d', 'date': date_expression}}
+
+def _count_map(day_field, key_field):
+    """Stages turning (day, key) counts into one {key: count} map per day"""
+    return [
+        {'$group': {'_id': {'day': day_field, 'key': {'$ifNull': [key_field, 'Unknown']}}, 'count': {'$sum': 1}}},
+        {'$group': {'_id': '$_id.day', 'counts': {'$push': {'k': {'$toString': '$_id.key'}, 'v': '$count'}}}},
+    ]
+
+def ensure_rollup_indexes():
+    """Create the indexes used to find the days touched since the last refresh"""
+    db.events.create_index('updated_at')
+    db.events.create_index('created_at')
+    db.events.create_index('participants.registration_date')
+    db.users.create_index('created_at')
+    db.hours_ledger.create_index('logged_at')
+
+def mark_rollup_days(days):
+    """Have the next refresh recompute the given days ('YYYY-MM-DD' strings)"""
+    now = datetime.utcnow()
+    for day in set(filter(None, days)):
+        db[DIRTY_DAYS_COLLECTION].update_one({'_id': day}, {'$set': {'marked_at': now}}, upsert=True)
+
+def _touched_days(since):
+    """Days whose figures may have changed since the given time (None means all days)"""
+    if since is None:
+        return None
+
+    days = {marked['_id'] for marked in db[DIRTY_DAYS_COLLECTION].find({}, {'_id': 1})}
+    for event in db.events.find({'updated_at': {'$gte': since}}, {'created_at': 1, 'participants.registration_date': 1}):
+        if event.get('created_at'):
+            days.add(event['created_at'].strftime('%Y-%m-%d'))
+        for participant in event.get('participants', []):
+            if participant.get('registration_date'):
+                days.add(participant['registration_date'][:10])
+    for user in db.users.find({'created_at': {'$gte': since}}, {'created_at': 1}):
+        days.add(user['created_at'].strftime('%Y-%m-%d'))
+    for entry in db.hours_ledger.find({'logged_at': {'$gte': since}}, {'logged_at': 1}):
+        days.add(entry['logged_at'].strftime('%Y-%m-%d'))
+    return sorted(days)
+
+def _day_range(days, field):
+    """Match stage limiting a date field to the touched days"""
+    if days is None:
+        return [{'$match': {field: {'$ne': None}}}]
+    start = datetime.strptime(days[0], '%Y-%m-%d')
+    return [
+        {'$match': {field: {'$gte': start}}},
+        {'$match': {'$expr': {'$in': [_day('$' + field), days]}}},
+    ]
+
+def _event_counts(days, field, key):
+    return _day_range(days, 'created_at') + _count_map(_day('$created_at'), key) + [
+        {'$project': {field: {'$arrayToObject': '$counts'}}}
+    ]
+
+def _user_counts(days):
+    return _day_range(days, 'created_at') + _count_map(_day('$created_at'), '$role') + [
+        {'$project': {'users_by_role': {'$arrayToObject': '$counts'}}}
+    ]
+
+def _registration_counts(days):
+    registration_day = {'$substrBytes': ['$participants.registration_date', 0, 10]}
+
+    pipeline = [
+        {'$match': {'participants.registration_date': {'$gte': days[0]} if days else {'$ne': None}}},
+        {'$unwind': '$participants'},
+        {'$match': {'participants.registration_date': {'$ne': None}}}
+    ]
+    if days is not None:
+        pipeline.append({'$match': {'$expr': {'$in': [registration_day, days]}}})
+    return pipeline + _count_map(registration_day, '$participants.role') + [
+        {'$project': {'registrations_by_role': {'$arrayToObject': '$counts'}}}
+    ]
+
+def _activity(days):
+    return _day_range(days, 'logged_at') + [
+        {'$group': {
+            '_id': _day('$logged_at'),
+            'hours': {'$sum': '$hours'},
+            'points': {'$sum': '$points'},
+            'ledger_entries': {'$sum': 1}
+        }}
+    ]
+
+def _rollup_pipeline(days):
+    """Pipeline on events building each day's complete rollup document
+
+    Every source yields its own fields per day; they are combined into one
+    document per day, with empty maps and zeros for what a day has none of.
+    """
+    pipeline = _event_counts(days, 'events_by_category', '$category')
+    for collection, branch in (
+        ('events', _event_counts(days, 'events_by_status', '$status')),
+        ('users', _user_counts(days)),
+        ('events', _registration_counts(days)),
+        ('hours_ledger', _activity(days)),
+    ):
+        pipeline.append({'$unionWith': {'coll': collection, 'pipeline': branch}})
+
+    combined = {'_id': '$_id'}
+    combined.update({field: {'$mergeObjects': '$' + field} for field in COUNT_MAP_FIELDS})
+    combined.update({field: {'$sum': '$' + field} for field in NUMBER_FIELDS})
+    pipeline.append({'$group': combined})
+    return pipeline
+
+def _rebuild_all():
+    """Build every day into a scratch collection, then swap it in for the rollups in one rename"""
+    db.events.aggregate(_rollup_pipeline(None) + [{'$out': ROLLUP_BUILD_COLLECTION}])
+    if ROLLUP_BUILD_COLLECTION in db.list_collection_names():
+        db[ROLLUP_BUILD_COLLECTION].rename(ROLLUP_COLLECTION, dropTarget=True)
+    else:
+        # Nothing to count
+        db[ROLLUP_COLLECTION].drop()
+
+def _rebuild_days(days, refreshed_at):
+    """Replace each touched day's document in one write, then drop the days left with nothing"""
+    db.events.aggregate(_rollup_pipeline(days) + [
+        {'$set': {'refreshed_at': refreshed_at}},
+        {'$merge': {'into': ROLLUP_COLLECTION, 'on': '_id', 'whenMatched': 'replace', 'whenNotMatched': 'insert'}}
+    ])
+    db[ROLLUP_COLLECTION].delete_many({'_id': {'$in': days}, 'refreshed_at': {'$ne': refreshed_at}})
+
+def refresh_rollups(full=False):
+    """Recompute the daily rollups for every day touched since the last refresh
+
+    Readers see each day's old figures until its new document replaces them.
+    Returns the number of days recomputed (None for a full rebuild).
+    """
+    # Milliseconds, as stored, so the days written by this refresh can be matched exactly
+    now = datetime.utcnow()
+    started_at = now.replace(microsecond=now.microsecond // 1000 * 1000)
+    state = db.rollup_state.find_one({'_id': ROLLUP_COLLECTION}) or {}
+
+    if full or not state.get('refreshed_at'):
+        days = None
+        _rebuild_all()
+    else:
+        days = _touched_days(state['refreshed_at'])
+        if not days:
+            db.rollup_state.update_one({'_id': ROLLUP_COLLECTION}, {'$set': {'refreshed_at': started_at}}, upsert=True)
+            return 0
+        _rebuild_days(days, started_at)
+
+    # Writes that landed while the refresh ran are picked up by the next one
+    db.rollup_state.update_one({'_id': ROLLUP_COLLECTION}, {'$set': {'refreshed_at': started_at}}, upsert=True)
+    db[DIRTY_DAYS_COLLECTION].delete_many({'marked_at': {'$lt': started_at}})
+    print(f"Refreshed rollups for {'all' if days is None else len(days)} days")
+    return None if days is None else len(days)
+
+def get_stats(start_day=None, end_day=None):
+    """Read the daily rollups for a day range (one _id range scan) and sum them into totals"""
+    query = {}
+    if start_day or end_day:
+        query['_id'] = {}
+        if start_day:
+            query['_id']['$gte'] = start_day
+        if end_day:
+            query['_id']['$lte'] = end_day
+
+    days = list(db[ROLLUP_COLLECTION].find(query).sort('_id', 1))
+
+    totals = {field: {} for field in COUNT_MAP_FIELDS}
+    totals.update({field: 0 for field in NUMBER_FIELDS})
+    for day in days:
+        day['day'] = day.pop('_id')
+        day.pop('refreshed_at', None)
+        for field in COUNT_MAP_FIELDS:
+            for key, count in day.get(field, {}).items():
+                totals[field][key] = totals[field].get(key, 0) + count
+        for field in NUMBER_FIELDS:
+            totals[field] += day.get(field, 0)
+
+    return {
+        'days': days,
+        'totals': totals
+    }
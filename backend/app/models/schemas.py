@@ -0,0 +1,138 @@
+from typing import Any, Dict, List, Literal, Optional, Union
+import msgspec
+from msgspec import UNSET, UnsetType
+
+# Request bodies are decoded straight into these types: parsing, validation and
+# type coercion happen in one pass, and keys a schema does not name are dropped.
+
+class SchemaError(ValueError):
+    """A request body does not match its schema"""
+
+def decode(data, schema, strict=False):
+    """Decode a JSON body into `schema`; numbers and booleans sent as strings are accepted unless strict"""
+    try:
+        return msgspec.json.decode(data, type=schema, strict=strict)
+    except msgspec.DecodeError as e:
+        raise SchemaError(str(e))
+
+def convert(obj, schema, strict=False):
+    """Validate an already-decoded dict against `schema`"""
+    try:
+        return msgspec.convert(obj, schema, strict=strict)
+    except msgspec.ValidationError as e:
+        raise SchemaError(str(e))
+
+def to_fields(struct):
+    """The fields of a decoded struct that were given, as a dict ready for MongoDB"""
+    return {
+        field: value
+        for field in struct.__struct_fields__
+        if (value := getattr(struct, field)) is not UNSET
+    }
+
+def _require_text(struct, fields):
+    for field in fields:
+        value = getattr(struct, field)
+        if value is not UNSET and not value:
+            raise ValueError(f'{field} must not be empty')
+
+def _check_coordinates(struct):
+    latitude, longitude = struct.latitude, struct.longitude
+    if (latitude in (None, UNSET)) != (longitude in (None, UNSET)):
+        raise ValueError('latitude and longitude must be given together')
+    if latitude not in (None, UNSET) and not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError('latitude must be within -90..90 and longitude within -180..180')
+
+def _partial(schema, name, forbid_unknown_fields=False):
+    """A copy of `schema` where every field is optional and fields not given stay UNSET"""
+    namespace = {}
+    if hasattr(schema, '__post_init__'):
+        namespace['__post_init__'] = schema.__post_init__
+    return msgspec.defstruct(
+        name,
+        [(field.name, Union[field.type, UnsetType], UNSET) for field in msgspec.structs.fields(schema)],
+        kw_only=True,
+        forbid_unknown_fields=forbid_unknown_fields,
+        namespace=namespace
+    )
+
+EVENT_REQUIRED_FIELDS = ('event_name', 'description', 'start_date', 'end_date', 'location', 'category')
+
+class EventCreate(msgspec.Struct, kw_only=True):
+    event_name: str
+    description: str
+    start_date: str
+    end_date: str
+    location: str
+    category: str
+    publish_event: bool = False
+    points_awarded: int = 0
+    hours_required: int = 0
+    participant_limit: int = 0
+    age_restriction: str = 'No Restriction'
+    contact_information: str = ''
+    image_id: Optional[str] = None
+    event_image: Optional[str] = None
+    requirements: List[str] = []
+    skills_needed: List[str] = []
+    status: Optional[str] = None
+    # Coordinates for the events-near-me search; without them `location` is geocoded
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+    def __post_init__(self):
+        _require_text(self, EVENT_REQUIRED_FIELDS)
+        _check_coordinates(self)
+
+# Edit forms send the whole event back; server-maintained fields (participants,
+# created_at, event_images, ...) are not in the schema and never written
+EventUpdate = _partial(EventCreate, 'EventUpdate')
+
+class VolunteerProfile(msgspec.Struct, kw_only=True):
+    skills: List[str] = []
+    interests: List[str] = []
+    bio: str = ''
+    availability: str = ''
+    phone_number: str = ''
+    photo_url: str = ''
+    address: str = ''
+
+class ParticipantProfile(msgspec.Struct, kw_only=True):
+    disability_type: str = ''
+    interests: List[str] = []
+    phone_number: str = ''
+    emergency_contact: str = ''
+    age: Union[int, str] = ''
+    photo_url: str = ''
+    address: str = ''
+    special_needs: str = ''
+
+class AdminProfile(msgspec.Struct, kw_only=True):
+    department: str = 'General'
+    phone_number: str = ''
+    photo_url: str = ''
+    permissions: List[str] = msgspec.field(default_factory=lambda: ['manage_events', 'view_users'])
+
+# Profile fields each role gives at registration
+PROFILE_SCHEMAS = {
+    'volunteer': VolunteerProfile,
+    'participant': ParticipantProfile,
+    'admin': AdminProfile
+}
+
+# Profile merge patches: any subset of the same fields, and nothing else
+PROFILE_PATCH_SCHEMAS = {
+    role: _partial(schema, schema.__name__ + 'Patch', forbid_unknown_fields=True)
+    for role, schema in PROFILE_SCHEMAS.items()
+}
+
+class Registration(msgspec.Struct, kw_only=True):
+    name: str
+    email: str
+    password: str
+    role: Literal['volunteer', 'participant', 'admin'] = 'volunteer'
+    # Checked against the role's profile schema once the role is known
+    profile: Dict[str, Any] = {}
+
+    def __post_init__(self):
+        _require_text(self, ('name', 'email', 'password'))
@@ -1,33 +1,259 @@
 from datetime import datetime
 from app import db, bcrypt
+from app.utils.cache import LocalCache, on_change, invalidate
+from app.utils.fields import build_projection, select_fields
+from app.utils import identity_map
+from app.utils.read_routing import read_from
+from app.models.schemas import PROFILE_SCHEMAS, PROFILE_PATCH_SCHEMAS, SchemaError, convert, to_fields
+from app.utils.achievements import calculate_level, earned_badges, needs_criterion, badge_id
 from bson import ObjectId
+from bson.errors import InvalidId
+import base64
+import json
+import re
 
-def serialize_user(user):
-    """Serialize user object to dictionary, excluding sensitive information"""
+# Kept current across workers by the change stream invalidation bus
+user_cache = LocalCache('users', max_size=4096)
+on_change('users', user_cache.delete)
+identity_map.track('users')
+
+# Fields returned by serialize_user; used as the server-side projection for listings
+USER_PUBLIC_PROJECTION = {'name': 1, 'email': 1, 'role': 1, 'profile': 1}
+
+# Profile entries that can be requested on their own, e.g. fields=name,profile.points
+USER_PROFILE_FIELDS = (
+    'points', 'hours_contributed', 'skills', 'interests', 'bio', 'availability', 'photo_url',
+    'badges', 'level', 'certificates', 'events_participated', 'events_attended', 'phone_number', 'address'
+)
+
+# fields= allow-list: output field -> projection it is read from
+USER_FIELD_SOURCES = dict(
+    {field: {field: 1} for field in USER_PUBLIC_PROJECTION},
+    **{f'profile.{field}': {f'profile.{field}': 1} for field in USER_PROFILE_FIELDS},
+    id={'_id': 1}
+)
+
+# Profile totals that only the hours ledger may change
+LEDGER_FIELDS = ('points', 'hours_contributed')
+
+# Profile entries maintained by the server (ledger, event registration, certificates,
+# level and badges); profile edits never write them
+SERVER_PROFILE_FIELDS = LEDGER_FIELDS + (
+    'events_participated', 'events_attended', 'certificates', 'badges', 'level', 'permissions'
+)
+
+def _server_profile_defaults(role):
+    """Initial values of the server-maintained profile entries for a new user"""
+    if role == 'volunteer':
+        return {'points': 0, 'hours_contributed': 0, 'level': 1, 'events_participated': [], 'certificates': [], 'badges': []}
+    if role == 'participant':
+        return {'events_attended': []}
+    return {}
+
+# Page size bounds for the admin user directory
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Filtered counts stop here so they never turn into a scan of the whole collection
+COUNT_LIMIT = 10000
+
+def serialize_user(user, fields=None):
+    """Serialize user object to dictionary, excluding sensitive information
+
+    With `fields`, only those fields (and the id) are returned; requested
+    profile entries are returned inside `profile`.
+    """
     if user:
         user_dict = {
             'id': str(user['_id']),
-            'name': user['name'],
-            'email': user['email'],
-            'role': user['role'],
+            'name': user.get('name'),
+            'email': user.get('email'),
+            'role': user.get('role'),
             'profile': user.get('profile', {})
         }
+        if fields is not None:
+            user_dict = select_fields(user_dict, fields, always=('id',))
+            profile_fields = [field.split('.', 1)[1] for field in fields if field.startswith('profile.')]
+            if profile_fields and 'profile' not in fields:
+                profile = user.get('profile', {})
+                user_dict['profile'] = {field: profile[field] for field in profile_fields if field in profile}
         return user_dict
     return None
 
+def ensure_user_indexes():
+    """Create the indexes used by user lookups and the admin directory"""
+    db.users.create_index('email')
+    db.users.create_index([('role', 1), ('_id', 1)])
+    db.users.create_index([('name_lower', 1), ('_id', 1)])
+    db.users.create_index([('email_lower', 1), ('_id', 1)])
+
+    # Backfill search keys for users created before they existed
+    db.users.update_many(
+        {'name_lower': {'$exists': False}},
+        [{'$set': {'name_lower': {'$toLower': '$name'}, 'email_lower': {'$toLower': '$email'}}}]
+    )
+
+    backfill_achievements()
+
+def backfill_achievements():
+    """Give badges stored as plain ids an (unknown) earned date, and levels and
+    badges to volunteers whose achievements were never evaluated"""
+    db.users.update_many(
+        {'profile.badges': {'$type': 'string'}},
+        [{'$set': {'profile.badges': {'$map': {
+            'input': '$profile.badges',
+            'as': 'badge',
+            'in': {'$cond': [
+                {'$eq': [{'$type': '$$badge'}, 'string']},
+                {'id': '$$badge', 'earned_at': None},
+                '$$badge'
+            ]}
+        }}}}]
+    )
+    for user in db.users.find({'role': 'volunteer', 'profile.level': {'$exists': False}}, {'_id': 1}):
+        update_achievements(user['_id'])
+
+def update_achievements(user_id):
+    """Store a volunteer's level for their points and award the badges they newly qualify for
+
+    Called whenever points or hours change, so reads only return stored state.
+    Badges are kept once earned, with the date they were awarded. Returns the
+    ids of the badges awarded.
+    """
+    user = db.users.find_one(
+        {'_id': ObjectId(user_id), 'role': 'volunteer'},
+        {'profile.points': 1, 'profile.hours_contributed': 1, 'profile.events_participated': 1,
+         'profile.badges': 1, 'profile.level': 1}
+    )
+    if not user:
+        return []
+
+    profile = user.get('profile', {})
+    points = profile.get('points', 0)
+    hours = profile.get('hours_contributed', 0)
+    held = {badge_id(badge) for badge in profile.get('badges', [])}
+    event_ids = profile.get('events_participated', [])
+    stats = {'points': points, 'hours': hours, 'events': len(event_ids), 'level': calculate_level(points)}
+    if needs_criterion('categories', held):
+        stats['categories'] = len(db.events.distinct(
+            'category', {'_id': {'$in': [ObjectId(event_id) for event_id in event_ids if ObjectId.is_valid(event_id)]}}
+        ))
+
+    awarded = [badge for badge in earned_badges(stats) if badge not in held]
+    if not awarded and profile.get('level') == stats['level']:
+        return []
+
+    update = {'$set': {'profile.level': stats['level']}}
+    if awarded:
+        now = datetime.utcnow()
+        update['$push'] = {'profile.badges': {'$each': [{'id': badge, 'earned_at': now} for badge in awarded]}}
+    # Totals changed meanwhile: that change evaluates again with the newer totals
+    result = db.users.update_one({'_id': user['_id'], 'profile.points': points, 'profile.hours_contributed': hours}, update)
+    if not result.modified_count:
+        return []
+    invalidate('users', user['_id'])
+    return awarded
+
+class CursorError(ValueError):
+    """A page cursor that list_users did not produce"""
+
+def _search_field(search):
+    # One indexed field per search, so (field, _id) gives the page order
+    return 'email_lower' if '@' in search else 'name_lower'
+
+def _encode_cursor(value, user_id):
+    return base64.urlsafe_b64encode(json.dumps([value, str(user_id)]).encode()).decode()
+
+def _decode_cursor(cursor):
+    try:
+        value, user_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return value, ObjectId(user_id)
+    except (ValueError, TypeError, InvalidId):
+        raise CursorError('Invalid cursor')
+
+def list_users(role=None, search=None, after=None, limit=DEFAULT_PAGE_SIZE, fields=None):
+    """Get one page of users, starting after the given cursor
+
+    Pages are ordered by _id, or for a search by the searched field (the name,
+    or the email when the search contains "@") and then _id, so each page is a
+    bounded read of the (field, _id) index. With `fields`, only the stored
+    fields behind them are read. Raises CursorError for a malformed cursor.
+    Returns (users, next_cursor, total, total_is_estimate).
+    """
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+
+    query = {}
+    if role:
+        query['role'] = role
+    search = search.strip().lower() if search else ''
+    field = _search_field(search) if search else None
+    if field:
+        query[field] = {'$regex': '^' + re.escape(search)}
+
+    # Secondaries when the route allows it (see app/utils/read_routing.py)
+    users_collection = read_from(db.users)
+
+    # Total is taken before the cursor condition so it describes the whole result set
+    if query:
+        total = users_collection.count_documents(query, limit=COUNT_LIMIT)
+        total_is_estimate = total >= COUNT_LIMIT
+    else:
+        total = users_collection.estimated_document_count()
+        total_is_estimate = True
+
+    if after and field:
+        value, after_id = _decode_cursor(after)
+        query = {'$and': [query, {'$or': [{field: {'$gt': value}}, {field: value, '_id': {'$gt': after_id}}]}]}
+    elif after:
+        if not ObjectId.is_valid(after):
+            raise CursorError('Invalid cursor')
+        query['_id'] = {'$gt': ObjectId(after)}
+
+    projection = build_projection(fields, USER_FIELD_SOURCES) if fields else dict(USER_PUBLIC_PROJECTION)
+    if field:
+        projection[field] = 1
+    sort = [(field, 1), ('_id', 1)] if field else [('_id', 1)]
+
+    # Fetch one extra document to know whether another page exists
+    users = list(users_collection.find(query, projection).sort(sort).limit(limit + 1))
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        last = users[-1]
+        next_cursor = _encode_cursor(last.get(field), last['_id']) if field else str(last['_id'])
+
+    return users, next_cursor, total, total_is_estimate
+
 def get_user_by_email(email):
     """Find a user by email"""
     return db.users.find_one({'email': email})
 
-def get_user_by_id(user_id):
-    """Find a user by ID"""
+def get_user_by_id(user_id, fields=None):
+    """Find a user by ID
+
+    With `fields`, a cache miss reads only what those fields need (and is not cached).
+    Full documents are kept for the rest of the request, so repeat calls are free.
+    """
     try:
-        return db.users.find_one({'_id': ObjectId(user_id)})
+        key = str(ObjectId(user_id))
+        user = identity_map.get('users', key) or user_cache.get(key)
+        if user is None and fields is not None:
+            return db.users.find_one({'_id': ObjectId(user_id)}, build_projection(fields, USER_FIELD_SOURCES))
+        if user is None:
+            version = user_cache.version()
+            user = db.users.find_one({'_id': ObjectId(user_id)})
+            if user:
+                user_cache.set(key, user, version)
+        return identity_map.put('users', user)
     except:
         return None
 
 def create_user(name, email, password, role='volunteer', additional_data=None):
-    """Create a new user"""
+    """Create a new user
+
+    `additional_data` is checked against the role's profile schema; a mismatch
+    raises SchemaError.
+    """
     # Check if user already exists
     if get_user_by_email(email):
         return None
@@ -35,47 +261,16 @@ def create_user(name, email, password, role='volunteer', additional_data=None):
     # Hash password
     hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
     
-    # Create profile object based on role
-    profile = {}
-    if role == 'volunteer':
-        profile = {
-            'skills': additional_data.get('skills', []) if additional_data else [],
-            'interests': additional_data.get('interests', []) if additional_data else [],
-            'bio': additional_data.get('bio', '') if additional_data else '',
-            'availability': additional_data.get('availability', '') if additional_data else '',
-            'points': 0,
-            'hours_contributed': 0,
-            'events_participated': [],
-            'phone_number': additional_data.get('phone_number', '') if additional_data else '',
-            'photo_url': '',
-            'address': additional_data.get('address', '') if additional_data else '',
-            'certificates': [],
-            'badges': []
-        }
-    elif role == 'participant':
-        profile = {
-            'disability_type': additional_data.get('disability_type', '') if additional_data else '',
-            'interests': additional_data.get('interests', []) if additional_data else [],
-            'events_attended': [],
-            'phone_number': additional_data.get('phone_number', '') if additional_data else '',
-            'emergency_contact': additional_data.get('emergency_contact', '') if additional_data else '',
-            'age': additional_data.get('age', '') if additional_data else '',
-            'photo_url': '',
-            'address': additional_data.get('address', '') if additional_data else '',
-            'special_needs': additional_data.get('special_needs', '') if additional_data else ''
-        }
-    elif role == 'admin':
-        profile = {
-            'department': additional_data.get('department', 'General') if additional_data else 'General',
-            'phone_number': additional_data.get('phone_number', '') if additional_data else '',
-            'photo_url': '',
-            'permissions': additional_data.get('permissions', ['manage_events', 'view_users']) if additional_data else ['manage_events', 'view_users']
-        }
+    # Role profile from the registration data, plus the entries the server maintains
+    profile = to_fields(convert(additional_data or {}, PROFILE_SCHEMAS[role]))
+    profile.update(_server_profile_defaults(role))
     
     # Create user document
     user = {
         'name': name,
         'email': email,
+        'name_lower': name.lower(),
+        'email_lower': email.lower(),
         'password': hashed_password,
         'role': role,
         'profile': profile,
@@ -101,17 +296,95 @@ def verify_password(user, password):
     return True
 
 def update_user_profile(user_id, profile_data):
-    """Update user profile"""
+    """Update user profile
+
+    Server-maintained entries (ledger totals, event lists, ...) are kept from
+    the stored document at write time, so a profile edit can never overwrite
+    them or race with a registration.
+    """
     try:
+        profile_data = {k: v for k, v in profile_data.items() if k not in SERVER_PROFILE_FIELDS}
+        kept_fields = {field: f'$profile.{field}' for field in SERVER_PROFILE_FIELDS}
         result = db.users.update_one(
             {'_id': ObjectId(user_id)},
-            {
+            [{
                 '$set': {
-                    'profile': profile_data,
+                    'profile': {'$mergeObjects': [{'$literal': profile_data}, kept_fields]},
                     'updated_at': datetime.utcnow()
                 }
-            }
+            }]
         )
+        invalidate('users', user_id)
         return result.modified_count > 0
     except:
-        return False 
\ No newline at end of file
+        return False 
+
+def set_user_active(user_id, active):
+    """Activate or deactivate an account; returns False if there is no such user"""
+    try:
+        result = db.users.update_one(
+            {'_id': ObjectId(user_id)},
+            {'$set': {'is_active': bool(active), 'updated_at': datetime.utcnow()}}
+        )
+    except:
+        return False
+    invalidate('users', user_id)
+    return result.matched_count > 0
+
+class ProfilePatchError(ValueError):
+    """A merge patch names a field the user may not edit, or has the wrong type"""
+
+def compile_profile_patch(role, patch, current_profile):
+    """Compile a JSON merge patch (RFC 7396) of a profile into a minimal update
+
+    Only entries that differ from `current_profile` are written, each with its
+    own dotted path; null removes an entry. Server-maintained entries are
+    ignored. Returns the update document, or None when nothing changes.
+    """
+    if not isinstance(patch, dict):
+        raise ProfilePatchError('profile must be an object')
+    schema = PROFILE_PATCH_SCHEMAS.get(role)
+    if schema is None:
+        raise ProfilePatchError(f"No editable profile for role: {role}")
+
+    patch = {field: value for field, value in patch.items() if field not in SERVER_PROFILE_FIELDS}
+    try:
+        values = to_fields(convert(
+            {field: value for field, value in patch.items() if value is not None}, schema, strict=True
+        ))
+    except SchemaError as e:
+        raise ProfilePatchError(f"Invalid profile: {str(e)}")
+
+    to_set = {
+        f'profile.{field}': value
+        for field, value in values.items()
+        if current_profile.get(field) != value
+    }
+    to_unset = {}
+    for field, value in patch.items():
+        if value is not None:
+            continue
+        if field not in schema.__struct_fields__:
+            raise ProfilePatchError(f"Unknown profile field: {field}")
+        if field in current_profile:
+            to_unset[f'profile.{field}'] = ''
+
+    if not to_set and not to_unset:
+        return None
+    update = {'$set': dict(to_set, updated_at=datetime.utcnow())}
+    if to_unset:
+        update['$unset'] = to_unset
+    return update
+
+def patch_user_profile(user, patch):
+    """Apply a profile merge patch; returns True if anything was written
+
+    The diff is taken against `user` (the caller's current document), and the
+    write touches only the changed paths.
+    """
+    update = compile_profile_patch(user.get('role'), patch, user.get('profile', {}))
+    if update is None:
+        return False
+    db.users.update_one({'_id': user['_id']}, update)
+    invalidate('users', user['_id'])
+    return True
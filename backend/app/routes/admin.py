@@ -0,0 +1,123 @@
+from flask import Blueprint, request, jsonify
+from app.models.rollup import get_stats, refresh_rollups
+from app.models.message_job import enqueue_job, get_job, list_jobs, serialize_job
+from app.models.user import set_user_active
+from app.models.revocation import revoke_user_tokens
+from app.utils.auth_utils import admin_required, TOKEN_LIFETIME
+from app.utils.compression import compression_stats
+from datetime import datetime
+
+admin_bp = Blueprint('admin', __name__)
+
+# Get dashboard statistics from the daily rollups
+@admin_bp.route('/stats', methods=['GET'])
+@admin_required
+def get_dashboard_stats(current_user):
+    start_day = request.args.get('from')
+    end_day = request.args.get('to')
+    
+    # Days are compared as 'YYYY-MM-DD' strings against the rollup ids
+    for day in (start_day, end_day):
+        if day:
+            try:
+                datetime.strptime(day, '%Y-%m-%d')
+            except ValueError:
+                return jsonify({'error': 'Dates must be in YYYY-MM-DD format'}), 400
+    
+    return jsonify(get_stats(start_day, end_day)), 200
+
+# Refresh the daily rollups now instead of waiting for the scheduled refresh
+@admin_bp.route('/stats/refresh', methods=['POST'])
+@admin_required
+def refresh_dashboard_stats(current_user):
+    full = request.args.get('full', '').lower() == 'true'
+    
+    try:
+        days = refresh_rollups(full=full)
+    except Exception as e:
+        print(f"Error refreshing rollups: {str(e)}")
+        return jsonify({'error': f'Failed to refresh statistics: {str(e)}'}), 500
+    
+    return jsonify({
+        'message': 'Statistics refreshed successfully',
+        'days_refreshed': days
+    }), 200
+
+# Queue a message to every user in an audience; delivery happens in the message workers
+@admin_bp.route('/messages', methods=['POST'])
+@admin_required
+def send_message(current_user):
+    data = request.get_json(silent=True)
+    
+    if not isinstance(data, dict) or not all(data.get(k) for k in ['audience', 'subject', 'body']):
+        return jsonify({'error': 'Missing audience, subject or body'}), 400
+    if not all(isinstance(data[k], str) and data[k].strip() for k in ['subject', 'body']):
+        return jsonify({'error': 'subject and body must be non-empty strings'}), 400
+    if not isinstance(data['audience'], dict):
+        return jsonify({'error': 'Invalid audience'}), 400
+    
+    job = enqueue_job(
+        audience=data['audience'],
+        subject=data['subject'],
+        body=data['body'],
+        created_by=str(current_user['_id'])
+    )
+    
+    if not job:
+        return jsonify({'error': 'Invalid audience'}), 400
+    
+    return jsonify({
+        'message': 'Message queued for delivery',
+        'job': serialize_job(job)
+    }), 202
+
+# List recent message jobs
+@admin_bp.route('/messages', methods=['GET'])
+@admin_required
+def get_messages(current_user):
+    jobs = [serialize_job(job) for job in list_jobs()]
+    
+    return jsonify({
+        'jobs': jobs,
+        'count': len(jobs)
+    }), 200
+
+# Get delivery progress for a message job
+@admin_bp.route('/messages/<job_id>', methods=['GET'])
+@admin_required
+def get_message(current_user, job_id):
+    job = get_job(job_id)
+    
+    if not job:
+        return jsonify({'error': 'Message job not found'}), 404
+    
+    return jsonify(serialize_job(job)), 200
+
+# Deactivate (or reactivate) an account; a deactivated user's tokens stop working at once
+@admin_bp.route('/users/<user_id>/active', methods=['PUT'])
+@admin_required
+def set_account_active(current_user, user_id):
+    data = request.get_json(silent=True)
+    
+    if not isinstance(data, dict) or not isinstance(data.get('active'), bool):
+        return jsonify({'error': 'active must be true or false'}), 400
+    if user_id == str(current_user['_id']) and not data['active']:
+        return jsonify({'error': 'You cannot deactivate your own account'}), 400
+    
+    if not set_user_active(user_id, data['active']):
+        return jsonify({'error': 'User not found'}), 404
+    
+    # Tokens from before a deactivation stay revoked after reactivation: the user logs in again
+    if not data['active']:
+        revoke_user_tokens(user_id, TOKEN_LIFETIME)
+    
+    return jsonify({
+        'message': 'User activated' if data['active'] else 'User deactivated',
+        'active': data['active']
+    }), 200
+
+# Response compression ratios and CPU time per encoding for this server process
+@admin_bp.route('/compression', methods=['GET'])
+@admin_required
+def get_compression_stats(current_user):
+    return jsonify(compression_stats()), 200
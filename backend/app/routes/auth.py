@@ -1,39 +1,28 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g
 from app.models.user import create_user, get_user_by_email, verify_password, serialize_user, get_user_by_id
-from app.utils.auth_utils import generate_token, JWT_SECRET_KEY
+from app.models.revocation import revoke_token, revoke_user_tokens
+from app.utils.auth_utils import generate_token, token_required, token_revoked, JWT_SECRET_KEY, TOKEN_LIFETIME
+from app.models.schemas import Registration, SchemaError, decode
+from app.services.activity_buffer import record_activity
 from datetime import datetime
-from bson.objectid import ObjectId
-from app import db
 import jwt
 
 auth_bp = Blueprint('auth', __name__)
 
 @auth_bp.route('/register', methods=['POST'])
 def register():
-    data = request.get_json()
-    
-    # Validate required fields
-    if not all(k in data for k in ['name', 'email', 'password']):
-        return jsonify({'error': 'Missing required fields'}), 400
-    
-    # Validate role if provided
-    role = data.get('role', 'volunteer')
-    if role not in ['volunteer', 'participant', 'admin']:
-        return jsonify({'error': 'Invalid role'}), 400
-    
-    # Extract additional profile data if provided
-    additional_data = {}
-    if 'profile' in data:
-        additional_data = data['profile']
-    
-    # Create user
-    user = create_user(
-        name=data['name'],
-        email=data['email'],
-        password=data['password'],
-        role=role,
-        additional_data=additional_data
-    )
+    # Required fields, role and the role's profile are all checked while decoding
+    try:
+        data = decode(request.get_data(), Registration)
+        user = create_user(
+            name=data.name,
+            email=data.email,
+            password=data.password,
+            role=data.role,
+            additional_data=data.profile
+        )
+    except SchemaError as e:
+        return jsonify({'error': f'Invalid registration: {str(e)}'}), 400
     
     if not user:
         return jsonify({'error': 'User with this email already exists'}), 400
@@ -42,15 +31,12 @@ def register():
     user_id = user['id']
     
     # Generate token for auto login
-    token = generate_token(user_id, role)
+    token = generate_token(user_id, data.role)
     
-    # Update last login time
-    db.users.update_one(
-        {'_id': ObjectId(user_id)},
-        {'$set': {'last_login': datetime.utcnow()}}
-    )
+    # Update last login time (buffered and written in bulk)
+    record_activity(user_id, 'last_login')
     
-    print(f"User registered: {data['email']}, ID: {user_id}, Role: {role}")
+    print(f"User registered: {data.email}, ID: {user_id}, Role: {data.role}")
     
     return jsonify({
         'message': 'User registered successfully',
@@ -77,11 +63,11 @@ def login():
     if not verify_password(user, data['password']):
         return jsonify({'error': 'Invalid password. Please try again.'}), 401
     
-    # Update last login time
-    db.users.update_one(
-        {'_id': user['_id']},
-        {'$set': {'last_login': datetime.utcnow()}}
-    )
+    if user.get('is_active') is False:
+        return jsonify({'error': 'This account has been deactivated.'}), 403
+    
+    # Update last login time (buffered and written in bulk)
+    record_activity(user['_id'], 'last_login')
     
     # Convert ObjectId to string for JWT
     user_id_str = str(user['_id'])
@@ -117,12 +103,12 @@ def validate_token():
         if not user:
             return jsonify({'valid': False, 'message': 'User not found'}), 401
         
+        if token_revoked(data) or user.get('is_active') is False:
+            return jsonify({'valid': False, 'message': 'Token has been revoked'}), 401
+        
         # Check if token is expired - this is handled by the jwt.decode function
-        # Update last access time
-        db.users.update_one(
-            {'_id': ObjectId(user_id)},
-            {'$set': {'last_access': datetime.utcnow()}}
-        )
+        # Update last access time (buffered and written in bulk)
+        record_activity(user_id, 'last_access')
         
         # Return user data
         return jsonify({
@@ -134,4 +120,25 @@ def validate_token():
     except jwt.ExpiredSignatureError:
         return jsonify({'valid': False, 'message': 'Token has expired'}), 401
     except jwt.InvalidTokenError:
-        return jsonify({'valid': False, 'message': 'Invalid token'}), 401 
\ No newline at end of file
+        return jsonify({'valid': False, 'message': 'Invalid token'}), 401 
+
+@auth_bp.route('/logout', methods=['POST'])
+@token_required
+def logout(current_user):
+    """Revoke the token used for this request, or with {"all": true} every token of the user"""
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    claims = g.get('token_claims')
+    if claims is None:
+        return jsonify({'error': 'Send the token to revoke in the Authorization header'}), 400
+    
+    # Tokens issued before they had ids can only be revoked all together
+    if data.get('all') or 'jti' not in claims:
+        revoke_user_tokens(current_user['_id'], TOKEN_LIFETIME)
+        print(f"All tokens revoked for user {current_user['_id']}")
+        return jsonify({'message': 'Logged out on all devices'}), 200
+    
+    revoke_token(claims['jti'], current_user['_id'], datetime.utcfromtimestamp(claims['exp']))
+    print(f"Token revoked for user {current_user['_id']}")
+    return jsonify({'message': 'Logged out successfully'}), 200
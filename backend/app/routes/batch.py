@@ -0,0 +1,81 @@
+from flask import Blueprint, request, jsonify, current_app
+from app.utils.auth_utils import token_required, BATCH_USER_ENVIRON_KEY
+from app.utils.read_routing import LAST_WRITE_HEADER
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.test import EnvironBuilder
+import os
+
+batch_bp = Blueprint('batch', __name__)
+
+MAX_SUB_REQUESTS = 20
+
+# Threads shared by all batches for running sub-requests side by side
+BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', 8))
+
+_executor = None
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix='batch')
+    return _executor
+
+def _run_sub_request(app, sub_request, current_user, headers):
+    """Dispatch one GET through the app's own routing, as the batch's user"""
+    builder = EnvironBuilder(
+        path='/api' + sub_request['path'],
+        method='GET',
+        headers=headers
+    )
+    environ = builder.get_environ()
+    environ[BATCH_USER_ENVIRON_KEY] = current_user
+
+    with app.request_context(environ):
+        try:
+            response = app.full_dispatch_request()
+        except Exception as e:
+            print(f"Error in batch sub-request {sub_request['path']}: {str(e)}")
+            return {'id': sub_request['id'], 'status': 500, 'body': {'error': 'Internal server error'}}
+
+    return {
+        'id': sub_request['id'],
+        'status': response.status_code,
+        'body': response.get_json(silent=True)
+    }
+
+# Run several read requests in one round trip and one authentication
+@batch_bp.route('', methods=['POST'])
+@token_required
+def run_batch(current_user):
+    data = request.get_json(silent=True)
+    sub_requests = data.get('requests') if isinstance(data, dict) else None
+
+    if not isinstance(sub_requests, list) or not sub_requests:
+        return jsonify({'error': 'Provide a non-empty "requests" list'}), 400
+    if len(sub_requests) > MAX_SUB_REQUESTS:
+        return jsonify({'error': f'A batch may contain at most {MAX_SUB_REQUESTS} requests'}), 400
+
+    for index, sub_request in enumerate(sub_requests):
+        if not isinstance(sub_request, dict) or not isinstance(sub_request.get('path'), str):
+            return jsonify({'error': f'Request {index} must have a "path"'}), 400
+        if sub_request.get('method', 'GET').upper() != 'GET':
+            return jsonify({'error': f'Request {index}: only GET requests can be batched'}), 400
+        path = sub_request['path']
+        if not path.startswith('/') or path.split('?')[0].rstrip('/') == '/batch':
+            return jsonify({'error': f'Request {index} has an invalid path'}), 400
+        sub_request.setdefault('id', str(index))
+
+    # GETs do not change anything, so they are independent and can run side by side
+    app = current_app._get_current_object()
+    # Sub-requests see the batch's credentials and its last write (for read routing)
+    headers = {
+        name: request.headers[name]
+        for name in ('Authorization', LAST_WRITE_HEADER)
+        if name in request.headers
+    }
+    responses = list(_get_executor().map(
+        lambda sub_request: _run_sub_request(app, sub_request, current_user, headers),
+        sub_requests
+    ))
+
+    return jsonify({'responses': responses}), 200
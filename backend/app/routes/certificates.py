@@ -0,0 +1,34 @@
+from flask import Blueprint, jsonify, send_file
+from app.utils.certificates import certificate_path, CERTIFICATE_FORMATS
+import os
+import re
+
+certificates_bp = Blueprint('certificates', __name__)
+
+# Certificates never change once stored: a different name, event or hours value
+# produces a different key, so the files can be cached forever
+CERTIFICATE_MAX_AGE = 365 * 24 * 60 * 60
+
+KEY_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+# Serve a stored certificate by its content address
+@certificates_bp.route('/<key>.<fmt>', methods=['GET'])
+def get_certificate(key, fmt):
+    if not KEY_PATTERN.match(key) or fmt not in CERTIFICATE_FORMATS:
+        return jsonify({'error': 'Certificate not found'}), 404
+    
+    path = certificate_path(key, fmt)
+    if not os.path.exists(path):
+        return jsonify({'error': 'Certificate not found'}), 404
+    
+    response = send_file(
+        path,
+        mimetype=CERTIFICATE_FORMATS[fmt],
+        download_name=f"certificate-{key[:16]}.{fmt}",
+        etag=key,
+        max_age=CERTIFICATE_MAX_AGE,
+        conditional=True
+    )
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
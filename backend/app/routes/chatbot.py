@@ -0,0 +1,26 @@
+from flask import Blueprint, request, jsonify
+from app.services.chatbot import answer_query, MAX_RESULTS
+
+chatbot_bp = Blueprint('chatbot', __name__)
+
+# Longest question answered; the index only needs the words
+MAX_QUERY_LENGTH = 500
+
+# Answer a chatbot question from events, FAQs and the registration guide
+@chatbot_bp.route('/query', methods=['POST'])
+def query():
+    data = request.get_json(silent=True)
+    
+    if not isinstance(data, dict):
+        return jsonify({'error': 'query is required'}), 400
+    
+    text = data.get('query')
+    if not isinstance(text, str) or not text.strip():
+        return jsonify({'error': 'query is required'}), 400
+    
+    try:
+        limit = min(max(int(data.get('limit', 3)), 1), MAX_RESULTS)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'limit must be a number'}), 400
+    
+    return jsonify(answer_query(text[:MAX_QUERY_LENGTH], limit)), 200
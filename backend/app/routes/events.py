@@ -1,16 +1,42 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
 from app.models.event import (
     create_event, get_event_by_id, update_event, delete_event, 
-    get_all_events, register_for_event, cancel_registration, serialize_event
+    get_all_events, get_event_changes, register_for_event, cancel_registration, serialize_event,
+    EVENT_FIELD_SOURCES, EVENT_NOT_FOUND, NOT_REGISTERED, DEFAULT_RADIUS_KM, MAX_RADIUS_KM
 )
-from app.utils.auth_utils import token_required, admin_required, JWT_SECRET_KEY
+from app.models.ledger import get_event_hours
+from app.utils.auth_utils import token_required, admin_required, token_revoked, JWT_SECRET_KEY
+from app.utils.idempotency import idempotent
+from app.utils.certificates import certificate_fields, issue_certificates, CERTIFICATE_FORMATS
+from app.utils.images import is_stored_image
+from app.utils.fields import parse_fields, FieldsError
+from app.models.schemas import EventCreate, EventUpdate, SchemaError, decode
+from app.utils.read_routing import secondary_reads
+from app.services import event_feed
+from app import db
 from bson import ObjectId
+from datetime import datetime
 import jwt
 
 events_bp = Blueprint('events', __name__)
 
+def _is_admin_request():
+    """Whether the request carries an admin token (event listings are public, so none is required)"""
+    auth_header = request.headers.get('Authorization')
+    if auth_header and auth_header.startswith('Bearer '):
+        token = auth_header.split(' ')[1]
+        try:
+            data = jwt.decode(token, JWT_SECRET_KEY, algorithms=['HS256'])
+            is_admin = data.get('role') == 'admin' and not token_revoked(data)
+            print(f"User role from token: {data.get('role')}, is_admin: {is_admin}")
+            return is_admin
+        except Exception as e:
+            print(f"Error decoding token: {str(e)}")
+    return False
+
 # Get all events
 @events_bp.route('', methods=['GET'])
+@secondary_reads
 def get_events():
     # Get query parameters
     status = request.args.get('status')
@@ -18,17 +44,28 @@ def get_events():
     published_only = request.args.get('published', '').lower() == 'true'
     include_unpublished = request.args.get('include_unpublished', '').lower() == 'true'
     
-    # Check if user is admin (from token)
-    is_admin = False
-    auth_header = request.headers.get('Authorization')
-    if auth_header and auth_header.startswith('Bearer '):
-        token = auth_header.split(' ')[1]
+    try:
+        fields = parse_fields(request.args.get('fields'), EVENT_FIELD_SOURCES)
+    except FieldsError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Events near a position: near=latitude,longitude and radius in kilometres
+    near = None
+    radius_km = DEFAULT_RADIUS_KM
+    if request.args.get('near'):
         try:
-            data = jwt.decode(token, JWT_SECRET_KEY, algorithms=['HS256'])
-            is_admin = data.get('role') == 'admin'
-            print(f"User role from token: {data.get('role')}, is_admin: {is_admin}")
-        except Exception as e:
-            print(f"Error decoding token: {str(e)}")
+            latitude, longitude = (float(value) for value in request.args['near'].split(','))
+            radius_km = float(request.args.get('radius', DEFAULT_RADIUS_KM))
+        except ValueError:
+            return jsonify({'error': 'near must be "latitude,longitude" and radius a number of kilometres'}), 400
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            return jsonify({'error': 'near is not a valid position'}), 400
+        if not 0 < radius_km <= MAX_RADIUS_KM:
+            return jsonify({'error': f'radius must be between 0 and {MAX_RADIUS_KM} km'}), 400
+        near = (longitude, latitude)
+    
+    # Check if user is admin (from token)
+    is_admin = _is_admin_request()
     
     # Build filter criteria
     filter_criteria = {}
@@ -44,50 +81,101 @@ def get_events():
         show_published_only = False
     
     # Get events
-    events = get_all_events(filter_criteria, show_published_only)
+    events = get_all_events(filter_criteria, show_published_only, fields, near, radius_km)
+    
+    return jsonify({
+        'events': events,
+        'count': len(events)
+    }), 200
+
+# Get the events changed since a sync token, with the ids of deleted ones
+@events_bp.route('/changes', methods=['GET'])
+def get_events_changes():
+    # Tokens are opaque to clients; they are the server time of the previous sync in milliseconds
+    since = None
+    if request.args.get('since'):
+        try:
+            since = datetime.utcfromtimestamp(int(request.args['since']) / 1000)
+        except (ValueError, OverflowError, OSError):
+            return jsonify({'error': 'Invalid sync token'}), 400
+    
+    try:
+        fields = parse_fields(request.args.get('fields'), EVENT_FIELD_SOURCES)
+    except FieldsError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Read from the primary: a lagging secondary could miss changes for good
+    events, deleted, synced_at, full = get_event_changes(since, not _is_admin_request(), fields)
     
     return jsonify({
         'events': events,
+        'deleted': deleted,
+        'full': full,
+        'next_token': str(int((synced_at - datetime(1970, 1, 1)).total_seconds() * 1000)),
         'count': len(events)
     }), 200
 
+def _sse_response(subscription, initial=None):
+    return Response(event_feed.stream(subscription, initial), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        # Stop nginx buffering the stream
+        'X-Accel-Buffering': 'no'
+    })
+
+# Stream seat and status changes of every published event (Server-Sent Events)
+@events_bp.route('/stream', methods=['GET'])
+def stream_events():
+    try:
+        subscription = event_feed.subscribe(event_feed.CATALOGUE)
+    except event_feed.FeedFull:
+        return jsonify({'error': 'Too many open streams, try again later'}), 503
+    return _sse_response(subscription)
+
+# Stream one event's seat and status changes, starting with the current ones
+@events_bp.route('/<event_id>/stream', methods=['GET'])
+def stream_event(event_id):
+    try:
+        subscription = event_feed.subscribe(event_id)
+    except event_feed.FeedFull:
+        return jsonify({'error': 'Too many open streams, try again later'}), 503
+    
+    # Read after subscribing so a change in between is not missed
+    snapshot = event_feed.get_seat_snapshot(event_id)
+    if not snapshot or not snapshot['published']:
+        event_feed.unsubscribe(subscription)
+        return jsonify({'error': 'Event not found'}), 404
+    return _sse_response(subscription, snapshot)
+
 # Get event by ID
 @events_bp.route('/<event_id>', methods=['GET'])
 def get_event(event_id):
-    event = get_event_by_id(event_id)
+    try:
+        fields = parse_fields(request.args.get('fields'), EVENT_FIELD_SOURCES)
+    except FieldsError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    event = get_event_by_id(event_id, fields)
     
     if not event:
         return jsonify({'error': 'Event not found'}), 404
     
-    return jsonify(serialize_event(event)), 200
+    return jsonify(serialize_event(event, fields)), 200
 
 # Create a new event
 @events_bp.route('', methods=['POST'])
+@idempotent
 @admin_required
 def add_event(current_user):
     try:
-        data = request.get_json()
-        print("Received create event request with data:", data)
+        event_data = decode(request.get_data(), EventCreate)
+        print("Received create event request with data:", event_data)
         print(f"Request made by admin: {current_user['name']} (ID: {current_user['_id']})")
         
-        # Check for empty or None data
-        if not data:
-            print("Request data is empty or None")
-            return jsonify({'error': 'No data provided'}), 400
-        
-        # Validate required fields
-        required_fields = ['event_name', 'description', 'start_date', 'end_date', 'location', 'category']
-        missing_fields = [field for field in required_fields if not data.get(field)]
-        
-        if missing_fields:
-            print(f"Missing required fields: {missing_fields}")
-            return jsonify({
-                'error': f'Missing required fields: {", ".join(missing_fields)}'
-            }), 400
+        if event_data.image_id and not is_stored_image(event_data.image_id):
+            return jsonify({'error': 'Image not found, upload it to /api/images first'}), 400
         
         # Create event
-        print("Creating event with validated data")
-        event = create_event(data)
+        event = create_event(event_data)
         
         if not event:
             print("Failed to create event - create_event returned None")
@@ -98,6 +186,8 @@ def add_event(current_user):
             'message': 'Event created successfully',
             'event': event
         }), 201
+    except SchemaError as e:
+        return jsonify({'error': f'Invalid event data: {str(e)}'}), 400
     except Exception as e:
         print(f"Error in add_event: {str(e)}")
         return jsonify({'error': f'An error occurred: {str(e)}'}), 500
@@ -107,16 +197,19 @@ def add_event(current_user):
 @admin_required
 def update_event_route(current_user, event_id):
     try:
-        data = request.get_json()
-        print(f"Received update request for event {event_id} with data:", data)
+        event_data = decode(request.get_data(), EventUpdate)
+        print(f"Received update request for event {event_id} with data:", event_data)
         
-        # Check if event exists
+        # Check if event exists (update_event reuses this read from the identity map)
         event = get_event_by_id(event_id)
         if not event:
             return jsonify({'error': 'Event not found'}), 404
         
+        if event_data.image_id and not is_stored_image(event_data.image_id):
+            return jsonify({'error': 'Image not found, upload it to /api/images first'}), 400
+        
         # Update event
-        updated_event = update_event(event_id, data)
+        updated_event = update_event(event_id, event_data)
         
         if not updated_event:
             print(f"Failed to update event {event_id}")
@@ -126,6 +219,8 @@ def update_event_route(current_user, event_id):
             'message': 'Event updated successfully',
             'event': updated_event
         }), 200
+    except SchemaError as e:
+        return jsonify({'error': f'Invalid event data: {str(e)}'}), 400
     except Exception as e:
         print(f"Error in update_event_route: {str(e)}")
         return jsonify({'error': f'An error occurred: {str(e)}'}), 500
@@ -134,16 +229,9 @@ def update_event_route(current_user, event_id):
 @events_bp.route('/<event_id>', methods=['DELETE'])
 @admin_required
 def delete_event_route(current_user, event_id):
-    # Check if event exists
-    event = get_event_by_id(event_id)
-    if not event:
-        return jsonify({'error': 'Event not found'}), 404
-    
-    # Delete event
-    success = delete_event(event_id)
-    
-    if not success:
-        return jsonify({'error': 'Failed to delete event'}), 500
+    # Deleting and checking it existed are one call
+    if not delete_event(event_id):
+        return jsonify({'error': EVENT_NOT_FOUND}), 404
     
     return jsonify({
         'message': 'Event deleted successfully'
@@ -151,17 +239,10 @@ def delete_event_route(current_user, event_id):
 
 # Register for an event
 @events_bp.route('/<event_id>/register', methods=['POST'])
+@idempotent
 @token_required
 def register_for_event_route(current_user, event_id):
-    # Check if event exists and is published
-    event = get_event_by_id(event_id)
-    if not event:
-        return jsonify({'error': 'Event not found'}), 404
-    
-    if not event.get('publish_event', False):
-        return jsonify({'error': 'Event is not published'}), 400
-    
-    # Register for event
+    # Existence, publication, capacity and duplicates are checked by the registration update itself
     success, message = register_for_event(
         event_id=event_id,
         user_id=current_user['_id'],
@@ -169,7 +250,7 @@ def register_for_event_route(current_user, event_id):
     )
     
     if not success:
-        return jsonify({'error': message}), 400
+        return jsonify({'error': message}), 404 if message == EVENT_NOT_FOUND else 400
     
     return jsonify({
         'message': 'Successfully registered for event',
@@ -180,24 +261,13 @@ def register_for_event_route(current_user, event_id):
 @events_bp.route('/<event_id>/cancel', methods=['POST'])
 @token_required
 def cancel_registration_route(current_user, event_id):
-    # Check if event exists
-    event = get_event_by_id(event_id)
-    if not event:
-        return jsonify({'error': 'Event not found'}), 404
-    
-    # Check if user is registered
-    user_registered = any(
-        p.get('user_id') == str(current_user['_id']) 
-        for p in event.get('participants', [])
-    )
-    
-    if not user_registered:
-        return jsonify({'error': 'User is not registered for this event'}), 400
-    
-    # Cancel registration
-    success = cancel_registration(event_id, current_user['_id'])
+    success, message = cancel_registration(event_id, current_user['_id'])
     
     if not success:
+        if message == EVENT_NOT_FOUND:
+            return jsonify({'error': message}), 404
+        if message == NOT_REGISTERED:
+            return jsonify({'error': message}), 400
         return jsonify({'error': 'Failed to cancel registration'}), 500
     
     return jsonify({
@@ -219,4 +289,100 @@ def get_event_participants(current_user, event_id):
     return jsonify({
         'participants': participants,
         'count': len(participants)
-    }), 200 
\ No newline at end of file
+    }), 200 
+
+def _event_has_ended(event):
+    """Whether an event is completed, by status or because its end date has passed"""
+    if event.get('status', '').lower() == 'completed':
+        return True
+    return bool(event.get('end_date')) and event['end_date'] < datetime.utcnow().strftime('%Y-%m-%d')
+
+def _certificate_url(key, fmt):
+    return f"/api/certificates/{key}.{fmt}"
+
+# Issue certificates for every participant of a completed event
+@events_bp.route('/<event_id>/certificates', methods=['POST'])
+@admin_required
+def issue_event_certificates(current_user, event_id):
+    fmt = request.args.get('format', 'pdf').lower()
+    if fmt not in CERTIFICATE_FORMATS:
+        return jsonify({'error': 'Unsupported certificate format'}), 400
+    
+    event = get_event_by_id(event_id)
+    if not event:
+        return jsonify({'error': 'Event not found'}), 404
+    
+    if not _event_has_ended(event):
+        return jsonify({'error': 'Certificates can only be issued for completed events'}), 400
+    
+    participants = event.get('participants', [])
+    users = {
+        str(user['_id']): user
+        for user in db.users.find(
+            {'_id': {'$in': [ObjectId(p['user_id']) for p in participants]}},
+            {'name': 1}
+        )
+    }
+    hours = get_event_hours(event_id)
+    
+    issued = []
+    fields_list = []
+    for participant in participants:
+        user = users.get(participant['user_id'])
+        if not user:
+            continue
+        certificate_type = 'volunteer' if participant.get('role') == 'volunteer' else 'participant'
+        user_hours = hours.get(participant['user_id'], event.get('hours_required')) if certificate_type == 'volunteer' else None
+        fields_list.append(certificate_fields(event, user, certificate_type, user_hours))
+        issued.append({'user_id': participant['user_id'], 'certificate_type': certificate_type})
+    
+    try:
+        keys = issue_certificates(fields_list, fmt)
+    except Exception as e:
+        print(f"Error issuing certificates for event {event_id}: {str(e)}")
+        return jsonify({'error': f'Failed to issue certificates: {str(e)}'}), 500
+    
+    for certificate, key in zip(issued, keys):
+        certificate['certificate_id'] = key
+        certificate['url'] = _certificate_url(key, fmt)
+    
+    return jsonify({
+        'message': 'Certificates issued successfully',
+        'certificates': issued,
+        'count': len(issued)
+    }), 200
+
+# Get the current user's certificate for a completed event
+@events_bp.route('/<event_id>/certificate', methods=['GET'])
+@token_required
+def get_event_certificate(current_user, event_id):
+    fmt = request.args.get('format', 'pdf').lower()
+    if fmt not in CERTIFICATE_FORMATS:
+        return jsonify({'error': 'Unsupported certificate format'}), 400
+    
+    event = get_event_by_id(event_id)
+    if not event:
+        return jsonify({'error': 'Event not found'}), 404
+    
+    participant = next(
+        (p for p in event.get('participants', []) if p.get('user_id') == str(current_user['_id'])),
+        None
+    )
+    if not participant:
+        return jsonify({'error': 'User is not registered for this event'}), 400
+    
+    if not _event_has_ended(event):
+        return jsonify({'error': 'Certificates are available once the event is completed'}), 400
+    
+    certificate_type = 'volunteer' if participant.get('role') == 'volunteer' else 'participant'
+    hours = None
+    if certificate_type == 'volunteer':
+        hours = get_event_hours(event_id).get(str(current_user['_id']), event.get('hours_required'))
+    
+    [key] = issue_certificates([certificate_fields(event, current_user, certificate_type, hours)], fmt)
+    
+    return jsonify({
+        'certificate_id': key,
+        'certificate_type': certificate_type,
+        'url': _certificate_url(key, fmt)
+    }), 200
@@ -0,0 +1,102 @@
+from flask import Blueprint, request, jsonify
+from app.models.feedback import add_feedback, import_feedback_csv, get_feedback_summary, SENTIMENTS
+from app.models.event import get_event_by_id
+from app.utils.auth_utils import token_required, admin_required
+import io
+
+feedback_bp = Blueprint('feedback', __name__)
+
+RATING_FIELDS = ('overall', 'organization', 'accessibility', 'volunteers', 'content')
+TEXT_FIELDS = ('liked_most', 'improvements', 'additional_comments')
+
+# Submit feedback for an event (or for the chatbot when no event is given)
+@feedback_bp.route('', methods=['POST'])
+@token_required
+def submit_feedback(current_user):
+    data = request.get_json(silent=True)
+    
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Feedback must be a JSON object'}), 400
+    
+    event_id = data.get('event_id')
+    if event_id and not get_event_by_id(event_id):
+        return jsonify({'error': 'Event not found'}), 404
+    
+    submitted_ratings = data.get('ratings') or {}
+    if not isinstance(submitted_ratings, dict):
+        return jsonify({'error': 'ratings must be an object'}), 400
+    
+    ratings = {}
+    for field in RATING_FIELDS:
+        value = submitted_ratings.get(field)
+        if value is None:
+            continue
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            return jsonify({'error': f'Invalid {field} rating'}), 400
+        if not 1 <= value <= 5:
+            return jsonify({'error': 'Ratings must be between 1 and 5'}), 400
+        ratings[field] = value
+    
+    text = ' '.join(str(data.get(field, '')).strip() for field in TEXT_FIELDS if data.get(field)).strip()
+    if not text and not ratings:
+        return jsonify({'error': 'Feedback text or a rating is required'}), 400
+    
+    sentiment = data.get('sentiment')
+    if sentiment and sentiment not in SENTIMENTS:
+        return jsonify({'error': 'Invalid sentiment'}), 400
+    
+    feedback = add_feedback(
+        text,
+        event_id=event_id,
+        user_id=current_user['_id'],
+        ratings=ratings,
+        sentiment=sentiment,
+        source='event' if event_id else 'chatbot',
+        extra={field: data[field] for field in TEXT_FIELDS if data.get(field)}
+    )
+    
+    return jsonify({
+        'message': 'Feedback submitted successfully',
+        'feedback_id': str(feedback['_id']),
+        'sentiment': feedback['sentiment']
+    }), 201
+
+# Bulk import feedback from a CSV file (User_ID, Feedback, Sentiment columns)
+@feedback_bp.route('/import', methods=['POST'])
+@admin_required
+def import_feedback(current_user):
+    if 'file' in request.files:
+        content = request.files['file'].read().decode('utf-8-sig')
+    else:
+        content = request.get_data(as_text=True)
+    
+    if not content.strip():
+        return jsonify({'error': 'No CSV data provided'}), 400
+    
+    event_id = request.args.get('event_id')
+    if event_id and not get_event_by_id(event_id):
+        return jsonify({'error': 'Event not found'}), 404
+    
+    try:
+        imported = import_feedback_csv(io.StringIO(content), event_id=event_id)
+    except Exception as e:
+        print(f"Error importing feedback: {str(e)}")
+        return jsonify({'error': f'Failed to import feedback: {str(e)}'}), 500
+    
+    return jsonify({
+        'message': 'Feedback imported successfully',
+        'count': imported
+    }), 201
+
+# Get word cloud terms and sentiment counts, overall or for one event
+@feedback_bp.route('/summary', methods=['GET'])
+@admin_required
+def feedback_summary(current_user):
+    try:
+        limit = min(int(request.args.get('limit', 50)), 200)
+    except ValueError:
+        return jsonify({'error': 'Invalid limit'}), 400
+    
+    return jsonify(get_feedback_summary(request.args.get('event_id'), limit)), 200
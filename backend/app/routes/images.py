@@ -0,0 +1,55 @@
+from flask import Blueprint, request, jsonify, send_file
+from app.utils.auth_utils import admin_required
+from app.utils.images import (
+    store_image, variant_path, image_urls, ImageError,
+    IMAGE_ID_PATTERN, IMAGE_VARIANTS, IMAGE_FORMATS
+)
+import os
+
+images_bp = Blueprint('images', __name__)
+
+# A stored variant never changes: new content gets a new image id
+IMAGE_MAX_AGE = 365 * 24 * 60 * 60
+
+# Upload an image; every size and format is generated up front
+@images_bp.route('', methods=['POST'])
+@admin_required
+def upload_image(current_user):
+    if 'image' not in request.files:
+        return jsonify({'error': 'Upload an image file in the "image" field'}), 400
+
+    try:
+        image_id = store_image(request.files['image'].read())
+    except ImageError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error storing image: {str(e)}")
+        return jsonify({'error': 'Failed to store image'}), 500
+
+    return jsonify({
+        'message': 'Image uploaded successfully',
+        'image_id': image_id,
+        'urls': image_urls(image_id)
+    }), 201
+
+# Serve one stored variant
+@images_bp.route('/<image_id>/<variant>.<fmt>', methods=['GET'])
+def get_image(image_id, variant, fmt):
+    if not IMAGE_ID_PATTERN.match(image_id) or variant not in IMAGE_VARIANTS or fmt not in IMAGE_FORMATS:
+        return jsonify({'error': 'Image not found'}), 404
+
+    path = variant_path(image_id, variant, fmt)
+    if not os.path.exists(path):
+        return jsonify({'error': 'Image not found'}), 404
+
+    # conditional=True answers If-None-Match with 304 and Range with 206
+    response = send_file(
+        path,
+        mimetype=IMAGE_FORMATS[fmt][1],
+        etag=f"{image_id}-{variant}-{fmt}",
+        max_age=IMAGE_MAX_AGE,
+        conditional=True
+    )
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
@@ -1,9 +1,17 @@
 from flask import Blueprint, request, jsonify
-from app.models.user import get_user_by_id, update_user_profile, serialize_user
-from app.models.event import get_event_by_id, serialize_event
+from app.models.user import (
+    get_user_by_id, update_user_profile, serialize_user, list_users, DEFAULT_PAGE_SIZE,
+    USER_PUBLIC_PROJECTION, USER_FIELD_SOURCES, patch_user_profile, ProfilePatchError, CursorError
+)
+from app.models.event import get_event_by_id, serialize_event, claim_hours_log, EVENT_FIELD_SOURCES, HOURS_ALREADY_LOGGED
+from app.models.ledger import (
+    record_entry, get_user_entries, get_period_leaders, serialize_ledger_entry, has_logged_hours,
+    POINTS_PER_HOUR, PERIODS
+)
 from app.utils.auth_utils import token_required, admin_required
-from bson import ObjectId
-from datetime import datetime
+from app.utils.achievements import calculate_level, calculate_next_level_points, badge_details
+from app.utils.fields import parse_fields, FieldsError
+from app.utils.read_routing import secondary_reads, read_from
 
 user_bp = Blueprint('user', __name__)
 
@@ -11,7 +19,12 @@ user_bp = Blueprint('user', __name__)
 @user_bp.route('/profile', methods=['GET'])
 @token_required
 def get_profile(current_user):
-    return jsonify(serialize_user(current_user)), 200
+    try:
+        fields = parse_fields(request.args.get('fields'), USER_FIELD_SOURCES)
+    except FieldsError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify(serialize_user(current_user, fields)), 200
 
 # Update user profile
 @user_bp.route('/profile', methods=['PUT'])
@@ -38,10 +51,41 @@ def update_profile(current_user):
         'user': serialize_user(updated_user)
     }), 200
 
+# Change only the given profile entries (JSON merge patch; null removes an entry)
+@user_bp.route('/profile', methods=['PATCH'])
+@token_required
+def patch_profile(current_user):
+    data = request.get_json(silent=True)
+    
+    if not isinstance(data, dict) or 'profile' not in data:
+        return jsonify({'error': 'Missing profile data'}), 400
+    if set(data) - {'profile'}:
+        return jsonify({'error': 'Only profile can be changed'}), 400
+    
+    try:
+        changed = patch_user_profile(current_user, data['profile'])
+    except ProfilePatchError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error patching profile: {str(e)}")
+        return jsonify({'error': 'Failed to update profile'}), 500
+    
+    updated_user = get_user_by_id(current_user['_id']) if changed else current_user
+    
+    return jsonify({
+        'message': 'Profile updated successfully' if changed else 'No changes',
+        'user': serialize_user(updated_user)
+    }), 200
+
 # Get user's registered events
 @user_bp.route('/events', methods=['GET'])
 @token_required
 def get_user_events(current_user):
+    try:
+        fields = parse_fields(request.args.get('fields'), EVENT_FIELD_SOURCES)
+    except FieldsError as e:
+        return jsonify({'error': str(e)}), 400
+    
     user_role = current_user['role']
     
     # Get event IDs from user profile
@@ -54,140 +98,231 @@ def get_user_events(current_user):
     # Get events
     events = []
     for event_id in event_ids:
-        event = get_event_by_id(event_id)
+        event = get_event_by_id(event_id, fields)
         if event:
-            events.append(serialize_event(event))
+            events.append(serialize_event(event, fields))
     
     return jsonify({
         'events': events,
         'count': len(events)
     }), 200
 
+# Log volunteer hours for an event
+@user_bp.route('/hours', methods=['POST'])
+@token_required
+def log_hours(current_user):
+    data = request.get_json(silent=True)
+    
+    if not isinstance(data, dict) or not data.get('event_id'):
+        return jsonify({'error': 'Missing event_id'}), 400
+    
+    try:
+        hours = float(data.get('hours', 0))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid hours'}), 400
+    if hours <= 0:
+        return jsonify({'error': 'Hours must be greater than zero'}), 400
+    if hours.is_integer():
+        hours = int(hours)
+    
+    event = get_event_by_id(data['event_id'])
+    if not event:
+        return jsonify({'error': 'Event not found'}), 404
+    
+    # Admins may log (and approve) hours on behalf of a volunteer
+    is_admin = current_user['role'] == 'admin'
+    user_id = current_user['_id']
+    approved_by = None
+    if is_admin and data.get('user_id'):
+        if not get_user_by_id(data['user_id']):
+            return jsonify({'error': 'User not found'}), 404
+        user_id = data['user_id']
+        approved_by = current_user['_id']
+    elif current_user['role'] != 'volunteer':
+        return jsonify({'error': 'Only volunteers can log hours'}), 403
+    
+    if hours < event.get('hours_required', 0):
+        return jsonify({
+            'error': f"Minimum {event.get('hours_required', 0)} hours required for points"
+        }), 400
+    
+    points = int(hours * POINTS_PER_HOUR)
+    if is_admin and 'points' in data:
+        try:
+            points = int(data['points'])
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Invalid points'}), 400
+    
+    # Volunteers log their own hours once per event they registered for
+    # (also after cancelling and registering again); admins may add corrections
+    if approved_by is None:
+        if has_logged_hours(user_id, data['event_id']):
+            return jsonify({'error': HOURS_ALREADY_LOGGED}), 409
+        claimed, message = claim_hours_log(data['event_id'], user_id)
+        if not claimed:
+            return jsonify({'error': message}), 409 if message == HOURS_ALREADY_LOGGED else 403
+    
+    entry = record_entry(
+        user_id=user_id,
+        event_id=data['event_id'],
+        hours=hours,
+        points=points,
+        approved_by=approved_by
+    )
+    
+    updated_user = get_user_by_id(user_id)
+    profile = updated_user.get('profile', {})
+    
+    return jsonify({
+        'message': 'Hours logged successfully',
+        'entry': serialize_ledger_entry(entry),
+        'points': profile.get('points', 0),
+        'hours_contributed': profile.get('hours_contributed', 0),
+        'level': profile.get('level', 1)
+    }), 201
+
+# Get the current user's hours ledger
+@user_bp.route('/hours', methods=['GET'])
+@token_required
+def get_hours(current_user):
+    try:
+        limit = min(int(request.args.get('limit', 50)), 200)
+    except ValueError:
+        return jsonify({'error': 'Invalid limit'}), 400
+    
+    entries = [serialize_ledger_entry(e) for e in get_user_entries(current_user['_id'], limit)]
+    
+    return jsonify({
+        'entries': entries,
+        'count': len(entries)
+    }), 200
+
 # Admin routes
 @user_bp.route('', methods=['GET'])
+@secondary_reads
 @admin_required
 def get_all_users(current_user):
     # Get query parameters
     role = request.args.get('role')
+    search = request.args.get('search')
+    after = request.args.get('after')
+    
+    try:
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        return jsonify({'error': 'Invalid limit'}), 400
     
-    # Build query
-    query = {}
-    if role:
-        query['role'] = role
+    try:
+        fields = parse_fields(request.args.get('fields'), USER_FIELD_SOURCES)
+    except FieldsError as e:
+        return jsonify({'error': str(e)}), 400
     
-    # Get users from database
-    users = list(db.users.find(query))
+    # Get one page of users from database
+    try:
+        users, next_cursor, total, total_is_estimate = list_users(
+            role=role,
+            search=search,
+            after=after,
+            limit=limit,
+            fields=fields
+        )
+    except CursorError as e:
+        return jsonify({'error': str(e)}), 400
     
     # Serialize users
-    users_data = [serialize_user(user) for user in users]
+    users_data = [serialize_user(user, fields) for user in users]
     
     return jsonify({
         'users': users_data,
-        'count': len(users_data)
+        'count': len(users_data),
+        'total': total,
+        'total_is_estimate': total_is_estimate,
+        'next_cursor': next_cursor
     }), 200
 
 @user_bp.route('/<user_id>', methods=['GET'])
 @admin_required
 def get_user(current_user, user_id):
-    user = get_user_by_id(user_id)
+    try:
+        fields = parse_fields(request.args.get('fields'), USER_FIELD_SOURCES)
+    except FieldsError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    user = get_user_by_id(user_id, fields)
     
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
-    return jsonify(serialize_user(user)), 200
+    return jsonify(serialize_user(user, fields)), 200
 
 # Leaderboard route
 @user_bp.route('/leaderboard', methods=['GET'])
+@secondary_reads
 @token_required
 def get_leaderboard(current_user):
     # Get time period from query parameters
     period = request.args.get('period', 'all-time')
     
-    # Define query based on role
-    query = {'role': 'volunteer'}
-    
-    # Fetch volunteers from the database
-    volunteers = list(db.users.find(query))
-    
-    # Sort volunteers by points in descending order
-    sorted_volunteers = sorted(
-        volunteers, 
-        key=lambda x: x.get('profile', {}).get('points', 0), 
-        reverse=True
-    )
-    
-    # Limit to top 20 volunteers
-    top_volunteers = sorted_volunteers[:20]
-    
-    # Serialize volunteers
-    leaderboard_data = []
-    for i, volunteer in enumerate(top_volunteers):
-        user_data = serialize_user(volunteer)
-        # Add additional leaderboard-specific fields
-        user_data['rank'] = i + 1
-        
-        # Get profile data
-        profile = volunteer.get('profile', {})
-        
-        # Map to expected format
-        user_data['displayName'] = volunteer['name']
-        user_data['points'] = profile.get('points', 0)
-        user_data['level'] = calculate_level(profile.get('points', 0))
-        user_data['nextLevelPoints'] = calculate_next_level_points(profile.get('points', 0))
-        user_data['hoursVolunteered'] = profile.get('hours_contributed', 0)
-        user_data['eventsAttended'] = profile.get('events_participated', [])
-        user_data['eventsRegistered'] = profile.get('events_participated', [])  # Using same field for now
-        user_data['badgesEarned'] = profile.get('badges', [])
-        
-        # Create empty arrays for badges and category distributions if not present
-        user_data['badges'] = []
-        for badge_id in profile.get('badges', []):
-            user_data['badges'].append({
-                'id': badge_id,
-                'name': badge_id.capitalize(),
-                'description': f'Earned the {badge_id} badge',
-                'icon': 'award',
-                'earnedDate': datetime.utcnow().isoformat()
-            })
-        
-        # Add stats
-        user_data['stats'] = {
-            'totalEvents': len(profile.get('events_participated', [])),
-            'totalHours': profile.get('hours_contributed', 0),
-            'categoryDistribution': [],
-            'monthlyActivity': []
+    # Weekly and monthly boards rank by the running totals of the current bucket;
+    # all-time ranks by the lifetime totals on the user documents
+    period_totals = {}
+    if period in PERIODS:
+        leaders = get_period_leaders(period, limit=20)
+        period_totals = {leader['user_id']: leader for leader in leaders}
+        volunteers_by_id = {
+            volunteer['_id']: volunteer
+            for volunteer in read_from(db.users).find({'_id': {'$in': list(period_totals)}}, USER_PUBLIC_PROJECTION)
         }
-        
-        leaderboard_data.append(user_data)
+        top_volunteers = [volunteers_by_id[leader['user_id']] for leader in leaders if leader['user_id'] in volunteers_by_id]
+    else:
+        top_volunteers = list(
+            read_from(db.users).find({'role': 'volunteer'}, USER_PUBLIC_PROJECTION)
+            .sort('profile.points', -1)
+            .limit(20)
+        )
+    
+    leaderboard_data = [
+        leaderboard_entry(volunteer, i + 1, period_totals.get(volunteer['_id']) if period_totals else None)
+        for i, volunteer in enumerate(top_volunteers)
+    ]
     
     return jsonify(leaderboard_data), 200
 
 # Helper functions for leaderboard
-def calculate_level(points):
-    """Calculate level based on points"""
-    if points < 100:
-        return 1
-    elif points < 250:
-        return 2
-    elif points < 500:
-        return 3
-    elif points < 1000:
-        return 4
-    else:
-        return 5
-
-def calculate_next_level_points(points):
-    """Calculate points needed for next level"""
-    if points < 100:
-        return 100
-    elif points < 250:
-        return 250
-    elif points < 500:
-        return 500
-    elif points < 1000:
-        return 1000
-    else:
-        return 2000
+def leaderboard_entry(volunteer, rank, period_total=None):
+    """One volunteer's leaderboard row; `period_total` has the weekly or monthly points and hours"""
+    user_data = serialize_user(volunteer)
+    # Add additional leaderboard-specific fields
+    user_data['rank'] = rank
+    
+    if period_total is not None:
+        user_data['periodPoints'] = period_total.get('points', 0)
+        user_data['periodHours'] = period_total.get('hours', 0)
+    
+    # Get profile data
+    profile = volunteer.get('profile', {})
+    
+    # Map to expected format
+    user_data['displayName'] = volunteer['name']
+    user_data['points'] = profile.get('points', 0)
+    # Level and badges are stored when points or hours change
+    user_data['level'] = profile.get('level') or calculate_level(profile.get('points', 0))
+    user_data['nextLevelPoints'] = calculate_next_level_points(profile.get('points', 0))
+    user_data['hoursVolunteered'] = profile.get('hours_contributed', 0)
+    user_data['eventsAttended'] = profile.get('events_participated', [])
+    user_data['eventsRegistered'] = profile.get('events_participated', [])  # Using same field for now
+    user_data['badges'] = [badge_details(badge) for badge in profile.get('badges', [])]
+    user_data['badgesEarned'] = [badge['id'] for badge in user_data['badges']]
+    
+    # Add stats
+    user_data['stats'] = {
+        'totalEvents': len(profile.get('events_participated', [])),
+        'totalHours': profile.get('hours_contributed', 0),
+        'categoryDistribution': [],
+        'monthlyActivity': []
+    }
+    
+    return user_data
 
 # Import db at the end to avoid circular import
 from app import db 
\ No newline at end of file
@@ -0,0 +1,87 @@
+import atexit
+import os
+import threading
+from datetime import datetime
+from app import db
+from app.utils.cache import ignore_updates_to
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+# Activity timestamps are written at most this often per process
+FLUSH_SECONDS = float(os.getenv('ACTIVITY_FLUSH_SECONDS', 10))
+
+# Users with unwritten timestamps; reaching this flushes right away. If writes keep
+# failing, new users beyond twice this are dropped (the timestamps are best effort)
+MAX_PENDING = int(os.getenv('ACTIVITY_MAX_PENDING', 5000))
+
+ACTIVITY_FIELDS = ('last_login', 'last_access')
+
+# Nothing cached depends on these, so their bulk updates should not evict cached users
+ignore_updates_to('users', ACTIVITY_FIELDS)
+
+# user _id -> {field: latest timestamp}; repeated activity by one user collapses into one entry
+_pending = {}
+_lock = threading.Lock()
+_wakeup = threading.Event()
+_thread = None
+
+def record_activity(user_id, field, at=None):
+    """Note that a user logged in or used the app; written on the next flush"""
+    at = at or datetime.utcnow()
+    user_id = ObjectId(user_id)
+    with _lock:
+        if user_id not in _pending and len(_pending) >= 2 * MAX_PENDING:
+            return
+        entry = _pending.setdefault(user_id, {})
+        if at > entry.get(field, datetime.min):
+            entry[field] = at
+        full = len(_pending) >= MAX_PENDING
+    if full:
+        if _thread is not None and _thread.is_alive():
+            _wakeup.set()
+        else:
+            flush()
+
+def flush():
+    """Write every buffered timestamp in one unordered bulk write; returns the users updated"""
+    global _pending
+    with _lock:
+        pending, _pending = _pending, {}
+    if not pending:
+        return 0
+
+    # $max keeps the newest value when processes flush out of order
+    operations = [UpdateOne({'_id': user_id}, {'$max': fields}) for user_id, fields in pending.items()]
+    try:
+        db.users.bulk_write(operations, ordered=False)
+    except PyMongoError as e:
+        print(f"Activity flush failed, keeping {len(pending)} users for the next flush: {str(e)}")
+        with _lock:
+            for user_id, fields in pending.items():
+                if len(_pending) >= MAX_PENDING and user_id not in _pending:
+                    break
+                entry = _pending.setdefault(user_id, {})
+                for field, at in fields.items():
+                    if at > entry.get(field, datetime.min):
+                        entry[field] = at
+        return 0
+    return len(operations)
+
+def _run():
+    while True:
+        _wakeup.wait(FLUSH_SECONDS)
+        _wakeup.clear()
+        try:
+            flush()
+        except Exception as e:
+            print(f"Activity flush error: {str(e)}")
+
+def start_activity_flusher():
+    """Start the periodic flush thread (once per process); buffered writes are also flushed at exit"""
+    global _thread
+    if _thread is None:
+        _thread = threading.Thread(target=_run, name='activity-flusher', daemon=True)
+        _thread.start()
+        atexit.register(flush)
+    return _thread
@@ -0,0 +1,360 @@
+import hashlib
+import json
+import math
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from app import db
+from app.models.event import get_event_changes, serialize_event, TOMBSTONE_DAYS, EVENT_FIELD_SOURCES
+from app.utils.cache import on_change
+from app.utils.fields import build_projection
+from app.utils.text_index import Segment, tokenize
+from bson import ObjectId
+
+# Answers chatbot questions from a BM25 index over published events, FAQs and
+# the registration guide. The index is built once, saved as .npy arrays and
+# memory-mapped by every worker; events changed since it was built go into a
+# small in-memory segment until there are enough of them to rebuild and save.
+
+INDEX_DIR = os.getenv(
+    'CHATBOT_INDEX_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'storage', 'chatbot_index')
+)
+
+# Changes made through other workers are picked up at most this late
+REFRESH_SECONDS = int(os.getenv('CHATBOT_REFRESH_SECONDS', 30))
+
+# Changed events kept in memory before the index is rebuilt and saved
+MAX_DELTA_DOCS = 200
+
+MAX_RESULTS = 10
+
+INDEXED_FIELDS = [
+    'event_name', 'description', 'category', 'location', 'start_date', 'end_date', 'status',
+    'requirements', 'skills_needed', 'age_restriction', 'points_awarded', 'hours_required'
+]
+
+FAQS = [
+    ('about', 'What is Samarthanam?',
+     'Samarthanam Trust for the Disabled works with people with disabilities through education, '
+     'employment, sports and cultural programmes. Volunteers and participants sign up for its events here.'),
+    ('volunteer', 'How do I become a volunteer?',
+     'Sign up with the Volunteer role, add your skills, interests and availability to your profile, '
+     'then register for any upcoming event from its page.'),
+    ('participant', 'How do I register as a participant?',
+     'Sign up with the Participant role and fill in your disability type, emergency contact and any '
+     'special needs, then open an upcoming event and choose Register as Participant.'),
+    ('cancel', 'How do I cancel my registration for an event?',
+     'Open the event from My Events and choose Cancel Registration. Your place is freed for someone else.'),
+    ('full', 'What happens when an event is full?',
+     'Registration closes once the participant limit is reached. The event page shows the places left '
+     'live, so you can register as soon as a place becomes free.'),
+    ('points', 'How do points, levels and badges work?',
+     'Each event you attend awards the points shown on its page and the hours you log count towards '
+     'your total. Points raise your level and unlock badges, and the leaderboard ranks volunteers weekly, '
+     'monthly and all time.'),
+    ('hours', 'How do I log my volunteer hours?',
+     'After an event, open your dashboard and log the hours you contributed for it. They appear in '
+     'your hours history.'),
+    ('certificate', 'How do I get a certificate?',
+     'Certificates are available once an event is completed. Open the event and choose Download '
+     'Certificate, as PDF or PNG.'),
+    ('feedback', 'How can I give feedback about an event?',
+     'Open a completed event and choose Give Feedback to rate it and tell us what you liked and what '
+     'could be better.'),
+    ('accessibility', 'Can the chatbot read answers aloud?',
+     'Yes. Choose voice assistance when the chat starts to hear every answer and to speak your questions.'),
+    ('create-event', 'How do I create an event?',
+     'Admins create events from the Create Event page: name, description, dates, location, category, '
+     'participant limit and points. Events are listed once they are published.'),
+    ('contact', 'How do I contact the organisers of an event?',
+     'The contact information of each event is shown on its page.'),
+]
+
+REGISTRATION_GUIDE = [
+    ('sign-up', 'Step 1: create your account',
+     'Choose Sign Up, enter your name, email and a password, and pick Volunteer or Participant.'),
+    ('profile', 'Step 2: complete your profile',
+     'Add your phone number, interests and, for volunteers, skills and availability. Organisers use '
+     'these to match you to events.'),
+    ('choose-event', 'Step 3: find an event',
+     'Browse Events, filter by category or status, or search events near you, and open one to see '
+     'its dates, location, requirements and places left.'),
+    ('register-event', 'Step 4: register for the event',
+     'Choose Register on the event page and confirm. The event then appears under My Events and you '
+     'receive updates from the organisers.'),
+]
+
+def _static_documents():
+    documents = [
+        {'key': f'faq:{key}', 'type': 'faq', 'title': question, 'answer': answer, 'url': None,
+         'text': f'{question} {question} {answer}'}
+        for key, question, answer in FAQS
+    ]
+    documents += [
+        {'key': f'guide:{key}', 'type': 'guide', 'title': title, 'answer': answer, 'url': '/signup',
+         'text': f'registration register sign up {title} {title} {answer}'}
+        for key, title, answer in REGISTRATION_GUIDE
+    ]
+    return documents
+
+# Saved indexes built from other FAQ or guide text are rebuilt
+KNOWLEDGE_VERSION = hashlib.sha1(json.dumps([FAQS, REGISTRATION_GUIDE]).encode()).hexdigest()[:12]
+
+def _month_name(date):
+    # So "events in March" finds events dated 2025-03-...
+    try:
+        return datetime.strptime((date or '')[:10], '%Y-%m-%d').strftime('%B')
+    except ValueError:
+        return ''
+
+def _event_document(event):
+    """Index document for a serialized event"""
+    name = event.get('event_name', '')
+    dates = event.get('start_date', '')
+    if event.get('end_date') and event.get('end_date') != dates:
+        dates = f"{dates} to {event['end_date']}"
+    description = event.get('description', '')
+    if len(description) > 240:
+        description = description[:240].rsplit(' ', 1)[0] + '...'
+    answer = f"{name} ({event.get('category', '')}) on {dates} at {event.get('location', '')}. {description}"
+    if event.get('points_awarded'):
+        answer += f" Attending earns {event['points_awarded']} points."
+
+    month_names = ' '.join(_month_name(event.get(field)) for field in ('start_date', 'end_date'))
+    text = ' '.join(str(part) for part in [
+        name, name, event.get('category', ''), event.get('location', ''), event.get('status', ''), 'event',
+        month_names, event.get('description', ''), ' '.join(event.get('requirements') or []),
+        ' '.join(event.get('skills_needed') or []), event.get('age_restriction', '')
+    ])
+    return {'key': f"event:{event['event_id']}", 'type': 'event', 'title': name, 'answer': answer,
+            'url': f"/events/{event['event_id']}", 'text': text}
+
+class _Part:
+    """A segment with its documents and which of them are still current"""
+
+    def __init__(self, segment, documents, live=None):
+        self.segment = segment
+        self.documents = documents
+        self.live = np.ones(len(documents), dtype=bool) if live is None else live
+        self.keys = {document['key']: i for i, document in enumerate(documents) if self.live[i]}
+        self.live_count = int(self.live.sum())
+        self.live_length = float(np.asarray(segment.doc_lengths)[self.live].sum()) if len(documents) else 0.0
+
+    def without(self, keys):
+        """A copy with the documents for `keys` no longer current"""
+        live = self.live.copy()
+        for key in keys:
+            if key in self.keys:
+                live[self.keys[key]] = False
+        return _Part(self.segment, self.documents, live)
+
+    def replace_documents(self, documents):
+        """A copy with new metadata for documents whose indexed text is unchanged"""
+        updated = list(self.documents)
+        for document in documents:
+            updated[self.keys[document['key']]] = document
+        return _Part(self.segment, updated, self.live)
+
+def _empty_part():
+    return _Part(Segment.build([]), [])
+
+class ChatbotIndex:
+    """The process's retrieval index: a saved base segment and an in-memory delta"""
+
+    def __init__(self, directory=INDEX_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        # Swapped whole on every change, so queries never see a half-applied one
+        self._parts = None
+        self._synced_at = None
+        self._refreshed_at = 0
+        self._dirty = set()
+
+    def mark_changed(self, event_id):
+        self._dirty.add(event_id)
+
+    def search(self, query, limit=3):
+        """Best (score, document) matches for a query, highest first"""
+        self._refresh()
+        base, delta = self._parts
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+
+        parts = [part for part in (base, delta) if part.live_count]
+        count = sum(part.live_count for part in parts)
+        if not count:
+            return []
+        average_length = max(sum(part.live_length for part in parts) / count, 1.0)
+        weighted_terms = []
+        for term in terms:
+            frequency = sum(part.segment.document_frequency(term) for part in parts)
+            if frequency:
+                weighted_terms.append((term, math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))))
+
+        matches = []
+        for part in parts:
+            scores = part.segment.scores(weighted_terms, average_length)
+            scores[~part.live] = 0
+            best = np.argpartition(-scores, limit - 1)[:limit] if len(scores) > limit else np.arange(len(scores))
+            matches += [(float(scores[i]), part.documents[i]) for i in best if scores[i] > 0]
+        matches.sort(key=lambda match: -match[0])
+        return matches[:limit]
+
+    def _refresh(self):
+        with self._lock:
+            if self._parts is None:
+                self._load_or_build()
+            if self._dirty:
+                # pop() is atomic, so ids marked meanwhile are never lost
+                dirty = set()
+                while self._dirty:
+                    dirty.add(self._dirty.pop())
+                self._apply_ids(dirty)
+            if time.monotonic() - self._refreshed_at >= REFRESH_SECONDS:
+                self._sync()
+
+    def _load_or_build(self):
+        meta = self._read_meta()
+        if (meta and meta.get('knowledge_version') == KNOWLEDGE_VERSION
+                and datetime.utcnow() - datetime.fromisoformat(meta['built_at']) < timedelta(days=TOMBSTONE_DAYS)):
+            version_dir = os.path.join(self.directory, meta['version'])
+            try:
+                with open(os.path.join(version_dir, 'documents.json')) as f:
+                    documents = json.load(f)
+                self._parts = (_Part(Segment.load(version_dir), documents), _empty_part())
+                self._synced_at = datetime.fromisoformat(meta['built_at'])
+                print(f"Chatbot index loaded from {version_dir} ({len(documents)} documents)")
+                # Catch up with the changes made since it was saved
+                self._sync()
+                return
+            except (OSError, ValueError) as e:
+                print(f"Chatbot index at {version_dir} unreadable, rebuilding: {str(e)}")
+        self._build()
+
+    def _read_meta(self):
+        try:
+            with open(os.path.join(self.directory, 'CURRENT')) as f:
+                version = f.read().strip()
+            with open(os.path.join(self.directory, version, 'meta.json')) as f:
+                return dict(json.load(f), version=version)
+        except (OSError, ValueError):
+            return None
+
+    def _build(self):
+        """Index everything from scratch and save it for other workers and restarts"""
+        started = time.perf_counter()
+        built_at = datetime.utcnow()
+        projection = build_projection(INDEXED_FIELDS, EVENT_FIELD_SOURCES)
+        events = [serialize_event(event, INDEXED_FIELDS) for event in db.events.find({'publish_event': True}, projection)]
+        documents = _static_documents() + [_event_document(event) for event in events]
+        segment = Segment.build([document['text'] for document in documents])
+        self._parts = (_Part(segment, documents), _empty_part())
+        self._synced_at = built_at
+        self._refreshed_at = time.monotonic()
+        self._save(segment, documents, built_at)
+        print(f"Chatbot index built: {len(documents)} documents in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    def _save(self, segment, documents, built_at):
+        version = f"{built_at.strftime('%Y%m%d%H%M%S%f')}-{os.getpid()}"
+        version_dir = os.path.join(self.directory, version)
+        try:
+            segment.save(version_dir)
+            with open(os.path.join(version_dir, 'documents.json'), 'w') as f:
+                json.dump(documents, f)
+            with open(os.path.join(version_dir, 'meta.json'), 'w') as f:
+                json.dump({'built_at': built_at.isoformat(), 'knowledge_version': KNOWLEDGE_VERSION}, f)
+            # Switch atomically, then drop versions older than the one replaced
+            # (workers that mapped it keep reading it until they reload)
+            previous = self._read_meta()
+            pointer = os.path.join(self.directory, f'CURRENT.{os.getpid()}')
+            with open(pointer, 'w') as f:
+                f.write(version)
+            os.replace(pointer, os.path.join(self.directory, 'CURRENT'))
+            keep = {version, previous['version'] if previous else None}
+            for name in os.listdir(self.directory):
+                path = os.path.join(self.directory, name)
+                if name not in keep and os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+        except OSError as e:
+            print(f"WARNING: Failed to save chatbot index: {str(e)}")
+
+    def _sync(self):
+        """Apply the events changed through any worker since the last sync (delta sync, as clients use it)"""
+        events, deleted, synced_at, full = get_event_changes(self._synced_at, published_only=True, fields=INDEXED_FIELDS)
+        self._refreshed_at = time.monotonic()
+        if full:
+            self._build()
+            return
+        self._apply(events, deleted)
+        self._synced_at = synced_at
+
+    def _apply_ids(self, event_ids):
+        ids = [ObjectId(event_id) for event_id in event_ids if ObjectId.is_valid(event_id)]
+        projection = dict(build_projection(INDEXED_FIELDS, EVENT_FIELD_SOURCES), publish_event=1)
+        found = {str(event['_id']): event for event in db.events.find({'_id': {'$in': ids}}, projection)}
+        events = [serialize_event(event, INDEXED_FIELDS) for event in found.values() if event.get('publish_event')]
+        deleted = [event_id for event_id in event_ids if event_id not in found or not found[event_id].get('publish_event')]
+        self._apply(events, deleted)
+
+    def _apply(self, events, deleted):
+        base, delta = self._parts
+        removed = {f'event:{event_id}' for event_id in deleted}
+        unchanged = []
+        changed = []
+        for document in map(_event_document, events):
+            current = (base.documents[base.keys[document['key']]] if document['key'] in base.keys
+                       else delta.documents[delta.keys[document['key']]] if document['key'] in delta.keys
+                       else None)
+            if current == document:
+                continue
+            if current and current['text'] == document['text']:
+                unchanged.append(document)
+            else:
+                changed.append(document)
+        if not removed and not unchanged and not changed:
+            return
+
+        replaced = removed | {document['key'] for document in changed}
+        base = base.without(replaced)
+        base = base.replace_documents([d for d in unchanged if d['key'] in base.keys])
+        delta_documents = [
+            document for i, document in enumerate(delta.documents)
+            if delta.live[i] and document['key'] not in replaced
+        ]
+        updates = {document['key']: document for document in unchanged}
+        delta_documents = [updates.get(document['key'], document) for document in delta_documents] + changed
+
+        if len(delta_documents) > MAX_DELTA_DOCS:
+            self._build()
+            return
+        delta = _Part(Segment.build([document['text'] for document in delta_documents]), delta_documents)
+        self._parts = (base, delta)
+
+chatbot_index = ChatbotIndex()
+
+# Events written through this process are re-indexed on the next query;
+# other workers' changes arrive through the invalidation bus or the periodic sync
+on_change('events', chatbot_index.mark_changed)
+
+NO_MATCH_ANSWER = (
+    "Sorry, I couldn't find anything about that. Try asking about an event by name, category or "
+    "place, or about registering, cancelling, points or certificates."
+)
+
+def answer_query(query, limit=3):
+    """The best answer for a question, with the matches it came from"""
+    matches = chatbot_index.search(query, limit)
+    results = [
+        {'type': document['type'], 'title': document['title'], 'answer': document['answer'],
+         'url': document['url'], 'score': round(score, 3)}
+        for score, document in matches
+    ]
+    return {
+        'answer': results[0]['answer'] if results else NO_MATCH_ANSWER,
+        'results': results
+    }
@@ -0,0 +1,241 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import msgspec
+from app import db
+from app.models.event import SYNC_OVERLAP_SECONDS
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo.errors import OperationFailure, PyMongoError
+
+# Server-Sent Events for seat availability. One upstream subscription per
+# process (a change stream, or a shared poll on a standalone mongod) feeds every
+# connected client; clients never query MongoDB after connecting.
+
+# Comment line sent to idle streams so proxies keep them open and dead clients are noticed
+HEARTBEAT_SECONDS = 15
+
+# How often the shared poll runs when MongoDB is not a replica set
+POLL_SECONDS = float(os.getenv('EVENT_FEED_POLL_SECONDS', 2))
+
+# Open streams per process; each holds a server thread (or greenlet) while connected
+MAX_SUBSCRIBERS = int(os.getenv('EVENT_FEED_MAX_SUBSCRIBERS', 2000))
+
+# Browsers reconnect after this long when a stream drops
+RECONNECT_MS = 5000
+
+RETRY_SECONDS = 5
+
+# Server error code for change streams on a standalone mongod
+NOT_REPLICA_SET = 40573
+
+# Subscription key for changes to any event
+CATALOGUE = '*'
+
+SEAT_PROJECTION = {
+    'participant_limit': 1, 'status': 1, 'publish_event': 1,
+    'participant_count': {'$size': {'$ifNull': ['$participants', []]}}
+}
+
+_MISSING = object()
+
+_lock = threading.Lock()
+# Subscription key -> subscriptions
+_subscribers = {}
+_subscriber_count = 0
+# Event id -> last snapshot published (None once deleted), so repeated or irrelevant upstream changes are dropped
+_latest = {}
+_thread = None
+
+class FeedFull(Exception):
+    """MAX_SUBSCRIBERS streams are already open in this process"""
+
+class Subscription:
+    """One client's snapshots not yet sent; a newer snapshot of an event replaces an unsent one
+
+    Snapshots equal to the last one this client was sent for an event are dropped.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self._pending = OrderedDict()
+        self._sent = {}
+        self._ready = threading.Condition()
+
+    def mark_sent(self, event_id, snapshot):
+        """Record a snapshot sent outside the queue (the stream's initial one)"""
+        with self._ready:
+            self._sent[event_id] = snapshot
+
+    def push(self, event_id, snapshot):
+        with self._ready:
+            self._pending.pop(event_id, None)
+            self._pending[event_id] = snapshot
+            self._ready.notify()
+
+    def wait(self, timeout):
+        """(event id, snapshot) pairs queued since the last call, oldest first; empty after `timeout`"""
+        deadline = time.monotonic() + timeout
+        with self._ready:
+            while True:
+                items = [(event_id, snapshot) for event_id, snapshot in self._pending.items()
+                         if self._sent.get(event_id, _MISSING) != snapshot]
+                self._pending.clear()
+                remaining = deadline - time.monotonic()
+                if items or remaining <= 0:
+                    break
+                self._ready.wait(remaining)
+            self._sent.update(items)
+        return items
+
+def seat_snapshot(event):
+    """What streams send about an event: its seats and status"""
+    limit = event.get('participant_limit') or 0
+    count = event.get('participant_count', 0)
+    return {
+        'event_id': str(event['_id']),
+        'participant_count': count,
+        'participant_limit': limit,
+        # None when the event has no limit
+        'seats_left': max(limit - count, 0) if limit else None,
+        'status': event.get('status'),
+        'published': bool(event.get('publish_event', False))
+    }
+
+def get_seat_snapshot(event_id):
+    """Current snapshot of one event, or None if it does not exist"""
+    try:
+        event = db.events.find_one({'_id': ObjectId(event_id)}, SEAT_PROJECTION)
+    except InvalidId:
+        return None
+    if not event:
+        return None
+    return seat_snapshot(event)
+
+def publish(event_id, snapshot):
+    """Send a snapshot (None: deleted) to the event's and the catalogue's subscribers if it changed"""
+    with _lock:
+        if _latest.get(event_id, _MISSING) == snapshot:
+            return 0
+        _latest[event_id] = snapshot
+        targets = list(_subscribers.get(event_id, ())) + list(_subscribers.get(CATALOGUE, ()))
+    for subscription in targets:
+        subscription.push(event_id, snapshot)
+    return len(targets)
+
+def subscribe(key):
+    """Subscribe to one event's changes (its id) or to all of them (CATALOGUE)"""
+    global _subscriber_count
+    start_event_feed()
+    subscription = Subscription(key)
+    with _lock:
+        if _subscriber_count >= MAX_SUBSCRIBERS:
+            raise FeedFull()
+        _subscribers.setdefault(key, set()).add(subscription)
+        _subscriber_count += 1
+    return subscription
+
+def unsubscribe(subscription):
+    global _subscriber_count
+    with _lock:
+        subscribers = _subscribers.get(subscription.key)
+        if subscribers and subscription in subscribers:
+            subscribers.discard(subscription)
+            _subscriber_count -= 1
+            if not subscribers:
+                del _subscribers[subscription.key]
+
+def _message(event_id, snapshot):
+    # Unpublished events are not shown to the public; to a stream they are gone
+    if snapshot is None or not snapshot['published']:
+        name, data = 'removed', {'event_id': event_id}
+    else:
+        name, data = 'seats', snapshot
+    return f"event: {name}\ndata: {msgspec.json.encode(data).decode()}\n\n"
+
+def stream(subscription, initial=None):
+    """SSE messages for a subscription until the client disconnects"""
+    try:
+        yield f"retry: {RECONNECT_MS}\n\n"
+        if initial is not None:
+            # Per client: a change already included in it is not sent again, but other clients still get it
+            subscription.mark_sent(initial['event_id'], initial)
+            yield _message(initial['event_id'], initial)
+        while True:
+            items = subscription.wait(HEARTBEAT_SECONDS)
+            if not items:
+                yield ": keep-alive\n\n"
+            for event_id, snapshot in items:
+                yield _message(event_id, snapshot)
+    finally:
+        unsubscribe(subscription)
+
+def _watch():
+    """Publish changes from a change stream; returns False if MongoDB cannot provide one"""
+    pipeline = [
+        {'$match': {'operationType': {'$in': ['insert', 'update', 'replace', 'delete']}}},
+        # Only the seat fields leave the server, not the participants array
+        {'$project': {
+            'operationType': 1, 'documentKey': 1,
+            'fullDocument._id': 1, 'fullDocument.participant_limit': 1,
+            'fullDocument.status': 1, 'fullDocument.publish_event': 1,
+            'fullDocument.participant_count': {'$size': {'$ifNull': ['$fullDocument.participants', []]}}
+        }}
+    ]
+    token = None
+    while True:
+        try:
+            with db.events.watch(pipeline, full_document='updateLookup', resume_after=token) as changes:
+                print("Event feed watching events")
+                for change in changes:
+                    token = changes.resume_token
+                    event_id = str(change['documentKey']['_id'])
+                    document = change.get('fullDocument') or {}
+                    # A deleted event, or one deleted again before its update was looked up
+                    if change['operationType'] == 'delete' or '_id' not in document:
+                        publish(event_id, None)
+                    else:
+                        publish(event_id, seat_snapshot(document))
+        except OperationFailure as e:
+            if e.code == NOT_REPLICA_SET:
+                return False
+            print(f"Event feed error: {str(e)}")
+            token = None
+        except PyMongoError as e:
+            print(f"Event feed error: {str(e)}")
+        time.sleep(RETRY_SECONDS)
+
+def _poll():
+    """Publish changes found by one shared query every POLL_SECONDS (uses the delta sync index and tombstones)"""
+    print(f"Event feed polling every {POLL_SECONDS}s: MongoDB is not a replica set")
+    since = datetime.utcnow()
+    while True:
+        time.sleep(POLL_SECONDS)
+        try:
+            now = datetime.utcnow()
+            changed_since = since - timedelta(seconds=SYNC_OVERLAP_SECONDS)
+            for event in db.events.find({'updated_at': {'$gte': changed_since}}, SEAT_PROJECTION):
+                publish(str(event['_id']), seat_snapshot(event))
+            for tombstone in db.event_tombstones.find({'deleted_at': {'$gte': changed_since}}, {'_id': 1}):
+                publish(str(tombstone['_id']), None)
+            since = now
+        except PyMongoError as e:
+            print(f"Event feed error: {str(e)}")
+
+def _run():
+    try:
+        if _watch() is False:
+            _poll()
+    except Exception as e:
+        print(f"Event feed stopped: {str(e)}")
+
+def start_event_feed():
+    """Start the thread that feeds every stream in this process (once per process, on first subscribe)"""
+    global _thread
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_run, name='event-feed', daemon=True)
+            _thread.start()
+    return _thread
@@ -0,0 +1,97 @@
+import os
+import socket
+import threading
+import time
+from app import db
+from app.utils.cache import invalidate, watched_collections, set_active, clear_all, is_ignored_update
+from pymongo.errors import OperationFailure, PyMongoError
+
+# Resume tokens are stored per worker name so a restarted worker continues
+# from where its stream stopped
+WORKER_NAME = os.getenv('WORKER_NAME', socket.gethostname())
+
+# How often the resume token is saved while the stream is idle or busy
+TOKEN_SAVE_SECONDS = 5
+
+RETRY_SECONDS = 5
+
+# Server error codes: change streams unsupported (standalone mongod), and
+# resume token no longer in the oplog
+NOT_REPLICA_SET = 40573
+HISTORY_LOST = (280, 286)
+
+DOCUMENT_OPERATIONS = ('insert', 'update', 'replace', 'delete')
+
+_thread = None
+
+def _load_token():
+    state = db.change_stream_tokens.find_one({'_id': WORKER_NAME})
+    return state.get('token') if state else None
+
+def _save_token(token):
+    if token:
+        db.change_stream_tokens.update_one({'_id': WORKER_NAME}, {'$set': {'token': token}}, upsert=True)
+
+def _apply(change):
+    collection = change.get('ns', {}).get('coll')
+    if change['operationType'] == 'update':
+        description = change.get('updateDescription', {})
+        changed = list(description.get('updatedFields', {})) + description.get('removedFields', [])
+        if is_ignored_update(collection, changed):
+            return
+    if change['operationType'] in DOCUMENT_OPERATIONS:
+        invalidate(collection, change['documentKey']['_id'])
+    else:
+        # drop, rename, dropDatabase, invalidate: nothing cached can be trusted
+        clear_all()
+
+def _run():
+    collections = watched_collections()
+    pipeline = [{'$match': {'ns.coll': {'$in': collections}}}]
+    token = _load_token()
+
+    while True:
+        try:
+            with db.watch(pipeline, resume_after=token, max_await_time_ms=1000) as stream:
+                # Only serve cached values while every change is reaching us
+                set_active(True)
+                print(f"Cache invalidation bus watching {', '.join(collections)}")
+                saved_at = time.monotonic()
+                while stream.alive:
+                    change = stream.try_next()
+                    if change is not None:
+                        _apply(change)
+                    token = stream.resume_token
+                    if time.monotonic() - saved_at >= TOKEN_SAVE_SECONDS:
+                        _save_token(token)
+                        saved_at = time.monotonic()
+                # The stream was invalidated (e.g. collection dropped) and cannot be resumed
+                set_active(False)
+                token = None
+                continue
+        except OperationFailure as e:
+            set_active(False)
+            if e.code == NOT_REPLICA_SET:
+                print("Cache invalidation bus disabled: MongoDB is not a replica set, query caches stay off")
+                return
+            if e.code in HISTORY_LOST:
+                print("Cache invalidation bus resume token expired, starting from now")
+                token = None
+            else:
+                print(f"Cache invalidation bus error: {str(e)}")
+        except PyMongoError as e:
+            set_active(False)
+            print(f"Cache invalidation bus error: {str(e)}")
+        except Exception as e:
+            set_active(False)
+            print(f"Cache invalidation bus stopped, query caches stay off: {str(e)}")
+            return
+        time.sleep(RETRY_SECONDS)
+
+def start_invalidation_bus():
+    """Start the change stream thread that keeps this process's caches current (once per process)"""
+    global _thread
+    if _thread is None:
+        _thread = threading.Thread(target=_run, name='cache-invalidation-bus', daemon=True)
+        _thread.start()
+    return _thread
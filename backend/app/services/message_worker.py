@@ -0,0 +1,123 @@
+import os
+import socket
+import time
+from app import db
+from app.models.message_job import (
+    claim_job, record_progress, set_total, finish_job, audience_query, LEASE_SECONDS
+)
+from app.services.transports import get_transport, TransportError
+
+# Recipients read with one query and checkpointed together
+BATCH_SIZE = int(os.getenv('MESSAGE_BATCH_SIZE', 200))
+
+# Progress is also checkpointed (renewing the lease) this often within a batch.
+# One recipient takes at most MAX_ATTEMPTS transport timeouts plus backoff
+# (about 95 s with SMTP defaults), so the lease never runs out between checkpoints
+CHECKPOINT_SECONDS = LEASE_SECONDS / 3
+
+# Upper bound on deliveries per second for one worker
+RATE_PER_SECOND = float(os.getenv('MESSAGE_RATE_PER_SECOND', 20))
+
+# Attempts per recipient; waits double from RETRY_BASE_SECONDS between them
+MAX_ATTEMPTS = int(os.getenv('MESSAGE_MAX_ATTEMPTS', 3))
+RETRY_BASE_SECONDS = float(os.getenv('MESSAGE_RETRY_BASE_SECONDS', 1))
+
+# How long an idle worker waits before looking for new jobs
+POLL_SECONDS = float(os.getenv('MESSAGE_POLL_SECONDS', 2))
+
+class Throttle:
+    """Spaces calls so they never exceed a fixed rate"""
+
+    def __init__(self, rate_per_second):
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0
+        self.next_at = 0.0
+
+    def wait(self):
+        now = time.monotonic()
+        if self.next_at > now:
+            time.sleep(self.next_at - now)
+        self.next_at = max(now, self.next_at) + self.interval
+
+def _deliver(transport, throttle, recipient, subject, body):
+    """Send to one recipient with retry and exponential backoff; returns an error or None"""
+    for attempt in range(MAX_ATTEMPTS):
+        throttle.wait()
+        try:
+            transport.send(recipient['email'], subject, body.replace('{name}', recipient.get('name', '')))
+            return None
+        except TransportError as e:
+            error = str(e)
+            if attempt < MAX_ATTEMPTS - 1:
+                time.sleep(RETRY_BASE_SECONDS * (2 ** attempt))
+    return error
+
+def process_job(job, worker_id, transport):
+    """Deliver a job to its audience, resuming after the job's saved cursor"""
+    query = audience_query(job['audience'])
+    if query is None:
+        finish_job(job['_id'], worker_id, error='Audience no longer exists')
+        return
+
+    if not job.get('total'):
+        set_total(job['_id'], db.users.count_documents(query))
+
+    throttle = Throttle(RATE_PER_SECOND)
+    cursor = job.get('cursor')
+    while True:
+        # A fresh query per batch: no server cursor sits idle (and times out) while a batch is sent
+        batch_query = {'$and': [query, {'_id': {'$gt': cursor}}]} if cursor else query
+        batch = list(db.users.find(batch_query, {'email': 1, 'name': 1}).sort('_id', 1).limit(BATCH_SIZE))
+        if not batch:
+            break
+        if not _send_batch(job, worker_id, transport, throttle, batch):
+            return
+        cursor = batch[-1]['_id']
+
+    finish_job(job['_id'], worker_id)
+    print(f"Message job {job['_id']} completed")
+
+def _send_batch(job, worker_id, transport, throttle, batch):
+    sent = 0
+    failures = []
+    checkpoint_at = time.monotonic()
+    for i, recipient in enumerate(batch):
+        # Slow deliveries: save what was sent so far before the lease can expire
+        if i and time.monotonic() - checkpoint_at >= CHECKPOINT_SECONDS:
+            if not record_progress(job['_id'], worker_id, batch[i - 1]['_id'], sent, len(failures), failures):
+                return False
+            sent = 0
+            failures = []
+            checkpoint_at = time.monotonic()
+
+        error = _deliver(transport, throttle, recipient, job['subject'], job['body'])
+        if error:
+            failures.append({'user_id': str(recipient['_id']), 'email': recipient['email'], 'error': error})
+        else:
+            sent += 1
+
+    # Stop if the lease was lost; the worker that took over resumes from the last checkpoint
+    return record_progress(job['_id'], worker_id, batch[-1]['_id'], sent, len(failures), failures)
+
+def run_worker(transport=None, once=False):
+    """Claim and process jobs until interrupted (or until the queue is empty with once=True)"""
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    transport = transport or get_transport()
+    print(f"Message worker {worker_id} started")
+
+    try:
+        while True:
+            job = claim_job(worker_id)
+            if not job:
+                if once:
+                    return
+                time.sleep(POLL_SECONDS)
+                continue
+
+            print(f"Message worker {worker_id} processing job {job['_id']}")
+            try:
+                process_job(job, worker_id, transport)
+            except Exception as e:
+                print(f"Error processing message job {job['_id']}: {str(e)}")
+                finish_job(job['_id'], worker_id, error=str(e))
+    finally:
+        transport.close()
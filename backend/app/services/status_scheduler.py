@@ -0,0 +1,105 @@
+import os
+import threading
+from datetime import datetime
+from app import db
+from app.utils.event_status import status_fields
+from pymongo import UpdateOne
+
+# Longest sleep between checks, so events created while sleeping are never late by more
+MAX_SLEEP_SECONDS = float(os.getenv('STATUS_SCHEDULER_MAX_SLEEP', 60))
+
+# Due events updated per bulk_write
+BATCH_SIZE = 500
+
+_wakeup = threading.Event()
+_thread = None
+
+def apply_due_transitions(now=None):
+    """Move every event whose status_due_at has passed to its current status
+
+    Returns the number of events updated.
+    """
+    now = now or datetime.utcnow()
+    updated = 0
+
+    while True:
+        due = list(
+            db.events.find(
+                {'status_due_at': {'$lte': now}},
+                {'start_date': 1, 'end_date': 1, 'status': 1, 'status_due_at': 1}
+            ).sort('status_due_at', 1).limit(BATCH_SIZE)
+        )
+        if not due:
+            return updated
+
+        operations = []
+        for event in due:
+            fields = status_fields(event.get('start_date'), event.get('end_date'), event.get('status'), now)
+            fields['updated_at'] = now
+            # Matching on the due time skips events an admin edited in the meantime
+            operations.append(UpdateOne(
+                {'_id': event['_id'], 'status_due_at': event['status_due_at']},
+                {'$set': fields}
+            ))
+        result = db.events.bulk_write(operations, ordered=False)
+        updated += result.modified_count
+
+        if len(due) < BATCH_SIZE:
+            return updated
+
+def backfill_status_schedule():
+    """Compute status and status_due_at for events stored before the scheduler existed"""
+    now = datetime.utcnow()
+    operations = [
+        UpdateOne(
+            {'_id': event['_id']},
+            {'$set': status_fields(event.get('start_date'), event.get('end_date'), event.get('status'), now)}
+        )
+        for event in db.events.find({'status_due_at': {'$exists': False}}, {'start_date': 1, 'end_date': 1, 'status': 1})
+    ]
+    for i in range(0, len(operations), BATCH_SIZE):
+        db.events.bulk_write(operations[i:i + BATCH_SIZE], ordered=False)
+    return len(operations)
+
+def _seconds_until_next_due():
+    upcoming = db.events.find_one(
+        {'status_due_at': {'$ne': None}},
+        {'status_due_at': 1},
+        sort=[('status_due_at', 1)]
+    )
+    if not upcoming:
+        return MAX_SLEEP_SECONDS
+    seconds = (upcoming['status_due_at'] - datetime.utcnow()).total_seconds()
+    return min(max(seconds, 0), MAX_SLEEP_SECONDS)
+
+def notify_schedule_changed():
+    """Wake the scheduler so a newly created or edited event's due time is taken into account"""
+    _wakeup.set()
+
+def _run():
+    try:
+        backfilled = backfill_status_schedule()
+        if backfilled:
+            print(f"Status scheduler backfilled {backfilled} events")
+    except Exception as e:
+        print(f"Status scheduler backfill failed: {str(e)}")
+
+    while True:
+        try:
+            updated = apply_due_transitions()
+            if updated:
+                print(f"Status scheduler updated {updated} events")
+            timeout = _seconds_until_next_due()
+        except Exception as e:
+            print(f"Status scheduler error: {str(e)}")
+            timeout = MAX_SLEEP_SECONDS
+        _wakeup.wait(timeout)
+        _wakeup.clear()
+
+def start_status_scheduler():
+    """Start the scheduler thread (once per process)"""
+    global _thread
+    if _thread is None:
+        _thread = threading.Thread(target=_run, name='status-scheduler', daemon=True)
+        _thread.start()
+    return _thread
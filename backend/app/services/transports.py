@@ -0,0 +1,77 @@
+import os
+import smtplib
+from email.message import EmailMessage
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class TransportError(Exception):
+    """A delivery failed; the worker retries it with backoff"""
+
+class LogTransport:
+    """Prints messages instead of sending them (development)"""
+
+    def send(self, to_address, subject, body):
+        print(f"[message] To: {to_address} | Subject: {subject}")
+
+    def close(self):
+        pass
+
+class SMTPTransport:
+    """Sends through an SMTP server over one reused connection
+
+    Defaults to a local stand-in on port 1025, e.g. `python -m aiosmtpd -n`.
+    """
+
+    def __init__(self, host=None, port=None, username=None, password=None, sender=None, use_tls=None):
+        self.host = host or os.getenv('SMTP_HOST', 'localhost')
+        self.port = int(port or os.getenv('SMTP_PORT', 1025))
+        self.username = username or os.getenv('SMTP_USERNAME')
+        self.password = password or os.getenv('SMTP_PASSWORD')
+        self.sender = sender or os.getenv('SMTP_SENDER', 'noreply@samarthanam.org')
+        self.use_tls = use_tls if use_tls is not None else os.getenv('SMTP_USE_TLS', '0') == '1'
+        self._connection = None
+
+    def _connect(self):
+        connection = smtplib.SMTP(self.host, self.port, timeout=30)
+        if self.use_tls:
+            connection.starttls()
+        if self.username:
+            connection.login(self.username, self.password)
+        return connection
+
+    def send(self, to_address, subject, body):
+        message = EmailMessage()
+        message['From'] = self.sender
+        message['To'] = to_address
+        message['Subject'] = subject
+        message.set_content(body)
+
+        try:
+            if self._connection is None:
+                self._connection = self._connect()
+            self._connection.send_message(message)
+        except (smtplib.SMTPException, OSError) as e:
+            # Drop the connection so the retry starts from a fresh one
+            self.close()
+            raise TransportError(str(e))
+
+    def close(self):
+        if self._connection is not None:
+            try:
+                self._connection.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._connection = None
+
+TRANSPORTS = {
+    'log': LogTransport,
+    'smtp': SMTPTransport
+}
+
+def get_transport(name=None):
+    """Create the transport named by MESSAGE_TRANSPORT (default: smtp)"""
+    name = name or os.getenv('MESSAGE_TRANSPORT', 'smtp')
+    if name not in TRANSPORTS:
+        raise ValueError(f"Unknown message transport: {name}")
+    return TRANSPORTS[name]()
@@ -0,0 +1,77 @@
+import json
+import os
+from bisect import bisect_right
+
+# The level and badge table shared with the frontend (src/utils/pointsCalculator.ts)
+ACHIEVEMENTS_FILE = os.getenv(
+    'ACHIEVEMENTS_FILE',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 'shared', 'achievements.json')
+)
+
+with open(ACHIEVEMENTS_FILE) as f:
+    _table = json.load(f)
+
+# Points at which each level starts: level n from LEVEL_THRESHOLDS[n - 1]
+LEVEL_THRESHOLDS = tuple(_table['levels'])
+MAX_LEVEL = len(LEVEL_THRESHOLDS)
+
+# Badge id -> badge, in table order
+BADGES = {badge['id']: badge for badge in _table['badges']}
+
+def _ladders():
+    """Criterion -> (sorted thresholds, badge ids in the same order)"""
+    ladders = {}
+    for badge in BADGES.values():
+        for criterion, threshold in badge['criteria'].items():
+            ladders.setdefault(criterion, []).append((threshold, badge['id']))
+    return {
+        criterion: ([threshold for threshold, _ in sorted(steps)], [badge_id for _, badge_id in sorted(steps)])
+        for criterion, steps in ladders.items()
+    }
+
+# The badges a total reaches are the prefix of its ladder up to one bisect
+_LADDERS = _ladders()
+
+# Start of the level after each level (None after the top one), by level - 1
+_NEXT_THRESHOLDS = LEVEL_THRESHOLDS[1:] + (None,)
+
+def calculate_level(points):
+    """Level reached with `points`"""
+    # The first threshold is 0, so only negative totals find nothing
+    return bisect_right(LEVEL_THRESHOLDS, points) or 1
+
+def calculate_next_level_points(points):
+    """Points at which the next level starts, or None at the top level"""
+    return _NEXT_THRESHOLDS[(bisect_right(LEVEL_THRESHOLDS, points) or 1) - 1]
+
+def needs_criterion(criterion, held):
+    """Whether any badge not yet held depends on `criterion` (so it is worth computing)"""
+    return any(badge_id not in held for badge_id in _LADDERS.get(criterion, ((), ()))[1])
+
+def earned_badges(stats):
+    """Ids of every badge `stats` qualify for (events, hours, level, categories; missing ones count as 0)"""
+    candidates = set()
+    for criterion, (thresholds, badge_ids) in _LADDERS.items():
+        candidates.update(badge_ids[:bisect_right(thresholds, stats.get(criterion, 0))])
+    # A badge with several criteria needs all of them
+    return [
+        badge_id for badge_id in BADGES
+        if badge_id in candidates and all(stats.get(c, 0) >= t for c, t in BADGES[badge_id]['criteria'].items())
+    ]
+
+def badge_id(stored):
+    # Badges stored before earned dates were kept are plain ids
+    return stored if isinstance(stored, str) else stored.get('id')
+
+def badge_details(stored):
+    """A stored badge with its name, description and icon from the table"""
+    identifier = badge_id(stored)
+    badge = BADGES.get(identifier, {})
+    earned_at = None if isinstance(stored, str) else stored.get('earned_at')
+    return {
+        'id': identifier,
+        'name': badge.get('name', identifier),
+        'description': badge.get('description', ''),
+        'icon': badge.get('icon', 'award'),
+        'earnedDate': earned_at.isoformat() if earned_at else None
+    }
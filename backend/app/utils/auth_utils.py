@@ -1,9 +1,12 @@
 import jwt
 import os
+import uuid
 from functools import wraps
-from flask import request, jsonify
+from flask import request, jsonify, g
 from datetime import datetime, timedelta
-from app import db, bcrypt
+from app import bcrypt
+from app.models.user import get_user_by_id
+from app.models.revocation import is_revoked
 from dotenv import load_dotenv
 from bson.objectid import ObjectId
 
@@ -11,15 +14,26 @@ load_dotenv()
 
 JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY')
 
+TOKEN_LIFETIME = timedelta(days=1)
+
+# WSGI environ key under which /api/batch passes its authenticated user to sub-requests.
+# Clients cannot set environ keys (headers arrive as HTTP_*), so this cannot be forged
+BATCH_USER_ENVIRON_KEY = 'samarthanam.batch_user'
+
 def generate_token(user_id, role):
     """Generate a JWT token for a user"""
     # Ensure user_id is a string
     user_id_str = str(user_id)
     
+    now = datetime.utcnow()
     payload = {
         'user_id': user_id_str,
         'role': role,
-        'exp': datetime.utcnow() + timedelta(days=1)
+        # Token id, so this token alone can be revoked (logout)
+        'jti': uuid.uuid4().hex,
+        # Sub-second, so revoking a user's tokens spares one issued right after
+        'iat': (now - datetime(1970, 1, 1)).total_seconds(),
+        'exp': now + TOKEN_LIFETIME
     }
     
     token = jwt.encode(payload, JWT_SECRET_KEY, algorithm='HS256')
@@ -27,10 +41,25 @@ def generate_token(user_id, role):
     
     return token
 
+def token_issued_at(data):
+    """When a decoded token was issued (tokens from before `iat` was set: a lifetime before expiry)"""
+    if 'iat' in data:
+        return datetime.utcfromtimestamp(data['iat'])
+    return datetime.utcfromtimestamp(data['exp']) - TOKEN_LIFETIME
+
+def token_revoked(data):
+    """Whether a decoded token was revoked (a filter lookup; no database read for almost every token)"""
+    return is_revoked(data.get('jti'), data['user_id'], token_issued_at(data))
+
 def token_required(f):
     """Decorator for protected routes"""
     @wraps(f)
     def decorated(*args, **kwargs):
+        # Sub-requests of a batch were authenticated once by the batch itself
+        batch_user = request.environ.get(BATCH_USER_ENVIRON_KEY)
+        if batch_user is not None:
+            return f(batch_user, *args, **kwargs)
+        
         token = None
         if 'Authorization' in request.headers:
             auth_header = request.headers['Authorization']
@@ -51,12 +80,23 @@ def token_required(f):
             except Exception as e:
                 print(f"Error converting to ObjectId: {str(e)}")
                 return jsonify({'message': 'Invalid user ID format!'}), 401
+            
+            if token_revoked(data):
+                print(f"Revoked token used for user {data['user_id']}")
+                return jsonify({'message': 'Token has been revoked!'}), 401
                 
-            current_user = db.users.find_one({'_id': user_id})
+            current_user = get_user_by_id(user_id)
             
             if not current_user:
                 print(f"User not found with ID: {data['user_id']}")
                 return jsonify({'message': 'User not found!'}), 401
+            
+            if current_user.get('is_active') is False:
+                print(f"Deactivated user {data['user_id']} refused")
+                return jsonify({'message': 'Account is deactivated!'}), 401
+            
+            # For routes acting on the token itself (logout)
+            g.token_claims = data
                 
             print("Authentication successful for role:", data['role'])
             return f(current_user, *args, **kwargs)
@@ -76,6 +116,12 @@ def admin_required(f):
     """Decorator for admin-only routes"""
     @wraps(f)
     def decorated(*args, **kwargs):
+        batch_user = request.environ.get(BATCH_USER_ENVIRON_KEY)
+        if batch_user is not None:
+            if batch_user.get('role') != 'admin':
+                return jsonify({'message': 'Admin access required!'}), 403
+            return f(batch_user, *args, **kwargs)
+        
         token = None
         if 'Authorization' in request.headers:
             auth_header = request.headers['Authorization']
@@ -100,12 +146,23 @@ def admin_required(f):
             except Exception as e:
                 print(f"Error converting to ObjectId: {str(e)}")
                 return jsonify({'message': 'Invalid user ID format!'}), 401
+            
+            if token_revoked(data):
+                print(f"Revoked token used for user {data['user_id']}")
+                return jsonify({'message': 'Token has been revoked!'}), 401
                 
-            current_user = db.users.find_one({'_id': user_id})
+            current_user = get_user_by_id(user_id)
             
             if not current_user:
                 print(f"User not found with ID: {data['user_id']}")
                 return jsonify({'message': 'User not found!'}), 401
+            
+            if current_user.get('is_active') is False:
+                print(f"Deactivated user {data['user_id']} refused")
+                return jsonify({'message': 'Account is deactivated!'}), 401
+            
+            # For routes acting on the token itself (logout)
+            g.token_claims = data
                 
             print("Admin authentication successful")
             return f(current_user, *args, **kwargs)
@@ -0,0 +1,42 @@
+import hashlib
+import math
+
+class BloomFilter:
+    """A set of strings that answers "maybe" or "definitely not" in fixed memory
+
+    Never misses an added key; answers "maybe" for an absent one with about
+    `error_rate` probability while at most `capacity` keys are added.
+    Keys cannot be removed: rebuild the filter to drop them.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = max(int(capacity), 1)
+        self.bit_count = max(int(-self.capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hash_count = max(round(self.bit_count / self.capacity * math.log(2)), 1)
+        self.bits = bytearray((self.bit_count + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        # Two 64-bit hashes combined give every position (Kirsch-Mitzenmacher)
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.bit_count for i in range(self.hash_count)]
+
+    def add(self, key):
+        added = False
+        for position in self._positions(key):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                added = True
+        # Keys added again (or already answered "maybe") do not count towards capacity
+        if added:
+            self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    @property
+    def full(self):
+        return self.count >= self.capacity
@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+# Collection name -> functions called with a changed document's id (as a string)
+_invalidation_handlers = {}
+
+# Collection name -> fields whose updates never make a cached value stale
+_ignored_fields = {}
+_caches = []
+
+# Caches only answer while something keeps them in step with the database
+# (the change stream invalidation bus sets this)
+_active = threading.Event()
+
+class LocalCache:
+    """Thread-safe in-process LRU cache with a TTL backstop
+
+    Cached values are shared between requests and must be treated as read-only.
+    With `immutable`, values never change once written (they only expire), so
+    they are served even while nothing keeps caches in step with the database.
+    """
+
+    def __init__(self, name, max_size=1024, ttl=300, immutable=False):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.immutable = immutable
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+        _caches.append(self)
+
+    def version(self):
+        """Token to take before reading from the database and pass back to set()
+
+        Any eviction in between changes the version, so a value read before a
+        concurrent write can never be stored after that write's eviction.
+        """
+        return self._version
+
+    def get(self, key, default=None):
+        if not (self.immutable or _active.is_set()):
+            return default
+        with self._lock:
+            item = self._items.get(key, _MISSING)
+            if item is _MISSING or item[1] < time.monotonic():
+                self.misses += 1
+                return default
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def set(self, key, value, version, ttl=None):
+        if not (self.immutable or _active.is_set()):
+            return
+        with self._lock:
+            if version != self._version:
+                return
+            self._items[key] = (value, time.monotonic() + (ttl or self.ttl))
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._version += 1
+            self._items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._version += 1
+            self._items.clear()
+
+def on_change(collection, handler):
+    """Register a function to call with the id of each changed document in a collection"""
+    _invalidation_handlers.setdefault(collection, []).append(handler)
+
+def invalidate(collection, document_id):
+    """Evict everything cached for one document (local writes and the invalidation bus)"""
+    for handler in _invalidation_handlers.get(collection, []):
+        handler(str(document_id))
+
+def ignore_updates_to(collection, fields):
+    """Skip invalidation for updates that only touch these fields"""
+    _ignored_fields.setdefault(collection, set()).update(fields)
+
+def is_ignored_update(collection, changed_fields):
+    ignored = _ignored_fields.get(collection)
+    return bool(ignored) and bool(changed_fields) and all(
+        field.split('.')[0] in ignored for field in changed_fields
+    )
+
+def watched_collections():
+    return list(_invalidation_handlers)
+
+def clear_all():
+    """Drop every cached value, e.g. after changes may have been missed"""
+    for cache in _caches:
+        cache.clear()
+
+def set_active(active):
+    """Turn caching on or off for the whole process; turning it off also empties the caches"""
+    if active:
+        _active.set()
+    else:
+        _active.clear()
+        clear_all()
+
+def is_active():
+    return _active.is_set()
+
+def cache_stats():
+    return {cache.name: {'size': len(cache._items), 'hits': cache.hits, 'misses': cache.misses} for cache in _caches}
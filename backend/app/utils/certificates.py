@@ -0,0 +1,153 @@
+import hashlib
+import hmac
+import io
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from PIL import Image, ImageDraw, ImageFont
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Bump whenever the layout below changes so previously rendered files are not reused
+TEMPLATE_VERSION = 'certificate-v1'
+
+CERTIFICATE_FORMATS = {'pdf': 'application/pdf', 'png': 'image/png'}
+
+CERTIFICATE_DIR = os.getenv(
+    'CERTIFICATE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'storage', 'certificates')
+)
+
+# Below this many missing certificates, rendering in-process beats starting the pool
+POOL_THRESHOLD = 4
+
+# A4 landscape at 150 dpi
+PAGE_SIZE = (1754, 1240)
+ORANGE = '#FF7A30'
+OFF_BLACK = '#333333'
+
+_pool = None
+
+def certificate_fields(event, user, certificate_type, hours=None):
+    """Collect exactly the values printed on a certificate"""
+    return {
+        'template': TEMPLATE_VERSION,
+        'certificate_type': certificate_type,
+        'user_id': str(user['_id']),
+        'user_name': user['name'],
+        'event_id': str(event['_id']),
+        'event_name': event.get('event_name', ''),
+        'start_date': event.get('start_date', ''),
+        'location': event.get('location', ''),
+        'hours': hours
+    }
+
+def certificate_key(fields):
+    """Content address of a certificate: an HMAC of everything printed on it
+
+    Keyed with the app secret so certificate URLs cannot be guessed from
+    public event and user data.
+    """
+    payload = json.dumps(fields, sort_keys=True).encode('utf-8')
+    secret = (os.getenv('JWT_SECRET_KEY') or '').encode('utf-8')
+    return hmac.new(secret, payload, hashlib.sha256).hexdigest()
+
+def certificate_path(key, fmt):
+    """Path of a stored certificate, sharded by the first two key characters"""
+    return os.path.join(CERTIFICATE_DIR, key[:2], f"{key}.{fmt}")
+
+def _font(size):
+    try:
+        return ImageFont.truetype('DejaVuSans.ttf', size)
+    except OSError:
+        return ImageFont.load_default(size=size)
+
+def _centered(draw, y, text, size, fill=OFF_BLACK):
+    font = _font(size)
+    width = draw.textlength(text, font=font)
+    draw.text(((PAGE_SIZE[0] - width) / 2, y), text, font=font, fill=fill)
+
+def render_certificate(fields, fmt):
+    """Render a certificate to PDF or PNG bytes (same layout as VolunteerCertificate.tsx)"""
+    image = Image.new('RGB', PAGE_SIZE, 'white')
+    draw = ImageDraw.Draw(image)
+
+    draw.rectangle([30, 30, PAGE_SIZE[0] - 30, PAGE_SIZE[1] - 30], outline=ORANGE, width=12)
+    draw.rectangle([60, 60, PAGE_SIZE[0] - 60, PAGE_SIZE[1] - 60], outline=OFF_BLACK, width=2)
+
+    title = 'CERTIFICATE OF VOLUNTEERING' if fields['certificate_type'] == 'volunteer' else 'CERTIFICATE OF PARTICIPATION'
+    _centered(draw, 170, title, 72)
+    _centered(draw, 330, 'This is to certify that', 36)
+    _centered(draw, 420, fields['user_name'], 96, fill=ORANGE)
+
+    if fields['certificate_type'] == 'volunteer':
+        action = f"has volunteered {fields['hours'] or 0} hours at"
+    else:
+        action = 'has participated in'
+    _centered(draw, 590, action, 36)
+    _centered(draw, 650, f"\"{fields['event_name']}\" organized by Samarthanam Trust for the Disabled", 36)
+
+    try:
+        start = datetime.strptime(fields['start_date'], '%Y-%m-%d')
+        event_date = f"{start:%B} {start.day}, {start.year}"
+    except ValueError:
+        event_date = fields['start_date']
+    _centered(draw, 760, f"Event Date: {event_date}", 30)
+    _centered(draw, 810, f"Location: {fields['location']}", 30)
+
+    for x, role in ((PAGE_SIZE[0] * 0.25, 'Event Organizer'), (PAGE_SIZE[0] * 0.75, 'Director')):
+        draw.line([x - 200, 990, x + 200, 990], fill=OFF_BLACK, width=2)
+        font = _font(28)
+        for y, text in ((1005, role), (1045, 'Samarthanam Trust')):
+            draw.text((x - draw.textlength(text, font=font) / 2, y), text, font=font, fill=OFF_BLACK)
+
+    _centered(draw, 1130, f"Certificate ID: {certificate_key(fields)[:16]}", 22)
+
+    output = io.BytesIO()
+    if fmt == 'pdf':
+        image.save(output, format='PDF', resolution=150)
+    else:
+        image.save(output, format='PNG', optimize=True)
+    return output.getvalue()
+
+def _render_to_file(job):
+    """Render one certificate and store it atomically (runs in pool workers)"""
+    path, fields, fmt = job
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(render_certificate(fields, fmt))
+    os.replace(temp_path, path)
+    return path
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=int(os.getenv('CERTIFICATE_WORKERS', os.cpu_count() or 2)))
+    return _pool
+
+def issue_certificates(fields_list, fmt='pdf'):
+    """Make sure a stored certificate exists for each set of fields
+
+    Already stored certificates cost a stat call; missing ones are rendered
+    in parallel across the process pool. Returns the keys in input order.
+    """
+    keys = [certificate_key(fields) for fields in fields_list]
+    jobs = [
+        (certificate_path(key, fmt), fields, fmt)
+        for key, fields in zip(keys, fields_list)
+        if not os.path.exists(certificate_path(key, fmt))
+    ]
+
+    if len(jobs) >= POOL_THRESHOLD:
+        list(_get_pool().map(_render_to_file, jobs))
+    else:
+        for job in jobs:
+            _render_to_file(job)
+
+    if jobs:
+        print(f"Rendered {len(jobs)} certificates ({len(fields_list) - len(jobs)} already stored)")
+    return keys
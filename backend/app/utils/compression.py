@@ -0,0 +1,197 @@
+import gzip
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from flask import request
+
+# brotli and zstandard are optional: without them those encodings are never offered
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Bodies smaller than this gain little and cost a compressor call
+MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+
+# Total size of compressed bodies kept for repeat requests
+CACHE_BYTES = int(os.getenv('COMPRESS_CACHE_BYTES', 32 * 1024 * 1024))
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/html', 'text/plain', 'text/csv', 'text/css', 'application/javascript')
+
+def _gzip(data):
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+def _brotli(data):
+    return brotli.compress(data, quality=5)
+
+_zstd_local = threading.local()
+
+def _zstd(data):
+    # Compressor objects are not thread-safe; keep one per thread
+    compressor = getattr(_zstd_local, 'compressor', None)
+    if compressor is None:
+        compressor = _zstd_local.compressor = zstandard.ZstdCompressor(level=3)
+    return compressor.compress(data)
+
+# Encoding -> compressor, in server preference order for equal client q-values
+ENCODERS = OrderedDict()
+if zstandard is not None:
+    ENCODERS['zstd'] = _zstd
+if brotli is not None:
+    ENCODERS['br'] = _brotli
+ENCODERS['gzip'] = _gzip
+
+class CompressedBodyCache:
+    """LRU of compressed bodies keyed by (content hash, encoding), bounded in bytes"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._items.get(key)
+            if body is not None:
+                self._items.move_to_end(key)
+            return body
+
+    def set(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._items[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted)
+
+body_cache = CompressedBodyCache(CACHE_BYTES)
+
+_stats_lock = threading.Lock()
+_stats = {}
+
+def _record(encoding, original_size, compressed_size, cpu_seconds, cache_hit):
+    with _stats_lock:
+        stats = _stats.setdefault(encoding, {
+            'responses': 0, 'cache_hits': 0, 'bytes_in': 0, 'bytes_out': 0, 'cpu_seconds': 0.0
+        })
+        stats['responses'] += 1
+        stats['cache_hits'] += int(cache_hit)
+        stats['bytes_in'] += original_size
+        stats['bytes_out'] += compressed_size
+        stats['cpu_seconds'] += cpu_seconds
+
+def compression_stats():
+    """Per-encoding totals for this process, with the overall compression ratio"""
+    with _stats_lock:
+        result = {}
+        for encoding, stats in _stats.items():
+            result[encoding] = dict(
+                stats,
+                ratio=round(stats['bytes_in'] / stats['bytes_out'], 2) if stats['bytes_out'] else None,
+                cpu_seconds=round(stats['cpu_seconds'], 4)
+            )
+    return {
+        'encodings': result,
+        'available': list(ENCODERS),
+        'cache': {'entries': len(body_cache._items), 'bytes': body_cache.size, 'max_bytes': body_cache.max_bytes}
+    }
+
+def negotiate(accept_encoding):
+    """Pick the best encoding we support from an Accept-Encoding header, or None"""
+    weights = {}
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+
+    best, best_q = None, 0.0
+    for encoding in ENCODERS:
+        q = weights.get(encoding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+def _etag_matches(header, etags):
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    sent = set()
+    for tag in header.split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        sent.add(tag.strip('"'))
+    return any(tag in sent for tag in etags)
+
+def compress_response(response):
+    """after_request hook: compress large text responses in the encoding the client prefers
+
+    GET responses get a content-hash ETag (suffixed per encoding) and answer
+    If-None-Match with 304. Compressed bodies are cached by that hash, so the
+    same listing served again costs a hash and a lookup instead of a compression.
+    """
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code != 200
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES
+            or response.cache_control.no_transform):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    is_get = request.method == 'GET'
+    content_hash = hashlib.sha1(data).hexdigest() if is_get else None
+
+    encoding = negotiate(request.headers.get('Accept-Encoding')) if len(data) >= MIN_SIZE else None
+    if content_hash:
+        etag = f"{content_hash}-{encoding}" if encoding else content_hash
+        response.set_etag(etag)
+        if _etag_matches(request.headers.get('If-None-Match'), (etag, content_hash)):
+            response.status_code = 304
+            response.set_data(b'')
+            response.headers.pop('Content-Length', None)
+            return response
+
+    if encoding is None:
+        return response
+
+    body = body_cache.get((content_hash, encoding)) if content_hash else None
+    cache_hit = body is not None
+    started = time.thread_time()
+    if body is None:
+        body = ENCODERS[encoding](data)
+        if content_hash:
+            body_cache.set((content_hash, encoding), body)
+    _record(encoding, len(data), len(body), time.thread_time() - started, cache_hit)
+
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+def init_compression(app):
+    """Register response compression on the app (COMPRESS_RESPONSES=0 disables it)"""
+    if os.getenv('COMPRESS_RESPONSES', '1') == '1':
+        app.after_request(compress_response)
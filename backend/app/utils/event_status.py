@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+
+# Statuses the scheduler moves events through; any other status (e.g. 'Cancelled')
+# is set by an admin and left alone
+SCHEDULED_STATUSES = ('Upcoming', 'Ongoing', 'Completed')
+
+def _parse_day(value):
+    """Midnight (UTC) of a 'YYYY-MM-DD' (or ISO datetime) date string, or None"""
+    try:
+        return datetime.strptime(str(value)[:10], '%Y-%m-%d')
+    except (TypeError, ValueError):
+        return None
+
+def is_scheduled_status(status):
+    return not status or status.capitalize() in SCHEDULED_STATUSES
+
+def status_schedule(start_date, end_date, now=None):
+    """Current status of an event from its dates, and when that status next changes
+
+    Events are Ongoing from midnight of start_date until the end of end_date.
+    Returns (status, due_at); due_at is None once the event is Completed or if
+    the dates cannot be parsed (status is None then too).
+    """
+    start = _parse_day(start_date)
+    end = _parse_day(end_date) or start
+    if not start:
+        return None, None
+
+    now = now or datetime.utcnow()
+    ends_at = max(start, end) + timedelta(days=1)
+
+    if now < start:
+        return 'Upcoming', start
+    if now < ends_at:
+        return 'Ongoing', ends_at
+    return 'Completed', None
+
+def status_fields(start_date, end_date, status=None, now=None):
+    """Fields to store on an event so the scheduler keeps its status current"""
+    if not is_scheduled_status(status):
+        return {'status': status, 'status_due_at': None}
+
+    derived, due_at = status_schedule(start_date, end_date, now)
+    if not derived:
+        return {'status': status.capitalize() if status else 'Upcoming', 'status_due_at': None}
+    return {'status': derived, 'status_due_at': due_at}
@@ -0,0 +1,42 @@
+class FieldsError(ValueError):
+    """A fields= parameter names something that may not be requested"""
+
+def parse_fields(raw, allowed):
+    """Parse a comma-separated fields= value against an allow-list
+
+    Returns the requested fields in order, or None (every field) when the
+    parameter was not given.
+    """
+    if raw is None:
+        return None
+    fields = []
+    for field in raw.split(','):
+        field = field.strip()
+        if field and field not in fields:
+            fields.append(field)
+    if not fields:
+        raise FieldsError('fields must name at least one field')
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise FieldsError(f"Unknown fields: {', '.join(unknown)}")
+    return tuple(fields)
+
+def build_projection(fields, sources):
+    """Mongo projection reading only the stored fields behind the requested ones
+
+    `sources` maps each allowed output field to the projection entries it is
+    computed from.
+    """
+    projection = {}
+    for field in fields:
+        projection.update(sources[field])
+    # A parent path already includes its children, and Mongo rejects both together
+    return {
+        path: value for path, value in projection.items()
+        if not any(path.startswith(parent + '.') for parent in projection)
+    }
+
+def select_fields(document, fields, always=()):
+    """Keep only the requested top-level keys (plus any that are always returned)"""
+    keep = set(always) | {field.split('.')[0] for field in fields}
+    return {key: value for key, value in document.items() if key in keep}
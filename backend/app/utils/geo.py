@@ -0,0 +1,78 @@
+import re
+
+# Offline gazetteer for the free-text event locations, as (longitude, latitude).
+# Keys are lower-case. A location matches its full text first, then each
+# comma-separated part ("Hall B, Palace Grounds"), then any place or city it names.
+KNOWN_PLACES = {
+    'samarthanam center': (77.6387, 12.9121),
+    'samarthanam centre': (77.6387, 12.9121),
+    'samarthanam trust': (77.6387, 12.9121),
+    'cubbon park': (77.5929, 12.9763),
+    'lalbagh': (77.5848, 12.9507),
+    'lalbagh botanical garden': (77.5848, 12.9507),
+    'freedom park': (77.5806, 12.9777),
+    'palace grounds': (77.5920, 13.0010),
+    'bangalore palace': (77.5920, 12.9987),
+    'town hall': (77.5867, 12.9637),
+    'kanteerava stadium': (77.5932, 12.9694),
+    'chinnaswamy stadium': (77.5993, 12.9788),
+    'national gallery of modern art': (77.5880, 12.9883),
+    'venkatappa art gallery': (77.5955, 12.9750),
+    'chitrakala parishath': (77.5800, 12.9906),
+    'visvesvaraya museum': (77.5963, 12.9752),
+    'bangalore international exhibition centre': (77.4750, 13.0622),
+    'biec': (77.4750, 13.0622),
+    'nimhans convention centre': (77.5965, 12.9430),
+    'hsr layout': (77.6387, 12.9121),
+    'koramangala': (77.6271, 12.9352),
+    'indiranagar': (77.6408, 12.9719),
+    'jayanagar': (77.5838, 12.9250),
+    'jp nagar': (77.5857, 12.9063),
+    'malleshwaram': (77.5713, 13.0035),
+    'whitefield': (77.7500, 12.9698),
+    'electronic city': (77.6700, 12.8452),
+    'hebbal': (77.5970, 13.0358),
+    'yelahanka': (77.5963, 13.1007),
+    'mg road': (77.6070, 12.9756),
+}
+
+CITIES = {
+    'bangalore': (77.5946, 12.9716),
+    'bengaluru': (77.5946, 12.9716),
+    'mysore': (76.6394, 12.2958),
+    'mysuru': (76.6394, 12.2958),
+    'mangalore': (74.8560, 12.9141),
+    'hubli': (75.1240, 15.3647),
+    'chennai': (80.2707, 13.0827),
+    'hyderabad': (78.4867, 17.3850),
+    'mumbai': (72.8777, 19.0760),
+    'pune': (73.8567, 18.5204),
+    'delhi': (77.1025, 28.7041),
+    'new delhi': (77.2090, 28.6139),
+    'kolkata': (88.3639, 22.5726),
+}
+
+def point(longitude, latitude):
+    """GeoJSON point (longitude first, as GeoJSON and 2dsphere indexes expect)"""
+    return {'type': 'Point', 'coordinates': [float(longitude), float(latitude)]}
+
+def _normalize(text):
+    return re.sub(r'\s+', ' ', re.sub(r'[^\w\s,]', ' ', text.lower())).strip()
+
+def geocode(location):
+    """GeoJSON point for a free-text location from the offline gazetteer, or None"""
+    if not location:
+        return None
+    text = _normalize(location)
+    parts = [part.strip() for part in text.split(',') if part.strip()]
+    for candidate in [text] + parts:
+        if candidate in KNOWN_PLACES:
+            return point(*KNOWN_PLACES[candidate])
+
+    # A known place or city mentioned anywhere, longest names first
+    words = f" {' '.join(parts)} "
+    for table in (KNOWN_PLACES, CITIES):
+        for name in sorted(table, key=len, reverse=True):
+            if f' {name} ' in words:
+                return point(*table[name])
+    return None
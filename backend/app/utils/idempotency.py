@@ -0,0 +1,98 @@
+import hashlib
+from functools import wraps
+import jwt
+from flask import request, jsonify, make_response, Response
+from app.models.idempotency import claim_key, store_response, release_key, PENDING
+from app.utils.auth_utils import BATCH_USER_ENVIRON_KEY, JWT_SECRET_KEY, token_revoked
+from app.utils.cache import LocalCache
+
+# Clients send a unique key with a POST they may retry; a retry with the same
+# key gets the first response back instead of running the request again
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+
+# Set on replayed responses
+REPLAYED_HEADER = 'Idempotent-Replayed'
+
+MAX_KEY_LENGTH = 255
+
+# Finished responses most recently stored or replayed in this process; they never change
+response_cache = LocalCache('idempotency', max_size=2048, ttl=300, immutable=True)
+
+def _sha256(*parts):
+    return hashlib.sha256('\n'.join(parts).encode()).hexdigest()
+
+def _caller():
+    """Id of the user making the request, or None if the request is not authenticated
+
+    Only the token's signature and revocation (a filter lookup) are checked;
+    the route's own authentication runs whenever the request is not a replay.
+    Revoked tokens, including those of deactivated accounts, count as unauthenticated.
+    """
+    batch_user = request.environ.get(BATCH_USER_ENVIRON_KEY)
+    if batch_user is not None:
+        return str(batch_user['_id'])
+    auth_header = request.headers.get('Authorization', '')
+    if not auth_header.startswith('Bearer '):
+        return None
+    try:
+        data = jwt.decode(auth_header.split(' ')[1], JWT_SECRET_KEY, algorithms=['HS256'])
+    except jwt.InvalidTokenError:
+        return None
+    if 'user_id' not in data or token_revoked(data):
+        return None
+    return data['user_id']
+
+def _replay(record):
+    response = Response(bytes(record['body']), status=record['status'], mimetype=record['mimetype'])
+    response.headers[REPLAYED_HEADER] = 'true'
+    return response
+
+def idempotent(f):
+    """Run a POST at most once per Idempotency-Key and replay its response to retries
+
+    Goes above the route's authentication decorator so replays skip it. Keys
+    are scoped to the calling user and the route; reusing one with a different
+    body is refused. Responses with a 5xx status are not kept, so those
+    requests can be retried.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if key is None:
+            return f(*args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return jsonify({'error': f'{IDEMPOTENCY_HEADER} must be 1 to {MAX_KEY_LENGTH} characters'}), 400
+
+        caller = _caller()
+        if caller is None:
+            # The route rejects it
+            return f(*args, **kwargs)
+
+        record_id = _sha256(caller, request.method, request.path, key)
+        fingerprint = _sha256(request.query_string.decode(), hashlib.sha256(request.get_data()).hexdigest())
+
+        record = response_cache.get(record_id) or claim_key(record_id, fingerprint)
+        if record is not None:
+            if record['fingerprint'] != fingerprint:
+                return jsonify({'error': f'{IDEMPOTENCY_HEADER} was already used with a different request'}), 422
+            if record['state'] == PENDING:
+                return jsonify({'error': f'A request with this {IDEMPOTENCY_HEADER} is still in progress'}), 409
+            response_cache.set(record_id, record, response_cache.version())
+            return _replay(record)
+
+        try:
+            response = make_response(f(*args, **kwargs))
+        except Exception:
+            release_key(record_id)
+            raise
+
+        if response.status_code >= 500 or response.is_streamed:
+            release_key(record_id)
+            return response
+
+        stored = store_response(record_id, response.status_code, response.get_data(), response.mimetype)
+        stored['fingerprint'] = fingerprint
+        response_cache.set(record_id, stored, response_cache.version())
+        return response
+
+    return decorated
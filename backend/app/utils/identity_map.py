@@ -0,0 +1,37 @@
+from flask import g, has_request_context
+from app.utils.cache import on_change
+
+# Documents read during one request, so reading the same one again (a route
+# and the model function it calls, or a decorator and the route) costs nothing.
+# Nothing is kept between requests; the query caches do that.
+
+def _documents():
+    if not has_request_context():
+        return None
+    documents = g.get('identity_map')
+    if documents is None:
+        documents = g.identity_map = {}
+    return documents
+
+def get(collection, document_id):
+    """The copy of a document already read in this request, or None"""
+    documents = _documents()
+    if documents is None:
+        return None
+    return documents.get((collection, str(document_id)))
+
+def put(collection, document):
+    """Remember a full document for the rest of this request"""
+    documents = _documents()
+    if documents is not None and document:
+        documents[(collection, str(document['_id']))] = document
+    return document
+
+def discard(collection, document_id):
+    documents = _documents()
+    if documents is not None:
+        documents.pop((collection, str(document_id)), None)
+
+def track(collection):
+    """Forget a document for the rest of the request whenever it is written"""
+    on_change(collection, lambda document_id: discard(collection, document_id))
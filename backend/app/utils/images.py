@@ -0,0 +1,185 @@
+import hashlib
+import io
+import os
+import re
+import threading
+from PIL import Image, ImageDraw, ImageFont, ImageOps
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Bump whenever the default category artwork changes so new files get new URLs
+DEFAULT_IMAGE_VERSION = 'category-v1'
+
+IMAGE_DIR = os.getenv(
+    'IMAGE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'storage', 'images')
+)
+
+# Image URLs handed to the frontend must be absolute: it runs on another origin
+PUBLIC_API_URL = os.getenv('PUBLIC_API_URL', 'http://localhost:5000').rstrip('/')
+
+# Variant name -> (size, crop). Cropped variants fill the box exactly (cards and
+# thumbnails line up in grids); the detail variant keeps the whole picture
+IMAGE_VARIANTS = {
+    'thumbnail': ((160, 90), True),
+    'card': ((400, 200), True),
+    'detail': ((1200, 900), False)
+}
+
+# Extension -> (Pillow format, mimetype, save options)
+IMAGE_FORMATS = {
+    'webp': ('WEBP', 'image/webp', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True})
+}
+
+IMAGE_ID_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+MAX_UPLOAD_PIXELS = 40_000_000
+
+# Category -> background colour of its default image
+CATEGORY_COLORS = {
+    'education': '#3B82F6',
+    'health': '#10B981',
+    'environment': '#22C55E',
+    'community': '#8B5CF6',
+    'cultural': '#EC4899',
+    'sports': '#FF7A30',
+    'tech': '#0EA5E9',
+    'fundraising': '#F59E0B',
+    'other': '#64748B'
+}
+
+# Default images are named by category and artwork version rather than content,
+# so their ids are known without rendering them
+DEFAULT_IMAGE_IDS = {
+    category: hashlib.sha256(f"{DEFAULT_IMAGE_VERSION}:{category}".encode('utf-8')).hexdigest()
+    for category in CATEGORY_COLORS
+}
+
+# Default images known to be on disk in this process
+_rendered_defaults = set()
+_defaults_lock = threading.Lock()
+
+class ImageError(ValueError):
+    """An upload is not an image we can store"""
+
+def image_dir(image_id):
+    """Directory holding every variant of an image, sharded by the first two id characters"""
+    return os.path.join(IMAGE_DIR, image_id[:2], image_id)
+
+def variant_path(image_id, variant, fmt):
+    return os.path.join(image_dir(image_id), f"{variant}.{fmt}")
+
+def image_url(image_id, variant='card', fmt='jpg'):
+    return f"{PUBLIC_API_URL}/api/images/{image_id}/{variant}.{fmt}"
+
+def image_urls(image_id):
+    """URLs of every stored variant, e.g. for <picture> sources"""
+    return {
+        variant: {fmt: image_url(image_id, variant, fmt) for fmt in IMAGE_FORMATS}
+        for variant in IMAGE_VARIANTS
+    }
+
+def _render_variants(image):
+    """Encode every variant of an already decoded RGB image"""
+    files = {}
+    for variant, (size, crop) in IMAGE_VARIANTS.items():
+        if crop:
+            resized = ImageOps.fit(image, size, Image.LANCZOS)
+        else:
+            resized = image.copy()
+            resized.thumbnail(size, Image.LANCZOS)
+        for fmt, (pil_format, _, options) in IMAGE_FORMATS.items():
+            output = io.BytesIO()
+            resized.save(output, format=pil_format, **options)
+            files[f"{variant}.{fmt}"] = output.getvalue()
+    return files
+
+def _write_variants(image_id, files):
+    """Store variants atomically so a reader never sees a partial file"""
+    directory = image_dir(image_id)
+    os.makedirs(directory, exist_ok=True)
+    for name, data in files.items():
+        path = os.path.join(directory, name)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+def _is_stored(image_id):
+    return all(
+        os.path.exists(variant_path(image_id, variant, fmt))
+        for variant in IMAGE_VARIANTS for fmt in IMAGE_FORMATS
+    )
+
+def _decode(data):
+    try:
+        image = Image.open(io.BytesIO(data))
+        if image.width * image.height > MAX_UPLOAD_PIXELS:
+            raise ImageError('Image dimensions are too large')
+        image.load()
+    except ImageError:
+        raise
+    except Exception:
+        raise ImageError('File is not a supported image')
+
+    # Apply camera rotation, then flatten transparency onto white for JPEG
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+def store_image(data):
+    """Store an uploaded image and all its variants; returns the image id
+
+    The id is the SHA-256 of the upload, so the same file uploaded twice is
+    stored once and variant URLs never change meaning.
+    """
+    if len(data) > MAX_UPLOAD_BYTES:
+        raise ImageError('Image is larger than 10 MB')
+    image_id = hashlib.sha256(data).hexdigest()
+    if not _is_stored(image_id):
+        _write_variants(image_id, _render_variants(_decode(data)))
+    return image_id
+
+def is_stored_image(image_id):
+    return isinstance(image_id, str) and bool(IMAGE_ID_PATTERN.match(image_id)) and os.path.isdir(image_dir(image_id))
+
+def _font(size):
+    try:
+        return ImageFont.truetype('DejaVuSans-Bold.ttf', size)
+    except OSError:
+        return ImageFont.load_default(size=size)
+
+def render_default_image(category):
+    """Plain branded artwork used for events without an uploaded image"""
+    size = IMAGE_VARIANTS['detail'][0]
+    image = Image.new('RGB', size, CATEGORY_COLORS[category])
+    draw = ImageDraw.Draw(image)
+    font = _font(120)
+    text = category.capitalize()
+    width = draw.textlength(text, font=font)
+    draw.text(((size[0] - width) / 2, size[1] / 2 - 70), text, font=font, fill='white')
+    return image
+
+def default_image_id(category):
+    """Id of the default image for a category, rendering it on first use"""
+    category = (category or '').lower()
+    if category not in CATEGORY_COLORS:
+        category = 'other'
+    image_id = DEFAULT_IMAGE_IDS[category]
+
+    if image_id not in _rendered_defaults:
+        with _defaults_lock:
+            if not _is_stored(image_id):
+                _write_variants(image_id, _render_variants(render_default_image(category)))
+            _rendered_defaults.add(image_id)
+    return image_id
+
+def is_default_image(image_id):
+    return image_id in DEFAULT_IMAGE_IDS.values()
@@ -0,0 +1,33 @@
+import msgspec
+from bson import ObjectId
+from flask.json.provider import JSONProvider
+
+def _encode_extra(obj):
+    # datetimes, dates and UUIDs are encoded natively (ISO 8601)
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise NotImplementedError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class MsgspecJSONProvider(JSONProvider):
+    """jsonify() and request.get_json() backed by msgspec
+
+    Responses are encoded straight to bytes in one pass, and ObjectIds in
+    documents become strings without a separate copy.
+    """
+
+    encoder = msgspec.json.Encoder(enc_hook=_encode_extra)
+    decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj, **kwargs):
+        return self.encoder.encode(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        try:
+            return self.decoder.decode(s)
+        except msgspec.DecodeError as e:
+            # Werkzeug turns ValueError into a 400 Bad Request
+            raise ValueError(str(e))
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.encoder.encode(obj), mimetype='application/json')
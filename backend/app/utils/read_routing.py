@@ -0,0 +1,50 @@
+import os
+import time
+from functools import wraps
+from flask import g, request, has_request_context
+from pymongo.read_preferences import SecondaryPreferred
+
+# Views marked @secondary_reads read from secondaries at most this far behind the
+# primary (pymongo does not accept less than 90 seconds)
+MAX_STALENESS_SECONDS = max(90, int(os.getenv('SECONDARY_MAX_STALENESS_SECONDS', 90)))
+
+SECONDARY_READS = SecondaryPreferred(max_staleness=MAX_STALENESS_SECONDS)
+
+# Set on every successful write response (milliseconds since the epoch); clients
+# send it back, and their reads stay on the primary until every secondary that
+# may serve them has caught up with that write
+LAST_WRITE_HEADER = 'X-Last-Write'
+
+# POSTs that change nothing later reads depend on (a batch of GETs; login only stamps last_login)
+UNSTAMPED_ENDPOINTS = ('batch.run_batch', 'auth.login')
+
+def _wrote_recently():
+    try:
+        written_at = float(request.headers.get(LAST_WRITE_HEADER)) / 1000
+    except (TypeError, ValueError):
+        return False
+    return time.time() - written_at < MAX_STALENESS_SECONDS
+
+def secondary_reads(f):
+    """Let a view's listing reads go to secondaries (READ_FROM_SECONDARIES=0 turns this off)"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        g.secondary_reads = os.getenv('READ_FROM_SECONDARIES', '1') == '1' and not _wrote_recently()
+        return f(*args, **kwargs)
+    return decorated
+
+def reads_from_secondaries():
+    return has_request_context() and g.get('secondary_reads', False)
+
+def read_from(collection):
+    """`collection` with the current view's read preference"""
+    if reads_from_secondaries():
+        return collection.with_options(read_preference=SECONDARY_READS)
+    return collection
+
+def stamp_writes(response):
+    """after_request hook: tell the client when it last wrote"""
+    if (request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400
+            and request.endpoint not in UNSTAMPED_ENDPOINTS):
+        response.headers[LAST_WRITE_HEADER] = str(int(time.time() * 1000))
+    return response
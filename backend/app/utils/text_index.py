@@ -0,0 +1,103 @@
+import json
+import os
+import re
+import numpy as np
+
+# BM25 parameters (the usual defaults)
+K1 = 1.2
+B = 0.75
+
+STOPWORDS = frozenset('''
+a an and are as at be by can do does for from how i in is it me my of on or our so
+that the their there this to was we what when where which who will with you your
+'''.split())
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+def _stem(token):
+    # Light plural/verb folding so "events"/"event" and "registering"/"register" match
+    for suffix in ('ing', 'es', 's'):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 4 and not token.endswith('ss'):
+            return token[:-len(suffix)]
+    return token
+
+def tokenize(text):
+    return [_stem(token) for token in _TOKEN.findall((text or '').lower()) if token not in STOPWORDS]
+
+class Segment:
+    """An immutable inverted index over some documents, as CSR arrays
+
+    Postings of term t are doc_ids[indptr[t]:indptr[t + 1]] with their term
+    frequencies in tfs; doc_lengths holds each document's token count. Saved
+    segments are loaded memory-mapped, so opening one costs no parsing.
+    """
+
+    ARRAYS = ('indptr', 'doc_ids', 'tfs', 'doc_lengths')
+
+    def __init__(self, terms, indptr, doc_ids, tfs, doc_lengths):
+        self.terms = terms
+        self.term_ids = {term: i for i, term in enumerate(terms)}
+        self.indptr = indptr
+        self.doc_ids = doc_ids
+        self.tfs = tfs
+        self.doc_lengths = doc_lengths
+
+    @classmethod
+    def build(cls, texts):
+        """Index a list of texts; a document's id is its position in the list"""
+        counts = {}
+        doc_lengths = np.zeros(len(texts), dtype=np.float32)
+        for doc_id, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths[doc_id] = len(tokens)
+            for token in tokens:
+                postings = counts.setdefault(token, {})
+                postings[doc_id] = postings.get(doc_id, 0) + 1
+
+        terms = sorted(counts)
+        sizes = np.fromiter((len(counts[term]) for term in terms), dtype=np.int64, count=len(terms))
+        indptr = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=indptr[1:])
+        doc_ids = np.empty(indptr[-1], dtype=np.int32)
+        tfs = np.empty(indptr[-1], dtype=np.float32)
+        for i, term in enumerate(terms):
+            postings = counts[term]
+            doc_ids[indptr[i]:indptr[i + 1]] = list(postings)
+            tfs[indptr[i]:indptr[i + 1]] = list(postings.values())
+        return cls(terms, indptr, doc_ids, tfs, doc_lengths)
+
+    @property
+    def size(self):
+        return len(self.doc_lengths)
+
+    def document_frequency(self, term):
+        i = self.term_ids.get(term)
+        return 0 if i is None else int(self.indptr[i + 1] - self.indptr[i])
+
+    def scores(self, weighted_terms, average_length):
+        """BM25 score of every document for (term, idf) pairs"""
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term, idf in weighted_terms:
+            i = self.term_ids.get(term)
+            if i is None:
+                continue
+            start, end = self.indptr[i], self.indptr[i + 1]
+            docs = self.doc_ids[start:end]
+            tf = self.tfs[start:end]
+            norm = K1 * (1 - B + B * self.doc_lengths[docs] / average_length)
+            scores += np.bincount(docs, weights=idf * tf * (K1 + 1) / (tf + norm), minlength=self.size).astype(np.float32)
+        return scores
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(os.path.join(directory, f'{name}.npy'), getattr(self, name))
+        with open(os.path.join(directory, 'terms.json'), 'w') as f:
+            json.dump(self.terms, f)
+
+    @classmethod
+    def load(cls, directory):
+        arrays = [np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r') for name in cls.ARRAYS]
+        with open(os.path.join(directory, 'terms.json')) as f:
+            terms = json.load(f)
+        return cls(terms, *arrays)
@@ -0,0 +1,217 @@
+"""Microbenchmarks of the per-request model and serializer hot paths, with regression gating
+
+Runs in-process against mongomock, so it needs no database (pip install -r
+requirements-dev.txt). Each timed unit is a batch of calls taking milliseconds.
+It is timed back to back with a fixed pure-Python calibration loop, and the
+median ratio of several rounds is reported. That keeps baselines recorded on
+one machine comparable on another of a different speed. A benchmark over the
+threshold is timed again before it counts as a regression, so one noisy
+round cannot fail the run.
+
+    python benchmark_hot_paths.py --save     record benchmark_baselines.json
+    python benchmark_hot_paths.py            compare; exits 1 if any benchmark got
+                                             slower than its baseline by more than --threshold
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+# The app connects on import: point it at an in-process stand-in first
+import mongomock
+import pymongo
+pymongo.MongoClient = mongomock.MongoClient
+os.environ['ENABLE_QUERY_CACHE'] = '0'
+
+from bson import ObjectId
+from app import db
+from app.models.event import serialize_event, register_for_event, cancel_registration
+from app.models.user import serialize_user
+from app.routes.user import leaderboard_entry
+from app.utils.achievements import BADGES, calculate_level, calculate_next_level_points
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baselines.json')
+
+# Fail when a benchmark is this much slower than its baseline (0.25 = 25%)
+DEFAULT_THRESHOLD = float(os.getenv('BENCHMARK_THRESHOLD', 0.25))
+
+# Realistic sizes: a popular event, a long-serving volunteer, a full leaderboard page
+PARTICIPANTS = 500
+EVENTS_PER_VOLUNTEER = 60
+BADGES_PER_VOLUNTEER = 8
+LEADERBOARD_SIZE = 20
+
+# Calls per timed batch, so every batch takes milliseconds and timer noise stays small
+SERIALIZE_BATCH = 2000
+ACHIEVEMENT_BATCH = 20
+
+CARD_FIELDS = [
+    'event_name', 'description', 'event_image', 'start_date', 'end_date', 'location',
+    'category', 'participant_limit', 'participant_count', 'points_awarded'
+]
+
+def _event(participants):
+    now = datetime.utcnow()
+    return {
+        '_id': ObjectId(), 'event_name': 'Inclusive Sports Meet', 'description': 'Athletics for all abilities. ' * 20,
+        'start_date': '2099-04-05', 'end_date': '2099-04-05', 'location': 'Kanteerava Stadium', 'category': 'Sports',
+        'status': 'Upcoming', 'publish_event': True, 'points_awarded': 50, 'hours_required': 6,
+        'participant_limit': participants + 100, 'age_restriction': 'No Restriction',
+        'contact_information': 'events@samarthanam.org', 'requirements': ['Water bottle', 'Sports shoes'],
+        'skills_needed': ['First aid', 'Sign language'], 'image_id': 'a' * 64,
+        'participants': [
+            {'user_id': str(ObjectId()), 'role': 'volunteer', 'status': 'registered',
+             'registration_date': (now - timedelta(minutes=i)).isoformat()}
+            for i in range(participants)
+        ],
+        'created_at': now, 'updated_at': now, 'status_due_at': datetime(2099, 4, 5)
+    }
+
+def _volunteer(points):
+    now = datetime.utcnow()
+    return {
+        '_id': ObjectId(), 'name': 'Asha Rao', 'email': 'asha@example.com', 'role': 'volunteer',
+        'profile': {
+            'points': points, 'hours_contributed': points // 10, 'skills': ['Teaching', 'Braille', 'First aid'],
+            'interests': ['Education', 'Sports'], 'bio': 'Weekend volunteer. ' * 5, 'availability': 'Weekends',
+            'phone_number': '+91 9876543210', 'photo_url': '', 'address': 'HSR Layout, Bangalore',
+            'events_participated': [str(ObjectId()) for _ in range(EVENTS_PER_VOLUNTEER)],
+            'certificates': [], 'level': calculate_level(points),
+            'badges': [{'id': badge, 'earned_at': now} for badge in list(BADGES)[:BADGES_PER_VOLUNTEER]]
+        }
+    }
+
+def _calibrate():
+    """A fixed pure-Python workload; its time is the unit every benchmark is reported in"""
+    total = 0
+    for i in range(2000):
+        total += len(str(i)) * (i % 7)
+    return total
+
+def _batch(function, times):
+    def run():
+        for _ in range(times):
+            function()
+    return run
+
+def benchmarks():
+    """name -> function to time; data is built once, outside the timing"""
+    event = _event(PARTICIPANTS)
+    volunteer = _volunteer(640)
+    leaders = [_volunteer(points) for points in range(2000, 0, -2000 // LEADERBOARD_SIZE)]
+    point_values = list(range(0, 2500, 5)) * ACHIEVEMENT_BATCH
+
+    # register_for_event and cancel_registration run their filters on the stored event
+    db.events.delete_many({})
+    stored = _event(PARTICIPANTS)
+    db.events.insert_one(stored)
+    event_id = str(stored['_id'])
+    user_id = ObjectId()
+
+    def register_and_cancel():
+        register_for_event(event_id, user_id, 'volunteer')
+        cancel_registration(event_id, user_id)
+
+    return {
+        f'serialize_event ({PARTICIPANTS} participants) x{SERIALIZE_BATCH}':
+            _batch(lambda: serialize_event(event), SERIALIZE_BATCH),
+        f'serialize_event (card fields) x{SERIALIZE_BATCH}':
+            _batch(lambda: serialize_event(event, CARD_FIELDS), SERIALIZE_BATCH),
+        f'serialize_user ({EVENTS_PER_VOLUNTEER} events) x{SERIALIZE_BATCH}':
+            _batch(lambda: serialize_user(volunteer), SERIALIZE_BATCH),
+        f'calculate_level x{len(point_values)}': lambda: [calculate_level(points) for points in point_values],
+        f'calculate_next_level_points x{len(point_values)}': lambda: [calculate_next_level_points(points) for points in point_values],
+        f'leaderboard rows x{LEADERBOARD_SIZE} x{ACHIEVEMENT_BATCH}':
+            _batch(lambda: [leaderboard_entry(leader, rank) for rank, leader in enumerate(leaders, 1)], ACHIEVEMENT_BATCH),
+        f'register + cancel ({PARTICIPANTS} participants)': register_and_cancel,
+    }
+
+def _time(function, number, repeat):
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number
+
+def _measure(function, number, calibration_number, rounds):
+    """Median over the rounds of the function's time in calibration units, and of the unit in seconds
+
+    Each round times the calibration loop right before the function, so a
+    machine slowing down for a moment slows both.
+    """
+    ratios = []
+    units = []
+    for _ in range(rounds):
+        unit = _time(_calibrate, calibration_number, 3)
+        ratios.append(_time(function, number, 3) / unit)
+        units.append(unit)
+    return statistics.median(ratios), statistics.median(units)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the per-request hot paths and gate regressions')
+    parser.add_argument('--save', action='store_true', help='Record the results as the new baselines')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='Allowed slowdown before failing (0.25 = 25%%)')
+    parser.add_argument('--baselines', default=BASELINE_FILE, help='Baseline file')
+    parser.add_argument('--rounds', type=int, default=7, help='Calibrated timing rounds per benchmark (the median counts)')
+    parser.add_argument('--retries', type=int, default=2, help='Times a benchmark over the threshold is timed again before failing')
+    parser.add_argument('--min-time', type=float, default=0.02, help='Seconds each timing run should take at least')
+    args = parser.parse_args()
+
+    # Enough calls per run that timer resolution does not matter
+    def calls(function):
+        return max(1, int(args.min_time / max(_time(function, 1, 3), 1e-9)))
+
+    calibration_number = calls(_calibrate)
+    functions = benchmarks()
+    numbers = {name: calls(function) for name, function in functions.items()}
+    results = {}
+    units = []
+    for name, function in functions.items():
+        results[name], unit = _measure(function, numbers[name], calibration_number, args.rounds)
+        units.append(unit)
+    unit = statistics.median(units)
+
+    baselines = {}
+    if os.path.exists(args.baselines):
+        with open(args.baselines) as f:
+            baselines = json.load(f).get('benchmarks', {})
+
+    regressions = []
+    print(f"{'Benchmark':<48} {'Time (us)':>10} {'Units':>8} {'Baseline':>9} {'Change':>8}")
+    for name, units in results.items():
+        if name in baselines and not args.save:
+            # A suspected regression must show up again in every retry
+            for _ in range(args.retries):
+                if units / baselines[name] - 1 <= args.threshold:
+                    break
+                units = min(units, _measure(functions[name], numbers[name], calibration_number, args.rounds)[0])
+            results[name] = units
+        line = f'{name:<48} {units * unit * 1e6:>10.1f} {units:>8.4f}'
+        if name in baselines:
+            change = units / baselines[name] - 1
+            status = ''
+            if change > args.threshold and not args.save:
+                regressions.append(name)
+                status = '  REGRESSION'
+            line += f' {baselines[name]:>9.4f} {change:>+7.0%}{status}'
+        else:
+            line += f" {'-':>9} {'new':>8}"
+        print(line)
+
+    if args.save:
+        with open(args.baselines, 'w') as f:
+            json.dump({
+                'unit': 'multiples of the calibration loop',
+                'calibration_us': round(unit * 1e6, 2),
+                'benchmarks': {name: round(units, 6) for name, units in results.items()}
+            }, f, indent=2)
+            f.write('\n')
+        print(f'Baselines saved to {args.baselines}')
+        return 0
+
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) slower than baseline by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""Count MongoDB round trips per request on the event write routes
+
+Runs against the database in MONGO_URI, creating and then removing its own
+users and event. Query caches are turned off so every read is counted; run it
+on an older checkout to compare.
+"""
+import argparse
+import os
+import threading
+import uuid
+from collections import Counter
+from pymongo import monitoring
+
+class RoundTripCounter(monitoring.CommandListener):
+    """Records the commands sent from the benchmark's thread (background workers are left out)"""
+
+    def __init__(self):
+        self.thread_id = threading.get_ident()
+        self.commands = []
+
+    def started(self, event):
+        if threading.get_ident() == self.thread_id:
+            self.commands.append(event.command_name)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+# Listeners only see clients created after they are registered, so this comes before the app import
+counter = RoundTripCounter()
+monitoring.register(counter)
+os.environ['ENABLE_QUERY_CACHE'] = '0'
+os.environ['RUN_STATUS_SCHEDULER'] = '0'
+
+from app import create_app, db
+from app.models.user import create_user
+from app.utils.auth_utils import generate_token
+
+def _headers(user):
+    return {'Authorization': f"Bearer {generate_token(user['_id'], user['role'])}"}
+
+def main():
+    parser = argparse.ArgumentParser(description='Count MongoDB round trips per request on the event write routes')
+    parser.add_argument('--iterations', type=int, default=5, help='Times to repeat each request')
+    args = parser.parse_args()
+
+    if db is None:
+        raise SystemExit('No database connection, check MONGO_URI')
+
+    app = create_app()
+    client = app.test_client()
+    run_id = uuid.uuid4().hex[:8]
+    admin = create_user('Benchmark Admin', f'benchmark-admin-{run_id}@example.com', uuid.uuid4().hex, 'admin')
+    volunteer = create_user('Benchmark Volunteer', f'benchmark-volunteer-{run_id}@example.com', uuid.uuid4().hex, 'volunteer')
+    admin_headers, volunteer_headers = _headers(admin), _headers(volunteer)
+
+    results = {}
+
+    def measure(name, send, expected_status):
+        counter.commands = []
+        response = send()
+        if response.status_code != expected_status:
+            raise SystemExit(f'{name} returned {response.status_code}: {response.get_json()}')
+        runs = results.setdefault(name, [])
+        runs.append(list(counter.commands))
+        return response
+
+    try:
+        response = client.post('/api/events', headers=admin_headers, json={
+            'event_name': f'Round trip benchmark {run_id}',
+            'description': 'Created by benchmark_round_trips.py',
+            'start_date': '2099-01-01',
+            'end_date': '2099-01-02',
+            'location': 'Benchmark',
+            'category': 'Other',
+            'participant_limit': 10,
+            'publish_event': True
+        })
+        event_id = response.get_json()['event']['event_id']
+
+        for i in range(args.iterations):
+            measure('PUT /events/<id>', lambda: client.put(
+                f'/api/events/{event_id}', headers=admin_headers, json={'description': f'Edit {i}'}), 200)
+            measure('POST /events/<id>/register', lambda: client.post(
+                f'/api/events/{event_id}/register', headers=volunteer_headers), 200)
+            measure('POST /events/<id>/register (already registered)', lambda: client.post(
+                f'/api/events/{event_id}/register', headers=volunteer_headers), 400)
+            measure('POST /events/<id>/cancel', lambda: client.post(
+                f'/api/events/{event_id}/cancel', headers=volunteer_headers), 200)
+            measure('POST /events/<id>/cancel (not registered)', lambda: client.post(
+                f'/api/events/{event_id}/cancel', headers=volunteer_headers), 400)
+        measure('DELETE /events/<id>', lambda: client.delete(f'/api/events/{event_id}', headers=admin_headers), 200)
+    finally:
+        db.events.delete_many({'event_name': f'Round trip benchmark {run_id}'})
+        db.users.delete_many({'_id': {'$in': [admin['_id'], volunteer['_id']]}})
+
+    print(f"{'Request':<50} {'Round trips':>11}  Commands")
+    for name, runs in results.items():
+        average = sum(len(commands) for commands in runs) / len(runs)
+        commands = Counter(command for run in runs for command in run)
+        summary = ', '.join(f'{command} x{round(count / len(runs), 1):g}' for command, count in commands.items())
+        print(f'{name:<50} {average:>11.1f}  {summary}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""Time request validation and response encoding per request
+
+Compares the msgspec schemas and JSON provider with the hand-rolled checks
+and Flask's default JSON provider they replaced. Needs no database.
+"""
+import argparse
+import json
+import timeit
+from datetime import datetime
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from app.models.schemas import EventCreate, Registration, PROFILE_SCHEMAS, decode, convert, to_fields
+from app.utils.json_provider import MsgspecJSONProvider
+
+EVENT_BODY = json.dumps({
+    'event_name': 'Beach Clean-up Drive', 'description': 'Help us clean the beach. ' * 10,
+    'start_date': '2099-03-01', 'end_date': '2099-03-01', 'location': 'Marina Beach', 'category': 'Environment',
+    'publish_event': True, 'points_awarded': '50', 'hours_required': '4', 'participant_limit': '40',
+    'age_restriction': '16+', 'contact_information': 'events@samarthanam.org',
+    'requirements': ['Gloves', 'Water bottle'], 'skills_needed': ['Teamwork']
+}).encode()
+
+REGISTRATION_BODY = json.dumps({
+    'name': 'Asha Rao', 'email': 'asha@example.com', 'password': 'secret123', 'role': 'volunteer',
+    'profile': {'skills': ['Teaching', 'Braille'], 'interests': ['Education'], 'bio': 'Weekend volunteer', 'phone_number': '+91 9876543210'}
+}).encode()
+
+# The checks the schemas replaced, as add_event and create_user did them
+def legacy_event(body):
+    data = json.loads(body)
+    required_fields = ['event_name', 'description', 'start_date', 'end_date', 'location', 'category']
+    missing_fields = [field for field in required_fields if not data.get(field)]
+    if missing_fields:
+        raise ValueError(missing_fields)
+    return {
+        'event_name': data.get('event_name', ''), 'description': data.get('description', ''),
+        'start_date': data.get('start_date', ''), 'end_date': data.get('end_date', ''),
+        'location': data.get('location', ''), 'category': data.get('category', ''),
+        'publish_event': data.get('publish_event', False),
+        'points_awarded': int(data.get('points_awarded', 0)), 'hours_required': int(data.get('hours_required', 0)),
+        'participant_limit': int(data.get('participant_limit', 0)),
+        'age_restriction': data.get('age_restriction', 'No Restriction'),
+        'contact_information': data.get('contact_information', ''),
+        'image_id': data.get('image_id'), 'event_image': data.get('event_image') or None,
+        'requirements': data.get('requirements', []), 'skills_needed': data.get('skills_needed', [])
+    }
+
+def legacy_registration(body):
+    data = json.loads(body)
+    if not all(k in data for k in ['name', 'email', 'password']):
+        raise ValueError('Missing required fields')
+    if data.get('role', 'volunteer') not in ['volunteer', 'participant', 'admin']:
+        raise ValueError('Invalid role')
+    additional_data = data.get('profile', {})
+    return {
+        'skills': additional_data.get('skills', []) if additional_data else [],
+        'interests': additional_data.get('interests', []) if additional_data else [],
+        'bio': additional_data.get('bio', '') if additional_data else '',
+        'availability': additional_data.get('availability', '') if additional_data else '',
+        'points': 0,
+        'hours_contributed': 0,
+        'events_participated': [],
+        'phone_number': additional_data.get('phone_number', '') if additional_data else '',
+        'photo_url': '',
+        'address': additional_data.get('address', '') if additional_data else '',
+        'certificates': [],
+        'badges': []
+    }
+
+def schema_event(body):
+    return to_fields(decode(body, EventCreate))
+
+def schema_registration(body):
+    registration = decode(body, Registration)
+    return to_fields(convert(registration.profile, PROFILE_SCHEMAS[registration.role]))
+
+def event_listing(count):
+    """A GET /api/events response body as the route builds it"""
+    now = datetime.utcnow()
+    return [{
+        'event_id': f'{i:024x}', 'event_name': f'Event {i}', 'description': 'Help us clean the beach. ' * 10,
+        'start_date': '2099-03-01', 'end_date': '2099-03-01', 'location': 'Marina Beach', 'category': 'Environment',
+        'status': 'Upcoming', 'publish_event': True, 'points_awarded': 50, 'hours_required': 4,
+        'participant_limit': 40, 'participant_count': 12, 'requirements': ['Gloves'], 'skills_needed': ['Teamwork'],
+        'participants': [{'user_id': f'{j:024x}', 'role': 'volunteer', 'status': 'registered'} for j in range(12)],
+        'event_image': f'http://localhost:5000/api/images/{i:064x}/card.jpg',
+        'created_at': now, 'updated_at': now
+    } for i in range(count)]
+
+def _time(function, number):
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description='Time request validation and response encoding per request')
+    parser.add_argument('--number', type=int, default=2000, help='Calls per timing run')
+    parser.add_argument('--events', type=int, default=50, help='Events in the encoded listing')
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    default_provider = DefaultJSONProvider(app)
+    msgspec_provider = MsgspecJSONProvider(app)
+    listing = event_listing(args.events)
+
+    cases = [
+        ('Decode + validate event', lambda: legacy_event(EVENT_BODY), lambda: schema_event(EVENT_BODY)),
+        ('Decode + validate registration', lambda: legacy_registration(REGISTRATION_BODY), lambda: schema_registration(REGISTRATION_BODY)),
+    ]
+    with app.app_context():
+        cases.append((
+            f'Encode listing of {args.events} events',
+            lambda: default_provider.response(listing), lambda: msgspec_provider.response(listing)
+        ))
+
+        print(f"{'Per request':<36} {'Before (us)':>12} {'After (us)':>12} {'Speed-up':>9}")
+        for name, before, after in cases:
+            before_us = _time(before, args.number)
+            after_us = _time(after, args.number)
+            print(f'{name:<36} {before_us:>12.1f} {after_us:>12.1f} {before_us / after_us:>8.1f}x')
+
+if __name__ == '__main__':
+    main()
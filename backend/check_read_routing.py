@@ -0,0 +1,85 @@
+"""Show which replica set member serves each request's reads
+
+Run against a replica set (see start_replica_set.sh). Listing, search and
+leaderboard reads should go to a secondary, everything else to the primary,
+and a client that just wrote (X-Last-Write) should read from the primary.
+The token lookup of an authenticated request always reads from the primary.
+Creates and then removes its own admin user.
+"""
+import os
+import threading
+import uuid
+from pymongo import monitoring
+
+class ServerRecorder(monitoring.CommandListener):
+    """Records the member each command from this thread was sent to"""
+
+    def __init__(self):
+        self.thread_id = threading.get_ident()
+        self.servers = []
+
+    def started(self, event):
+        if threading.get_ident() == self.thread_id and event.command_name in ('find', 'aggregate', 'count'):
+            self.servers.append(event.connection_id)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+# Listeners only see clients created after they are registered, so this comes before the app import
+recorder = ServerRecorder()
+monitoring.register(recorder)
+os.environ['ENABLE_QUERY_CACHE'] = '0'
+os.environ['RUN_STATUS_SCHEDULER'] = '0'
+
+from app import create_app, db, mongo_client
+from app.utils.read_routing import LAST_WRITE_HEADER
+
+def main():
+    if db is None:
+        raise SystemExit('No database connection, check MONGO_URI')
+    if not mongo_client.secondaries:
+        raise SystemExit('No secondaries found; MONGO_URI must name a replica set')
+
+    app = create_app()
+    client = app.test_client()
+    run_id = uuid.uuid4().hex[:8]
+
+    def check(name, send, expect):
+        recorder.servers = []
+        response = send()
+        members = {
+            'primary' if server == mongo_client.primary else 'secondary'
+            for server in recorder.servers
+        }
+        served_by = ', '.join(sorted(members)) or 'no reads'
+        result = 'ok' if expect in members and (expect == 'secondary' or members == {expect}) else f'expected {expect}'
+        print(f'{name:<44} {response.status_code}  {served_by:<20} {result}')
+        return response
+
+    # Registering is a write: the response carries X-Last-Write
+    response = client.post('/api/auth/register', json={
+        'name': 'Routing Admin', 'email': f'routing-{run_id}@example.com', 'password': uuid.uuid4().hex, 'role': 'admin'
+    })
+    token = response.get_json()['token']
+    last_write = response.headers[LAST_WRITE_HEADER]
+    headers = {'Authorization': f'Bearer {token}'}
+    fresh_headers = dict(headers, **{LAST_WRITE_HEADER: last_write})
+    settled_headers = dict(headers, **{LAST_WRITE_HEADER: '0'})
+
+    try:
+        print(f"{'Request':<44} {'Status':<5} {'Reads served by':<20} Check")
+        check('GET /events', lambda: client.get('/api/events', headers=settled_headers), 'secondary')
+        check('GET /events?near=12.97,77.59', lambda: client.get('/api/events?near=12.97,77.59', headers=settled_headers), 'secondary')
+        check('GET /users?search=routing', lambda: client.get('/api/users?search=routing', headers=settled_headers), 'secondary')
+        check('GET /users/leaderboard', lambda: client.get('/api/users/leaderboard', headers=settled_headers), 'secondary')
+        check('GET /events (just wrote)', lambda: client.get('/api/events', headers=fresh_headers), 'primary')
+        check('GET /users?search=routing (just wrote)', lambda: client.get('/api/users?search=routing', headers=fresh_headers), 'primary')
+        check('GET /users/profile', lambda: client.get('/api/users/profile', headers=settled_headers), 'primary')
+    finally:
+        db.users.delete_many({'email': f'routing-{run_id}@example.com'})
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,17 @@
+import argparse
+from app.models.feedback import import_feedback_csv
+
+def main():
+    parser = argparse.ArgumentParser(description='Import feedback from a CSV file with User_ID, Feedback and Sentiment columns')
+    parser.add_argument('csv_file', help='Path to the CSV file, e.g. ../word_cloud/data.csv')
+    parser.add_argument('--event-id', help='Attach the feedback to this event')
+    parser.add_argument('--source', default='import', help='Source label stored on each entry')
+    args = parser.parse_args()
+
+    with open(args.csv_file, newline='', encoding='utf-8-sig') as f:
+        imported = import_feedback_csv(f, event_id=args.event_id, source=args.source)
+
+    print(f'Imported {imported} feedback entries')
+
+if __name__ == '__main__':
+    main()
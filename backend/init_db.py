@@ -4,6 +4,10 @@ from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
 from flask_bcrypt import Bcrypt
+from app.utils.event_status import status_fields
+from app.utils.images import default_image_id
+from app.utils.geo import geocode
+from app.utils.achievements import calculate_level, earned_badges
 
 # Load environment variables
 load_dotenv()
@@ -25,6 +29,8 @@ def init_db():
         print("Dropping existing collections...")
         db.users.drop()
         db.events.drop()
+        db.hours_ledger.drop()
+        db.period_totals.drop()
         
         # Create admin user
         print("Creating admin user...")
@@ -32,6 +38,8 @@ def init_db():
             '_id': ObjectId(),
             'name': 'Admin User',
             'email': 'admin@samarthanam.org',
+            'name_lower': 'admin user',
+            'email_lower': 'admin@samarthanam.org',
             'password': bcrypt.generate_password_hash('admin123').decode('utf-8'),
             'role': 'admin',
             'profile': {
@@ -52,6 +60,8 @@ def init_db():
             '_id': ObjectId(),
             'name': 'John Volunteer',
             'email': 'volunteer@example.com',
+            'name_lower': 'john volunteer',
+            'email_lower': 'volunteer@example.com',
             'password': bcrypt.generate_password_hash('volunteer123').decode('utf-8'),
             'role': 'volunteer',
             'profile': {
@@ -66,7 +76,11 @@ def init_db():
                 'photo_url': 'https://source.unsplash.com/random/150x150/?person',
                 'address': '123 Volunteer St, Bengaluru',
                 'certificates': ['First Aid Certified', 'Teaching Excellence Award'],
-                'badges': ['Environmental Hero', 'Community Builder']
+                'level': calculate_level(150),
+                'badges': [
+                    {'id': badge, 'earned_at': datetime.utcnow()}
+                    for badge in earned_badges({'points': 150, 'hours': 45, 'events': 0, 'level': calculate_level(150)})
+                ]
             },
             'created_at': datetime.utcnow(),
             'updated_at': datetime.utcnow(),
@@ -75,11 +89,24 @@ def init_db():
         }
         db.users.insert_one(volunteer_user)
         
+        # Record the volunteer's starting totals in the hours ledger so reconciliation balances
+        db.hours_ledger.insert_one({
+            'user_id': volunteer_user['_id'],
+            'event_id': None,
+            'hours': volunteer_user['profile']['hours_contributed'],
+            'points': volunteer_user['profile']['points'],
+            'source': 'opening_balance',
+            'approved_by': admin_user['_id'],
+            'logged_at': datetime.utcnow()
+        })
+        
         # Create participant user
         participant_user = {
             '_id': ObjectId(),
             'name': 'Sara Participant',
             'email': 'participant@example.com',
+            'name_lower': 'sara participant',
+            'email_lower': 'participant@example.com',
             'password': bcrypt.generate_password_hash('participant123').decode('utf-8'),
             'role': 'participant',
             'profile': {
@@ -118,7 +145,7 @@ def init_db():
                 'participant_limit': 100,
                 'age_restriction': 'No Restriction',
                 'contact_information': 'run@samarthanam.org',
-                'event_image': 'https://source.unsplash.com/random/800x600/?run',
+                'image_id': default_image_id('Sports'),
                 'requirements': ['No health issues', 'Comfortable running gear'],
                 'skills_needed': ['Running', 'First Aid'],
                 'participants': [],
@@ -140,7 +167,7 @@ def init_db():
                 'participant_limit': 30,
                 'age_restriction': '18+',
                 'contact_information': 'workshop@samarthanam.org',
-                'event_image': 'https://source.unsplash.com/random/800x600/?workshop',
+                'image_id': default_image_id('Education'),
                 'requirements': ['Teaching experience preferred', 'Patience with children'],
                 'skills_needed': ['Teaching', 'Communication'],
                 'participants': [],
@@ -162,7 +189,7 @@ def init_db():
                 'participant_limit': 50,
                 'age_restriction': 'Family Friendly',
                 'contact_information': 'art@samarthanam.org',
-                'event_image': 'https://source.unsplash.com/random/800x600/?art',
+                'image_id': default_image_id('Cultural'),
                 'requirements': ['Art appreciation', 'Good with people'],
                 'skills_needed': ['Art', 'Communication'],
                 'participants': [],
@@ -184,7 +211,7 @@ def init_db():
                 'participant_limit': 150,
                 'age_restriction': '18+',
                 'contact_information': 'careers@samarthanam.org',
-                'event_image': 'https://source.unsplash.com/random/800x600/?career',
+                'image_id': default_image_id('Community'),
                 'requirements': ['Professional attire', 'Background in HR or career counseling preferred'],
                 'skills_needed': ['Communication', 'Career Guidance', 'Networking'],
                 'participants': [],
@@ -198,6 +225,12 @@ def init_db():
         for event in events:
             event_ids.append(str(event['_id']))
         
+        # Store when each event's status next changes, for the status scheduler,
+        # and its coordinates for events-near-me searches
+        for event in events:
+            event.update(status_fields(event['start_date'], event['end_date'], event['status']))
+            event['geo'] = geocode(event['location'])
+        
         # Insert events
         db.events.insert_many(events)
         
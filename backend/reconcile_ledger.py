@@ -0,0 +1,32 @@
+import argparse
+from app.models.ledger import reconcile_totals
+
+def main():
+    parser = argparse.ArgumentParser(description='Verify volunteer points, hours and leaderboard period totals against the hours ledger')
+    parser.add_argument('--batch-size', type=int, default=500, help='Users checked per batch')
+    parser.add_argument('--fix', action='store_true', help='Reset mismatched totals and period buckets to the ledger sums')
+    args = parser.parse_args()
+
+    mismatches = reconcile_totals(batch_size=args.batch_size, fix=args.fix)
+
+    for mismatch in mismatches:
+        print(
+            f"User {mismatch['user_id']}: points {mismatch['points']} (ledger {mismatch['ledger_points']}), "
+            f"hours {mismatch['hours']} (ledger {mismatch['ledger_hours']})"
+        )
+        for bucket in mismatch['periods']:
+            print(
+                f"  {bucket['period']} {bucket['bucket']}: points {bucket['points']} (ledger {bucket['ledger_points']}), "
+                f"hours {bucket['hours']} (ledger {bucket['ledger_hours']}), "
+                f"entries {bucket['entries']} (ledger {bucket['ledger_entries']})"
+            )
+
+    if not mismatches:
+        print('All volunteer totals match the ledger')
+    elif args.fix:
+        print(f'Fixed {len(mismatches)} volunteer totals')
+    else:
+        print(f'Found {len(mismatches)} mismatched volunteer totals (run with --fix to correct them)')
+
+if __name__ == '__main__':
+    main()
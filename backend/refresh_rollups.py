@@ -0,0 +1,12 @@
+import argparse
+from app.models.rollup import refresh_rollups
+
+def main():
+    parser = argparse.ArgumentParser(description='Refresh the daily rollups behind the admin dashboard')
+    parser.add_argument('--full', action='store_true', help='Rebuild every day instead of only the days touched since the last refresh')
+    args = parser.parse_args()
+
+    refresh_rollups(full=args.full)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,17 @@
+import argparse
+from app.services.message_worker import run_worker
+from app.services.transports import get_transport
+
+def main():
+    parser = argparse.ArgumentParser(description='Deliver queued admin messages')
+    parser.add_argument('--transport', help='Transport to deliver with: smtp or log (default: MESSAGE_TRANSPORT or smtp)')
+    parser.add_argument('--once', action='store_true', help='Exit when the queue is empty instead of polling')
+    args = parser.parse_args()
+
+    try:
+        run_worker(get_transport(args.transport), once=args.once)
+    except KeyboardInterrupt:
+        print('Message worker stopped')
+
+if __name__ == '__main__':
+    main()
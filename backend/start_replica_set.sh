@@ -0,0 +1,40 @@
+#!/bin/bash
+
+# Start a local three-member replica set (rs0 on ports 27017-27019) for trying
+# secondary reads and change streams. Data goes to ./data/rs0-*; stop it with
+# ./start_replica_set.sh stop
+
+DATA_DIR="$(dirname "$0")/data"
+PORTS=(27017 27018 27019)
+
+if [ "$1" == "stop" ]; then
+    for port in "${PORTS[@]}"; do
+        mongosh --quiet --port "$port" --eval "db.getSiblingDB('admin').shutdownServer()" > /dev/null 2>&1
+    done
+    echo "Replica set stopped"
+    exit 0
+fi
+
+for i in "${!PORTS[@]}"; do
+    mkdir -p "$DATA_DIR/rs0-$i"
+    echo "Starting mongod on port ${PORTS[$i]}..."
+    mongod --replSet rs0 --port "${PORTS[$i]}" --bind_ip localhost \
+        --dbpath "$DATA_DIR/rs0-$i" --logpath "$DATA_DIR/rs0-$i/mongod.log" --fork || exit 1
+done
+
+echo "Initiating replica set..."
+mongosh --quiet --port 27017 --eval "
+try {
+    rs.status();
+    print('Replica set already initiated');
+} catch (e) {
+    rs.initiate({_id: 'rs0', members: [
+        {_id: 0, host: 'localhost:27017', priority: 2},
+        {_id: 1, host: 'localhost:27018'},
+        {_id: 2, host: 'localhost:27019'}
+    ]});
+}
+"
+
+echo "Replica set running. Use:"
+echo "MONGO_URI=mongodb://localhost:27017,localhost:27018,localhost:27019/samarthanam?replicaSet=rs0"
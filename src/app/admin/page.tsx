@@ -66,13 +66,13 @@ export default function AdminDashboard() {
       try {
         const apiClient = (await import('../../utils/api')).default;
         
-        // Get volunteers count
-        const volunteersResponse = await apiClient.user.getAllUsers('volunteer');
-        const volunteersCount = volunteersResponse.data.count || 0;
-        
-        // Get events data
-        const eventsResponse = await apiClient.events.getAllEvents({ status: 'Upcoming' });
-        const activeEventsCount = eventsResponse.data.events.length || 0;
+        // Volunteer count and pre-aggregated event statistics in one round trip
+        const results = await apiClient.batch.get({
+          volunteers: '/users?role=volunteer&limit=1',
+          stats: '/admin/stats',
+        });
+        const volunteersCount = results.volunteers.body?.total || 0;
+        const activeEventsCount = results.stats.body?.totals?.events_by_status?.Upcoming || 0;
         
         // Update stats
         setStats({
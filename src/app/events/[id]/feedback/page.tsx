@@ -209,8 +209,21 @@ const EventFeedbackPage: React.FC = () => {
     setLoading(true);
     
     try {
-      // Simulate an API call to submit feedback
-      await new Promise(resolve => setTimeout(resolve, 1500));
+      // Submit feedback to the backend
+      const apiClient = (await import('../../../../utils/api')).default;
+      await apiClient.feedback.submitFeedback({
+        event_id: params.id,
+        ratings: {
+          overall: formData.overallRating,
+          organization: formData.organizationRating || undefined,
+          accessibility: formData.accessibilityRating || undefined,
+          volunteers: formData.volunteersRating || undefined,
+          content: formData.contentRating || undefined,
+        },
+        liked_most: formData.likedMost,
+        improvements: formData.improvements,
+        additional_comments: formData.additionalComments,
+      });
       
       // After submitting feedback, mark the event as completed for the user
       if (profile && event) {
@@ -181,6 +181,31 @@ const EventDetailsPage: React.FC = () => {
     fetchEventDetails();
   }, [params.id]);
   
+  // Keep the seat count live while the page is open
+  useEffect(() => {
+    const eventId = params.id as string;
+    if (!eventId || sampleEvents.some(e => e.id === eventId)) return;
+    
+    let source: EventSource | null = null;
+    let closed = false;
+    import('../../../utils/api').then(({ default: apiClient }) => {
+      if (closed) return;
+      source = apiClient.events.watchEvent(eventId, {
+        onSeats: (seats: any) => setEvent((current: any) => current && {
+          ...current,
+          participantsLimit: seats.participant_limit || 100,
+          participantLimit: seats.participant_limit || 100,
+          currentParticipants: seats.participant_count,
+          seatsLeft: seats.seats_left,
+        }),
+      });
+    });
+    return () => {
+      closed = true;
+      source?.close();
+    };
+  }, [params.id]);
+  
   useEffect(() => {
     // This would normally check if the user is registered for this event
     // But we should primarily use the Redux store data for consistency
@@ -391,7 +416,7 @@ const EventDetailsPage: React.FC = () => {
                   </ListItemIcon>
                   <ListItemText 
                     primary="Capacity" 
-                    secondary={`${event.participants ? event.participants.length : 0} / ${event.participantLimit} volunteers registered`} 
+                    secondary={`${event.currentParticipants ?? (event.participants ? event.participants.length : 0)} / ${event.participantLimit} volunteers registered${event.seatsLeft === 0 ? ' (full)' : ''}`} 
                   />
                 </ListItem>
               </List>
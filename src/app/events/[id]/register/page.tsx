@@ -201,6 +201,33 @@ const EventRegistrationPage: React.FC = () => {
     fetchEventDetails();
   }, [params.id, isAuthenticated, router, user]);
   
+  // Learn that the event filled up while the form is open, not when registering fails
+  useEffect(() => {
+    const eventId = params.id as string;
+    if (!eventId || sampleEvents.some(e => e.id === eventId)) return;
+    
+    let source: EventSource | null = null;
+    let closed = false;
+    import('../../../../utils/api').then(({ default: apiClient }) => {
+      if (closed) return;
+      source = apiClient.events.watchEvent(eventId, {
+        onSeats: (seats: any) => setEvent((current: any) => current && {
+          ...current,
+          participantsLimit: seats.participant_limit,
+          participantLimit: seats.participant_limit,
+          currentParticipants: seats.participant_count,
+          seatsLeft: seats.seats_left,
+        }),
+      });
+    });
+    return () => {
+      closed = true;
+      source?.close();
+    };
+  }, [params.id]);
+  
+  const isFull = event?.seatsLeft === 0;
+  
   const handleInputChange = (
     e: React.ChangeEvent<HTMLInputElement | { name?: string; value: unknown }> | SelectChangeEvent<string>
   ) => {
@@ -895,6 +922,12 @@ const EventRegistrationPage: React.FC = () => {
             </Alert>
           )}
           
+          {isFull && (
+            <Alert severity="warning" sx={{ mb: 3 }}>
+              This event is now full. You will be able to register if a place becomes free.
+            </Alert>
+          )}
+          
           <form onSubmit={handleSubmit}>
             {renderStepContent(activeStep)}
             
@@ -912,7 +945,7 @@ const EventRegistrationPage: React.FC = () => {
                   variant="contained"
                   color="primary"
                   type="submit"
-                  disabled={loading}
+                  disabled={loading || isFull}
                 >
                   {loading ? <CircularProgress size={24} /> : 'Complete Registration'}
                 </Button>
@@ -1,6 +1,6 @@
 'use client';
 
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import { 
   Container, 
   Box, 
@@ -102,39 +102,68 @@ export const sampleEvents: EventData[] = [
   },
 ];
 
-// Real API call
-const fetchEvents = async (): Promise<EventData[]> => {
+// Only what the event cards show; participants are counted by the server
+const CARD_FIELDS = [
+  'event_name', 'description', 'event_image', 'start_date', 'end_date', 'location',
+  'category', 'participant_limit', 'participant_count', 'points_awarded',
+];
+
+// How often the list is brought up to date
+const SYNC_INTERVAL_MS = 60 * 1000;
+
+// Map backend event structure to frontend EventData structure
+const toEventData = (event: any): EventData => {
+  // Calculate the real-time status based on dates
+  const calculatedStatus = calculateEventStatus(event.start_date, event.end_date);
+  
+  return {
+    id: event.event_id,
+    title: event.event_name,
+    description: event.description,
+    image: event.event_image,
+    startDate: event.start_date,
+    endDate: event.end_date,
+    location: event.location,
+    category: event.category,
+    // Use the calculated status instead of the one from the backend
+    status: calculatedStatus,
+    participantsLimit: event.participant_limit,
+    currentParticipants: event.participant_count || 0,
+    pointsAwarded: event.points_awarded,
+  };
+};
+
+// Real API call: everything on the first call, then only what changed since `since`
+const fetchEventChanges = async (since: string | null) => {
   try {
     const apiClient = (await import('../../utils/api')).default;
-    const response = await apiClient.events.getAllEvents();
+    const response = await apiClient.events.getEventChanges(since, CARD_FIELDS);
     
-    // Map backend event structure to frontend EventData structure
-    return response.data.events.map((event: any) => {
-      // Calculate the real-time status based on dates
-      const calculatedStatus = calculateEventStatus(event.start_date, event.end_date);
-      
-      return {
-        id: event.event_id,
-        title: event.event_name,
-        description: event.description,
-        image: event.event_image,
-        startDate: event.start_date,
-        endDate: event.end_date,
-        location: event.location,
-        category: event.category,
-        // Use the calculated status instead of the one from the backend
-        status: calculatedStatus,
-        participantsLimit: event.participant_limit,
-        currentParticipants: event.participants ? event.participants.length : 0,
-        pointsAwarded: event.points_awarded,
-      };
-    });
+    return {
+      events: response.data.events.map(toEventData) as EventData[],
+      deleted: response.data.deleted as string[],
+      full: response.data.full as boolean,
+      nextToken: response.data.next_token as string,
+    };
   } catch (error) {
     console.error('Error fetching events:', error);
     throw error;
   }
 };
 
+// Apply a delta: replace changed events, add new ones, drop deleted ones
+const mergeEvents = (current: EventData[], changed: EventData[], deleted: string[]): EventData[] => {
+  const changedById = new Map(changed.map(event => [event.id, event]));
+  const removed = new Set(deleted);
+  const merged = current
+    .filter(event => !removed.has(event.id))
+    .map(event => changedById.get(event.id) || event);
+  const known = new Set(current.map(event => event.id));
+  return merged
+    .concat(changed.filter(event => !known.has(event.id)))
+    .sort((a, b) => a.startDate.localeCompare(b.startDate));
+};
+
 // Helper function to calculate event status based on dates
 export const calculateEventStatus = (startDate: string, endDate: string): string => {
   const now = new Date();
@@ -156,20 +185,49 @@ export default function EventsPage() {
   const [error, setError] = useState<string | null>(null);
   const [tabValue, setTabValue] = useState(0);
   
+  const syncToken = useRef<string | null>(null);
+  
   useEffect(() => {
-    const loadEvents = async () => {
+    const syncEvents = async () => {
       try {
-        const data = await fetchEvents();
-        setEvents(data);
+        const changes = await fetchEventChanges(syncToken.current);
+        setEvents(current => changes.full
+          ? changes.events
+          : mergeEvents(current, changes.events, changes.deleted));
+        syncToken.current = changes.nextToken;
+        setError(null);
       } catch (err) {
-        setError('Failed to load events. Please try again later.');
+        if (!syncToken.current) {
+          setError('Failed to load events. Please try again later.');
+        }
         console.error(err);
       } finally {
         setLoading(false);
       }
     };
     
-    loadEvents();
+    syncEvents();
+    const interval = setInterval(syncEvents, SYNC_INTERVAL_MS);
+    return () => clearInterval(interval);
+  }, []);
+  
+  // Seat counts change too often to wait for the next sync; they are pushed as they happen
+  useEffect(() => {
+    let source: EventSource | null = null;
+    let closed = false;
+    import('../../utils/api').then(({ default: apiClient }) => {
+      if (closed) return;
+      source = apiClient.events.watchEvents({
+        onSeats: (seats: any) => setEvents(current => current.map(event => event.id === seats.event_id
+          ? { ...event, participantsLimit: seats.participant_limit, currentParticipants: seats.participant_count }
+          : event)),
+        onRemoved: (eventId: string) => setEvents(current => current.filter(event => event.id !== eventId)),
+      });
+    });
+    return () => {
+      closed = true;
+      source?.close();
+    };
   }, []);
   
   const handleTabChange = (event: React.SyntheticEvent, newValue: number) => {
@@ -115,14 +115,15 @@ export default function LogHoursPage() {
         
         // Fetch real events from API
         const apiClient = (await import('../../../utils/api')).default;
-        const response = await apiClient.events.getAllEvents();
-        
-        // Get user's events
-        const userEventsResponse = await apiClient.user.getUserEvents();
-        const userEventIds = userEventsResponse.data.events.map((event: any) => event.event_id);
+        // All events and the user's events in one round trip
+        const results = await apiClient.batch.get({
+          events: '/events',
+          userEvents: '/users/events?fields=event_id',
+        });
+        const userEventIds = (results.userEvents.body?.events || []).map((event: any) => event.event_id);
         
         // Filter completed events the user has registered for
-        let completedEvents = response.data.events.filter((event: any) => 
+        let completedEvents = (results.events.body?.events || []).filter((event: any) => 
           userEventIds.includes(event.event_id) &&
           event.status.toLowerCase() === 'completed' &&
           event.publish_event === true
@@ -225,8 +226,10 @@ export default function LogHoursPage() {
         return;
       }
       
-      // Calculate points earned directly
-      const pointsEarned = calculatePointsForHours(event.inputHours);
+      // Record the hours in the backend ledger, which returns the points awarded
+      const apiClient = (await import('../../../utils/api')).default;
+      const ledgerResponse = await apiClient.user.logHours(event.id, event.inputHours);
+      const pointsEarned = ledgerResponse.data.entry?.points ?? calculatePointsForHours(event.inputHours);
       
       console.log("Submitting hours:", {
         eventId: event.id,
@@ -247,7 +250,7 @@ export default function LogHoursPage() {
         }));
         
         // Update points in Redux
-        const newTotalPoints = profile.points + pointsEarned;
+        const newTotalPoints = ledgerResponse.data.points ?? profile.points + pointsEarned;
         const currentLevel = profile.level;
         const pointsToNextLevel = 100 * (currentLevel + 1);
         
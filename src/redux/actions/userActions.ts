@@ -28,11 +28,11 @@ export const fetchUserProfile = () => async (dispatch: AppDispatch) => {
   }
 };
 
-// Update user profile
+// Update user profile; only the entries in profileData are changed
 export const updateUserProfile = (profileData: any) => async (dispatch: AppDispatch) => {
   try {
     dispatch(updateProfileStart());
-    const response = await api.user.updateProfile(profileData);
+    const response = await api.user.patchProfile(profileData);
     dispatch(updateProfileSuccess(response.data));
     return response.data;
   } catch (error) {
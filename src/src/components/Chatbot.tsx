@@ -13,6 +13,7 @@ import VolumeUpIcon from '@mui/icons-material/VolumeUp';
 import VolumeOffIcon from '@mui/icons-material/VolumeOff';
 import MicIcon from '@mui/icons-material/Mic';
 import MicOffIcon from '@mui/icons-material/MicOff';
+import { chatbotAPI } from '../../utils/api';
 
 // Add these type declarations at the very top of your file, before any imports
 declare global {
@@ -622,6 +623,21 @@ const Chatbot: React.FC = () => {
     };
   }, [inputMessage]);
 
+  // Free-text questions are answered by the backend from events, FAQs and the registration guide
+  const answerQuestion = async (question: string) => {
+    try {
+      const { data } = await chatbotAPI.query(question);
+      const links = data.results
+        .slice(1)
+        .filter((result: any) => result.type === 'event')
+        .map((result: any) => `- ${result.title}`);
+      addMessage(links.length ? `${data.answer}\n\nRelated events:\n${links.join('\n')}` : data.answer, true);
+    } catch (error) {
+      console.error('Chatbot query failed:', error);
+      addMessage("Sorry, I can't answer questions right now. Please use the menu options.", true);
+    }
+  };
+
   const handleSendMessage = () => {
     if (inputMessage.trim() !== '') {
       if (chatState === 'volunteerConfirm') {
@@ -659,6 +675,7 @@ const Chatbot: React.FC = () => {
           handleFurtherHelp();
         } else {
           addMessage(inputMessage, false);
+          answerQuestion(inputMessage);
         }
       }
       setInputMessage('');
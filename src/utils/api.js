@@ -18,20 +18,63 @@ apiClient.interceptors.request.use(
     if (token) {
       config.headers.Authorization = `Bearer ${token}`;
     }
+    // Lets the server keep our reads on the primary until they can see our last write
+    const lastWrite = localStorage.getItem('lastWrite');
+    if (lastWrite) {
+      config.headers['X-Last-Write'] = lastWrite;
+    }
     return config;
   },
   (error) => Promise.reject(error)
 );
 
+// Response interceptor to remember when we last wrote
+apiClient.interceptors.response.use(
+  (response) => {
+    const lastWrite = response.headers['x-last-write'];
+    if (lastWrite) {
+      localStorage.setItem('lastWrite', lastWrite);
+    }
+    return response;
+  },
+  (error) => Promise.reject(error)
+);
+
+// POST that is retried after network errors with the same Idempotency-Key,
+// so the server runs it once and answers retries with the first response
+const newIdempotencyKey = () =>
+  typeof crypto !== 'undefined' && crypto.randomUUID
+    ? crypto.randomUUID()
+    : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+
+const postIdempotent = async (url, data, attempts = 3) => {
+  const headers = { 'Idempotency-Key': newIdempotencyKey() };
+  for (let attempt = 1; ; attempt++) {
+    try {
+      return await apiClient.post(url, data, { headers });
+    } catch (error) {
+      // No response arrived, or the first attempt is still running on the server
+      const retry = !error.response || error.response.status === 409;
+      if (!retry || attempt >= attempts) throw error;
+      await new Promise((resolve) => setTimeout(resolve, 500 * attempt));
+    }
+  }
+};
+
 // Authentication API
 export const authAPI = {
   register: (userData) => apiClient.post('/auth/register', userData),
   login: (credentials) => apiClient.post('/auth/login', credentials),
   validateToken: () => apiClient.get('/auth/validate-token'),
-  logout: () => {
-    // Client-side logout - remove token from localStorage
-    localStorage.removeItem('token');
-    return Promise.resolve({ success: true });
+  logout: (allDevices = false) => {
+    // Revoke the token on the server, then forget it here even if that failed
+    const request = localStorage.getItem('token')
+      ? apiClient.post('/auth/logout', { all: allDevices }).catch(() => null)
+      : Promise.resolve(null);
+    return request.then(() => {
+      localStorage.removeItem('token');
+      return { success: true };
+    });
   },
   checkAuth: () => {
     const token = localStorage.getItem('token');
@@ -40,6 +83,14 @@ export const authAPI = {
 };
 
 // Events API
+// EventSource reconnects by itself when a stream drops
+const openEventStream = (path, onSeats, onRemoved) => {
+  const source = new EventSource(`${API_BASE_URL}${path}`);
+  if (onSeats) source.addEventListener('seats', (message) => onSeats(JSON.parse(message.data)));
+  if (onRemoved) source.addEventListener('removed', (message) => onRemoved(JSON.parse(message.data).event_id));
+  return source;
+};
+
 export const eventsAPI = {
   getAllEvents: (filters = {}) => {
     const params = new URLSearchParams();
@@ -47,29 +98,56 @@ export const eventsAPI = {
     if (filters.status) params.append('status', filters.status);
     if (filters.category) params.append('category', filters.category);
     if (filters.published) params.append('published', filters.published);
+    if (filters.fields) params.append('fields', filters.fields.join(','));
+    // Nearest first within radius km of { latitude, longitude }
+    if (filters.near) params.append('near', `${filters.near.latitude},${filters.near.longitude}`);
+    if (filters.radius) params.append('radius', filters.radius);
     
     return apiClient.get(`/events?${params.toString()}`);
   },
-  getEventById: (eventId) => apiClient.get(`/events/${eventId}`),
-  createEvent: (eventData) => apiClient.post('/events', eventData),
+  // Events changed since a previous call's next_token, plus ids of deleted ones
+  getEventChanges: (since, fields) => {
+    const params = new URLSearchParams();
+    if (since) params.append('since', since);
+    if (fields) params.append('fields', fields.join(','));
+    return apiClient.get(`/events/changes?${params.toString()}`);
+  },
+  // Live seat counts over Server-Sent Events: onSeats gets { event_id, participant_count,
+  // participant_limit, seats_left, status } on every change (for one event, the current
+  // ones first); onRemoved gets the id of an event deleted or unpublished. Call close() to stop.
+  watchEvent: (eventId, { onSeats, onRemoved } = {}) => openEventStream(`/events/${eventId}/stream`, onSeats, onRemoved),
+  watchEvents: ({ onSeats, onRemoved } = {}) => openEventStream('/events/stream', onSeats, onRemoved),
+  getEventById: (eventId, fields) => apiClient.get(`/events/${eventId}${fields ? `?fields=${fields.join(',')}` : ''}`),
+  createEvent: (eventData) => postIdempotent('/events', eventData),
   updateEvent: (eventId, eventData) => apiClient.put(`/events/${eventId}`, eventData),
   deleteEvent: (eventId) => apiClient.delete(`/events/${eventId}`),
-  registerForEvent: (eventId) => apiClient.post(`/events/${eventId}/register`),
+  registerForEvent: (eventId) => postIdempotent(`/events/${eventId}/register`),
   cancelRegistration: (eventId) => apiClient.post(`/events/${eventId}/cancel`),
   getEventParticipants: (eventId) => apiClient.get(`/events/${eventId}/participants`),
+  getCertificate: (eventId, format = 'pdf') => apiClient.get(`/events/${eventId}/certificate?format=${format}`),
+  issueCertificates: (eventId, format = 'pdf') => apiClient.post(`/events/${eventId}/certificates?format=${format}`),
 };
 
 // User API
 export const userAPI = {
   getProfile: () => apiClient.get('/users/profile'),
   updateProfile: (profileData) => apiClient.put('/users/profile', { profile: profileData }),
+  // Sends only the given entries; null removes one
+  patchProfile: (changes) => apiClient.patch('/users/profile', { profile: changes }, {
+    headers: { 'Content-Type': 'application/merge-patch+json' },
+  }),
   getUserEvents: () => apiClient.get('/users/events'),
-  getAllUsers: (role) => {
+  getAllUsers: (role, options = {}) => {
     const params = new URLSearchParams();
     if (role) params.append('role', role);
+    if (options.search) params.append('search', options.search);
+    if (options.after) params.append('after', options.after);
+    if (options.limit) params.append('limit', options.limit);
     return apiClient.get(`/users?${params.toString()}`);
   },
   getUserById: (userId) => apiClient.get(`/users/${userId}`),
+  logHours: (eventId, hours) => apiClient.post('/users/hours', { event_id: eventId, hours }),
+  getHoursLedger: (limit = 50) => apiClient.get(`/users/hours?limit=${limit}`),
   getLeaderboard: (period = 'all-time') => {
     const params = new URLSearchParams();
     params.append('period', period);
@@ -77,8 +155,63 @@ export const userAPI = {
   },
 };
 
+// Feedback API
+export const feedbackAPI = {
+  submitFeedback: (feedbackData) => apiClient.post('/feedback', feedbackData),
+  getSummary: (eventId, limit = 50) => {
+    const params = new URLSearchParams();
+    if (eventId) params.append('event_id', eventId);
+    params.append('limit', limit);
+    return apiClient.get(`/feedback/summary?${params.toString()}`);
+  },
+};
+
+// Chatbot API: answers free-text questions from events, FAQs and the registration guide
+export const chatbotAPI = {
+  query: (question, limit) => apiClient.post('/chatbot/query', limit ? { query: question, limit } : { query: question }),
+};
+
+// Images API
+export const imagesAPI = {
+  uploadImage: (file) => {
+    const formData = new FormData();
+    formData.append('image', file);
+    return apiClient.post('/images', formData, { headers: { 'Content-Type': 'multipart/form-data' } });
+  },
+};
+
+// Batch API: several GET requests in one round trip and one authentication.
+// `requests` maps a name to a path under /api, e.g. { profile: '/users/profile' };
+// resolves to the same names mapped to { status, body }
+export const batchAPI = {
+  get: (requests) => apiClient.post('/batch', {
+    requests: Object.entries(requests).map(([id, path]) => ({ id, method: 'GET', path })),
+  }).then((response) => Object.fromEntries(
+    response.data.responses.map(({ id, status, body }) => [id, { status, body }])
+  )),
+};
+
+// Admin API
+export const adminAPI = {
+  getStats: (from, to) => {
+    const params = new URLSearchParams();
+    if (from) params.append('from', from);
+    if (to) params.append('to', to);
+    return apiClient.get(`/admin/stats?${params.toString()}`);
+  },
+  refreshStats: () => apiClient.post('/admin/stats/refresh'),
+  sendMessage: (audience, subject, body) => apiClient.post('/admin/messages', { audience, subject, body }),
+  getMessages: () => apiClient.get('/admin/messages'),
+  getMessage: (jobId) => apiClient.get(`/admin/messages/${jobId}`),
+};
+
 export default {
   auth: authAPI,
   events: eventsAPI,
   user: userAPI,
+  admin: adminAPI,
+  feedback: feedbackAPI,
+  chatbot: chatbotAPI,
+  images: imagesAPI,
+  batch: batchAPI,
 }; 
\ No newline at end of file
@@ -13,116 +13,27 @@ export interface PointsCalculationResult {
   newBadges: string[];
 }
 
-// Level thresholds
-export const LEVEL_THRESHOLDS = {
-  1: 0,
-  2: 100,
-  3: 250,
-  4: 500,
-  5: 1000,
-  6: 2000,
-};
+import achievements from '../../shared/achievements.json';
 
-// Badge definitions with criteria
-export const BADGES = {
-  FIRST_EVENT: {
-    id: 'FIRST_EVENT',
-    name: 'First Steps',
-    description: 'Completed your first volunteer event',
-    icon: 'stars',
-    criteria: {
-      events: 1,
-      hours: 0,
-    },
-  },
-  FIVE_EVENTS: {
-    id: 'FIVE_EVENTS',
-    name: 'Regular Volunteer',
-    description: 'Completed 5 volunteer events',
-    icon: 'workspace_premium',
-    criteria: {
-      events: 5,
-      hours: 0,
-    },
-  },
-  TEN_EVENTS: {
-    id: 'TEN_EVENTS',
-    name: 'Dedicated Volunteer',
-    description: 'Completed 10 volunteer events',
-    icon: 'military_tech',
-    criteria: {
-      events: 10,
-      hours: 0,
-    },
-  },
-  TWENTY_FIVE_EVENTS: {
-    id: 'TWENTY_FIVE_EVENTS',
-    name: 'Community Champion',
-    description: 'Completed 25 volunteer events',
-    icon: 'emoji_events',
-    criteria: {
-      events: 25,
-      hours: 0,
-    },
-  },
-  TEN_HOURS: {
-    id: 'TEN_HOURS',
-    name: 'Ten Hours of Service',
-    description: 'Contributed 10 hours of volunteer work',
-    icon: 'timer',
-    criteria: {
-      events: 0,
-      hours: 10,
-    },
-  },
-  FIFTY_HOURS: {
-    id: 'FIFTY_HOURS',
-    name: 'Fifty Hours of Service',
-    description: 'Contributed 50 hours of volunteer work',
-    icon: 'schedule',
-    criteria: {
-      events: 0,
-      hours: 50,
-    },
-  },
-  HUNDRED_HOURS: {
-    id: 'HUNDRED_HOURS',
-    name: 'Century of Service',
-    description: 'Contributed 100 hours of volunteer work',
-    icon: 'hourglass_full',
-    criteria: {
-      events: 0,
-      hours: 100,
-    },
-  },
-  MULTI_CATEGORY: {
-    id: 'MULTI_CATEGORY',
-    name: 'Diverse Impact',
-    description: 'Volunteered in 3 different event categories',
-    icon: 'diversity_3',
-    criteria: {
-      categories: 3,
-    },
-  },
-  LEVEL_THREE: {
-    id: 'LEVEL_THREE',
-    name: 'Rising Star',
-    description: 'Reached Level 3',
-    icon: 'auto_awesome',
-    criteria: {
-      level: 3,
-    },
-  },
-  LEVEL_FIVE: {
-    id: 'LEVEL_FIVE',
-    name: 'Volunteer Extraordinaire',
-    description: 'Reached Level 5',
-    icon: 'auto_awesome_motion',
-    criteria: {
-      level: 5,
-    },
-  },
-};
+export interface BadgeDefinition {
+  id: string;
+  name: string;
+  description: string;
+  icon: string;
+  criteria: Partial<Record<'events' | 'hours' | 'categories' | 'level', number>>;
+}
+
+// Levels and badges come from the table the backend awards them with
+// (shared/achievements.json), so both sides always agree
+
+// Points at which each level starts: level n from LEVEL_THRESHOLDS[n - 1]
+export const LEVEL_THRESHOLDS: number[] = achievements.levels;
+export const MAX_LEVEL = LEVEL_THRESHOLDS.length;
+
+// Badge definitions with criteria, by id
+export const BADGES: Record<string, BadgeDefinition> = Object.fromEntries(
+  (achievements.badges as BadgeDefinition[]).map((badge) => [badge.id, badge])
+);
 
 /**
  * Calculate base points from volunteer hours
@@ -191,16 +102,18 @@ export const calculateEventPoints = (
  * @returns Current user level
  */
 export const getUserLevel = (points: number): number => {
-  let level = 1;
-  
-  for (let i = 6; i >= 1; i--) {
-    if (points >= LEVEL_THRESHOLDS[i as keyof typeof LEVEL_THRESHOLDS]) {
-      level = i;
-      break;
+  // Binary search for the last threshold reached
+  let low = 0;
+  let high = LEVEL_THRESHOLDS.length;
+  while (low < high) {
+    const mid = (low + high) >> 1;
+    if (LEVEL_THRESHOLDS[mid] <= points) {
+      low = mid + 1;
+    } else {
+      high = mid;
     }
   }
-  
-  return level;
+  return Math.max(1, low);
 };
 
 /**
@@ -210,14 +123,11 @@ export const getUserLevel = (points: number): number => {
  * @returns Points needed for next level
  */
 export const getNextLevelPoints = (currentPoints: number, currentLevel: number): number => {
-  if (currentLevel >= 6) {
+  if (currentLevel >= MAX_LEVEL) {
     return 0; // Max level reached
   }
   
-  const nextLevel = currentLevel + 1;
-  const nextLevelThreshold = LEVEL_THRESHOLDS[nextLevel as keyof typeof LEVEL_THRESHOLDS];
-  
-  return nextLevelThreshold - currentPoints;
+  return LEVEL_THRESHOLDS[currentLevel] - currentPoints;
 };
 
 /**
@@ -236,47 +146,20 @@ export const checkNewBadges = (
   categoryDistribution: { name: string; count: number }[],
   currentBadges: string[]
 ): string[] => {
-  const newBadges: string[] = [];
-  
-  // Check event count badges
-  if (totalEvents >= 1 && !currentBadges.includes(BADGES.FIRST_EVENT.id)) {
-    newBadges.push(BADGES.FIRST_EVENT.id);
-  }
-  if (totalEvents >= 5 && !currentBadges.includes(BADGES.FIVE_EVENTS.id)) {
-    newBadges.push(BADGES.FIVE_EVENTS.id);
-  }
-  if (totalEvents >= 10 && !currentBadges.includes(BADGES.TEN_EVENTS.id)) {
-    newBadges.push(BADGES.TEN_EVENTS.id);
-  }
-  if (totalEvents >= 25 && !currentBadges.includes(BADGES.TWENTY_FIVE_EVENTS.id)) {
-    newBadges.push(BADGES.TWENTY_FIVE_EVENTS.id);
-  }
-  
-  // Check hours badges
-  if (totalHours >= 10 && !currentBadges.includes(BADGES.TEN_HOURS.id)) {
-    newBadges.push(BADGES.TEN_HOURS.id);
-  }
-  if (totalHours >= 50 && !currentBadges.includes(BADGES.FIFTY_HOURS.id)) {
-    newBadges.push(BADGES.FIFTY_HOURS.id);
-  }
-  if (totalHours >= 100 && !currentBadges.includes(BADGES.HUNDRED_HOURS.id)) {
-    newBadges.push(BADGES.HUNDRED_HOURS.id);
-  }
-  
-  // Check level badges
-  if (currentLevel >= 3 && !currentBadges.includes(BADGES.LEVEL_THREE.id)) {
-    newBadges.push(BADGES.LEVEL_THREE.id);
-  }
-  if (currentLevel >= 5 && !currentBadges.includes(BADGES.LEVEL_FIVE.id)) {
-    newBadges.push(BADGES.LEVEL_FIVE.id);
-  }
-  
-  // Check category diversity
-  if (categoryDistribution.length >= 3 && !currentBadges.includes(BADGES.MULTI_CATEGORY.id)) {
-    newBadges.push(BADGES.MULTI_CATEGORY.id);
-  }
+  const stats: Record<string, number> = {
+    events: totalEvents,
+    hours: totalHours,
+    level: currentLevel,
+    categories: categoryDistribution.length,
+  };
   
-  return newBadges;
+  // A badge needs every one of its criteria
+  return Object.values(BADGES)
+    .filter((badge) => !currentBadges.includes(badge.id))
+    .filter((badge) =>
+      Object.entries(badge.criteria).every(([criterion, threshold]) => stats[criterion] >= (threshold ?? 0))
+    )
+    .map((badge) => badge.id);
 };
 
 /**